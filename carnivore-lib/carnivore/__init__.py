@@ -1,21 +1,32 @@
-from .models import FetchRequest, FetchResult, SUPPORTED_FORMATS
-from .pipeline import FetchPipeline, fetch
+import importlib
+
+from .models import BatchResult, FetchRequest, FetchResult, SUPPORTED_FORMATS
+
+# Importing the package stays cheap; the pipeline and the legacy library are
+# loaded when first used.
+_LAZY_ATTRIBUTES = {
+    "Carnivore": ".lib",
+    "FetchPipeline": ".pipeline",
+    "fetch": ".pipeline",
+    "fetch_many": ".pipeline",
+}
 
 
 def __getattr__(name):
-    if name != "Carnivore":
+    if name not in _LAZY_ATTRIBUTES:
         raise AttributeError(name)
-    from .lib import Carnivore
-
-    globals()[name] = Carnivore
-    return Carnivore
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    value = globals()[name] = getattr(module, name)
+    return value
 
 
 __all__ = [
+    "BatchResult",
     "Carnivore",
     "FetchPipeline",
     "FetchRequest",
     "FetchResult",
     "SUPPORTED_FORMATS",
     "fetch",
+    "fetch_many",
 ]
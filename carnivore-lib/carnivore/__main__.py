@@ -1,5 +1,13 @@
-from .cli import run
+import sys
+
+from .fastpath import serve_cached_fetch
 
 
 if __name__ == "__main__":
-    raise SystemExit(run())
+    # Fresh cache hits are printed before the CLI and pipeline are imported.
+    status = serve_cached_fetch(sys.argv[1:])
+    if status is None:
+        from .cli import run
+
+        status = run()
+    raise SystemExit(status)
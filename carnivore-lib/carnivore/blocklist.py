@@ -0,0 +1,161 @@
+"""Tracker and ad blocking for browser subrequests.
+
+A ``Blocklist`` compiles the host and path rules of an EasyList-style filter
+file into a trie keyed by reversed host labels, so a lookup walks at most one
+node per label instead of scanning every rule. Supported rules are:
+
+- ``||example.com^`` blocks the host and its subdomains;
+- ``||example.com/ads/`` blocks paths starting with ``/ads/`` on those hosts;
+- ``@@`` versions of both, which exempt matching requests;
+- bare host names and ``0.0.0.0 example.com`` hosts-file lines, which may
+  end with a ``# comment``.
+
+Rules with options (``$``), wildcards, or regular expressions, element
+hiding rules, and comments are ignored.
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+RULE_OPTIONS = "$"
+HOSTS_FILE_ADDRESSES = frozenset(("0.0.0.0", "127.0.0.1", "::", "::1"))
+HOST_CHARACTERS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-.")
+# Hosts-file lines may end with a comment; a "#" not preceded by whitespace
+# belongs to an element hiding rule instead.
+TRAILING_COMMENT = re.compile(r"\s#.*$")
+
+
+class _Node:
+    __slots__ = ("children", "blocks_host", "paths")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.blocks_host = False
+        self.paths: list[str] = []
+
+
+class _HostTrie:
+    def __init__(self):
+        self.root = _Node()
+        self.rules = 0
+
+    def add(self, host: str, path: str) -> None:
+        node = self.root
+        for label in reversed(host.split(".")):
+            node = node.children.setdefault(label, _Node())
+        if path:
+            node.paths.append(path)
+        else:
+            node.blocks_host = True
+        self.rules += 1
+
+    def matches(self, host: str, path: str) -> bool:
+        node = self.root
+        for label in reversed(host.split(".")):
+            node = node.children.get(label)
+            if node is None:
+                return False
+            if node.blocks_host or any(path.startswith(p) for p in node.paths):
+                return True
+        return False
+
+
+def _parse_rule(line: str) -> tuple[bool, str, str] | None:
+    """Return ``(exception, host, path)`` for a supported rule."""
+    line = TRAILING_COMMENT.sub("", line.strip())
+    if not line or line.startswith(("!", "#", "[")) or "#" in line:
+        return None
+    exception = line.startswith("@@")
+    if exception:
+        line = line[2:]
+    if line.startswith("||"):
+        rule = line[2:]
+    elif exception or "/" in line or "|" in line or "^" in line:
+        return None
+    else:
+        fields = line.split()
+        if len(fields) == 2 and fields[0] in HOSTS_FILE_ADDRESSES:
+            rule = fields[1]
+        elif len(fields) == 1:
+            rule = fields[0]
+        else:
+            return None
+    if RULE_OPTIONS in rule or "*" in rule:
+        return None
+    if rule.endswith(("^", "|")):
+        rule = rule[:-1]
+    host, slash, path = rule.partition("/")
+    host = host.lower().rstrip(".")
+    if (
+        not host
+        or "." not in host
+        or not HOST_CHARACTERS.issuperset(host)
+        or "^" in path
+        or "|" in path
+    ):
+        return None
+    return exception, host, slash + path
+
+
+class Blocklist:
+    """Compiled host and path rules from one filter file."""
+
+    def __init__(self, lines, digest: str = ""):
+        self.digest = digest
+        self._blocked = _HostTrie()
+        self._exempt = _HostTrie()
+        for line in lines:
+            rule = _parse_rule(line)
+            if rule is not None:
+                exception, host, path = rule
+                (self._exempt if exception else self._blocked).add(host, path)
+
+    @classmethod
+    def from_file(cls, path) -> "Blocklist":
+        data = Path(path).read_bytes()
+        return cls(
+            data.decode("utf-8", "replace").splitlines(),
+            digest=hashlib.sha256(data).hexdigest(),
+        )
+
+    def __len__(self) -> int:
+        return self._blocked.rules
+
+    def blocks(self, url: str) -> bool:
+        parsed = urlsplit(url)
+        host = (parsed.hostname or "").rstrip(".")
+        if not host:
+            return False
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        return self._blocked.matches(host, path) and not self._exempt.matches(
+            host, path
+        )
+
+
+_blocklists: dict[tuple[str, int, int], Blocklist] = {}
+
+
+def configured_blocklist() -> Blocklist | None:
+    """Return the blocklist named by ``CARNIVORE_BLOCKLIST``, if any.
+
+    The file is compiled once and recompiled only when it changes. An
+    unreadable file disables blocking rather than failing renders.
+    """
+    path = os.environ.get("CARNIVORE_BLOCKLIST")
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        blocklist = _blocklists.get(key)
+        if blocklist is None:
+            _blocklists.clear()
+            blocklist = _blocklists[key] = Blocklist.from_file(path)
+    except OSError:
+        return None
+    return blocklist
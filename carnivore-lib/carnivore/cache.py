@@ -1,15 +1,61 @@
+import atexit
+import base64
+import fcntl
 import hashlib
 import json
 import os
+import struct
 import sys
+import threading
+import time
 import uuid
+import zlib
+from collections import OrderedDict
 from functools import wraps
 from pathlib import Path
 
-from .models import SUPPORTED_FORMATS
+from . import metrics
+from .models import ERROR_CODES, SUPPORTED_FORMATS, FetchError
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
-CACHE_SCHEMA_VERSION = 1
+
+CACHE_SCHEMA_VERSION = 2
+STAGE_SCHEMA_VERSION = 2
+# Version 1 envelopes hold an uncompressed payload and remain readable.
+LEGACY_SCHEMA_VERSION = 1
+# Payloads smaller than this are stored inline; compression would not pay off.
+COMPRESSION_MIN_BYTES = 1024
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+RESULT_NAMESPACE = "results"
+# Negative entries have their own namespace and schema, keyed like results.
+# They postdate version 1 envelopes, so none are read as legacy entries.
+FAILURE_NAMESPACE = "failures"
+FAILURE_SCHEMA_VERSION = 2
+CACHE_BACKENDS = ("file", "sqlite")
+STATS_DIR = ".stats"
+# Lookup counters are buffered in memory and added to their files once this
+# many lookups are pending, after this many seconds, or at exit.
+COUNTER_FLUSH_LOOKUPS = 64
+COUNTER_FLUSH_SECONDS = 10.0
+COUNTER_FORMAT = struct.Struct(">Q")
+PRUNE_MARKER = ".last-prune"
+DEFAULT_CACHE_MAX_BYTES = 1024**3
+DEFAULT_CACHE_MAX_ENTRIES = 0
+DEFAULT_CACHE_MEMORY_BYTES = 0
+DEFAULT_CACHE_FAILURE_TTL = 60.0
+PRUNE_INTERVAL_SECONDS = 60.0
+# Memory-tier hits refresh the backend recency at most this often per key,
+# so pruning does not evict results that are only ever served from memory.
+MEMORY_TOUCH_SECONDS = 60.0
+STALE_TEMPORARY_SECONDS = 3600.0
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
 
 
 def _generate_key(func_name: str, args: tuple, kwargs: dict, namespace=None) -> str:
@@ -39,6 +85,51 @@ def _cache_path(key: str) -> Path:
     return _cache_dir() / f"{key}.json"
 
 
+def _budget(name: str, default: int) -> int:
+    try:
+        return max(int(os.environ.get(name, default)), 0)
+    except ValueError:
+        return default
+
+
+def _cache_max_bytes() -> int:
+    return _budget("CARNIVORE_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES)
+
+
+def _cache_max_entries() -> int:
+    return _budget("CARNIVORE_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES)
+
+
+def _cache_memory_bytes() -> int:
+    return _budget("CARNIVORE_CACHE_MEMORY_BYTES", DEFAULT_CACHE_MEMORY_BYTES)
+
+
+def _seconds(name: str, default: float = 0.0) -> float:
+    try:
+        return max(float(os.environ.get(name, default)), 0.0)
+    except ValueError:
+        return default
+
+
+def cache_freshness(fetched_at: float) -> str:
+    """Classify an entry fetched at ``fetched_at`` against the configured TTL.
+
+    Without ``CARNIVORE_CACHE_TTL`` entries never expire. After the TTL an
+    entry is ``STALE`` for ``CARNIVORE_CACHE_STALE_WHILE_REVALIDATE`` more
+    seconds, during which it may be served while it is refreshed, and
+    ``EXPIRED`` afterwards.
+    """
+    ttl = _seconds("CARNIVORE_CACHE_TTL")
+    if not ttl:
+        return FRESH
+    age = time.time() - fetched_at
+    if age < ttl:
+        return FRESH
+    if age < ttl + _seconds("CARNIVORE_CACHE_STALE_WHILE_REVALIDATE"):
+        return STALE
+    return EXPIRED
+
+
 def _trace_cache_hit() -> None:
     if os.environ.get("CARNIVORE_CACHE_TRACE") == "1":
         print("cache_hit", file=sys.stderr)
@@ -49,69 +140,687 @@ def _payload_checksum(payload: dict) -> str:
     return hashlib.sha256(encoded).hexdigest()
 
 
+class CacheBackend:
+    """Storage for checksummed cache envelopes, grouped by namespace.
+
+    Final results use the ``results`` namespace and every pipeline stage uses
+    its own. Backends store envelopes opaquely; validation stays in this
+    module. Storage failures must surface as misses or be ignored, never as
+    fetch errors.
+    """
+
+    name = ""
+
+    def read(self, namespace: str, key: str) -> dict | None:
+        """Return the stored envelope, or None when it is missing or unreadable."""
+        raise NotImplementedError
+
+    def write_many(self, entries: list[tuple[str, str, dict]]) -> None:
+        """Store (namespace, key, envelope) entries as one batch."""
+        raise NotImplementedError
+
+    def touch(self, namespace: str, key: str) -> None:
+        """Mark an entry as recently used."""
+        raise NotImplementedError
+
+    def record(self, namespace: str, hit: bool) -> None:
+        """Count one lookup outcome for the hit-rate statistics."""
+        raise NotImplementedError
+
+    def counters(self) -> dict[str, dict[str, int]]:
+        raise NotImplementedError
+
+    def usage(self) -> tuple[int, int]:
+        """Return the stored entry count and byte size."""
+        raise NotImplementedError
+
+    def prune(self, max_bytes: int, max_entries: int, max_age: float) -> dict:
+        """Evict expired and least recently used entries; zero means no limit."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class FileCacheBackend(CacheBackend):
+    """One JSON file per entry, written atomically with fsync and rename.
+
+    Final results live directly in the cache directory and stage entries in
+    one subdirectory per stage. Recency is the file mtime. Hit counters are
+    buffered per process and added to one fixed-size file per namespace and
+    outcome under ``.stats``, locked while it is updated.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._counts: dict[tuple[str, str], int] = {}
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        atexit.register(self.close)
+
+    def _path(self, namespace: str, key: str) -> Path:
+        if namespace == RESULT_NAMESPACE:
+            return self.directory / f"{key}.json"
+        return self.directory / namespace / f"{key}.json"
+
+    def read(self, namespace: str, key: str) -> dict | None:
+        try:
+            with self._path(namespace, key).open("r", encoding="utf-8") as cache_file:
+                envelope = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        return envelope if isinstance(envelope, dict) else None
+
+    def write_many(self, entries: list[tuple[str, str, dict]]) -> None:
+        for namespace, key, envelope in entries:
+            self._write(self._path(namespace, key), envelope)
+
+    def _write(self, path: Path, envelope: dict) -> None:
+        temporary_file = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_file = path.with_name(
+                f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+            )
+            with temporary_file.open("w", encoding="utf-8") as output:
+                json.dump(envelope, output, ensure_ascii=False, sort_keys=True)
+                output.flush()
+                os.fsync(output.fileno())
+            os.replace(temporary_file, path)
+        except (OSError, TypeError, ValueError):
+            if temporary_file is not None:
+                try:
+                    temporary_file.unlink()
+                except OSError:
+                    pass
+
+    def touch(self, namespace: str, key: str) -> None:
+        # Updating the mtime records the access without rewriting the entry.
+        try:
+            os.utime(self._path(namespace, key))
+        except OSError:
+            pass
+
+    def record(self, namespace: str, hit: bool) -> None:
+        outcome = "hits" if hit else "misses"
+        with self._lock:
+            self._counts[(namespace, outcome)] = (
+                self._counts.get((namespace, outcome), 0) + 1
+            )
+            self._pending += 1
+            due = (
+                self._pending >= COUNTER_FLUSH_LOOKUPS
+                or time.monotonic() - self._flushed_at >= COUNTER_FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Add buffered lookup counts to the counter files."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+            for (namespace, outcome), count in counts.items():
+                self._add(self.directory / STATS_DIR / f"{namespace}.{outcome}", count)
+
+    def _add(self, path: Path, count: int) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            return
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            count += _read_counter(descriptor)
+            os.pwrite(descriptor, COUNTER_FORMAT.pack(count), 0)
+            os.ftruncate(descriptor, COUNTER_FORMAT.size)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
+
+    def counters(self) -> dict[str, dict[str, int]]:
+        self.flush()
+        counts = {}
+        try:
+            counters = list(os.scandir(self.directory / STATS_DIR))
+        except OSError:
+            return counts
+        for counter in counters:
+            namespace, _, outcome = counter.name.rpartition(".")
+            if outcome not in ("hits", "misses"):
+                continue
+            try:
+                descriptor = os.open(counter.path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_SH)
+                count = _read_counter(descriptor)
+            except OSError:
+                continue
+            finally:
+                os.close(descriptor)
+            counts.setdefault(namespace, {"hits": 0, "misses": 0})[outcome] = count
+        return counts
+
+    def _entries(self, directory: Path) -> list[tuple[float, int, Path]]:
+        """List entries as (last use, size, path), skipping hidden files."""
+        entries = []
+        try:
+            children = list(os.scandir(directory))
+        except OSError:
+            return entries
+        for child in children:
+            if child.name.startswith("."):
+                continue
+            try:
+                if child.is_dir(follow_symlinks=False):
+                    entries.extend(self._entries(Path(child.path)))
+                elif child.name.endswith(".json"):
+                    stat = child.stat(follow_symlinks=False)
+                    entries.append((stat.st_mtime, stat.st_size, Path(child.path)))
+            except OSError:
+                continue
+        return entries
+
+    def usage(self) -> tuple[int, int]:
+        entries = self._entries(self.directory)
+        return len(entries), sum(size for _mtime, size, _path in entries)
+
+    def prune(self, max_bytes: int, max_entries: int, max_age: float) -> dict:
+        self._remove_stale_temporaries()
+        entries = sorted(self._entries(self.directory))
+        total_bytes = sum(size for _mtime, size, _path in entries)
+        remaining = len(entries)
+        cutoff = time.time() - max_age
+        removed = {"entries": 0, "bytes": 0}
+        for _mtime, size, path in entries:
+            over_bytes = max_bytes and total_bytes > max_bytes
+            over_entries = max_entries and remaining > max_entries
+            if not over_bytes and not over_entries:
+                if not max_age:
+                    break
+                if not self._stored_before(path, cutoff):
+                    continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total_bytes -= size
+            remaining -= 1
+            removed["entries"] += 1
+            removed["bytes"] += size
+        return removed
+
+    def _stored_before(self, path: Path, cutoff: float) -> bool:
+        # Recency overwrites the mtime, so the write time lives in the envelope.
+        try:
+            with path.open("r", encoding="utf-8") as cache_file:
+                stored_at = json.load(cache_file).get("stored_at")
+        except (OSError, ValueError, AttributeError):
+            return True
+        return not isinstance(stored_at, (int, float)) or stored_at < cutoff
+
+    def _remove_stale_temporaries(self) -> None:
+        cutoff = time.time() - STALE_TEMPORARY_SECONDS
+        for path in self.directory.glob("**/.*.tmp"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _read_counter(descriptor: int) -> int:
+    data = os.pread(descriptor, COUNTER_FORMAT.size, 0)
+    if len(data) != COUNTER_FORMAT.size:
+        return 0
+    return COUNTER_FORMAT.unpack(data)[0]
+
+
+class MemoryTier:
+    """Byte-bounded in-process LRU of validated results.
+
+    Hits skip the backend read, decompression, and checksum entirely. Results
+    are shared between callers and must be treated as read-only. Sizes count
+    the UTF-8 content and JSON metadata, not Python object overhead.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        # When each entry's backend recency was last refreshed.
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple | None:
+        """Return ``(result, fetched_at)`` and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: str, result, fetched_at: float) -> None:
+        size = len(result.content.encode("utf-8")) + len(
+            json.dumps(result.metadata, ensure_ascii=False)
+        )
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (result, fetched_at, size)
+            self._touched[key] = time.monotonic()
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def touch_due(self, key: str) -> bool:
+        """Return whether a hit on ``key`` should refresh the backend recency."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._touched.get(key, now) < MEMORY_TOUCH_SECONDS:
+                return False
+            self._touched[key] = now
+            return True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+            del self._touched[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_backends: dict[tuple[str, Path], CacheBackend] = {}
+_memory_tiers: dict[tuple[Path, int], MemoryTier] = {}
+
+
+def _cache_backend() -> CacheBackend:
+    """Return the configured backend, reusing one instance per directory."""
+    name = os.environ.get("CARNIVORE_CACHE_BACKEND", "file")
+    if name not in CACHE_BACKENDS:
+        name = "file"
+    directory = _cache_dir()
+    backend = _backends.get((name, directory))
+    if backend is None:
+        if name == "sqlite":
+            from .cache_sqlite import SqliteCacheBackend
+
+            backend = SqliteCacheBackend(directory)
+        else:
+            backend = FileCacheBackend(directory)
+        _backends[(name, directory)] = backend
+    return backend
+
+
+def _payload_encoding() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zlib":
+        try:
+            return zlib.decompress(data)
+        except zlib.error as error:
+            raise ValueError(str(error)) from error
+    if encoding == "zstd" and zstandard is not None:
+        try:
+            return zstandard.ZstdDecompressor().decompress(data)
+        except zstandard.ZstdError as error:
+            raise ValueError(str(error)) from error
+    raise ValueError(f"Unsupported payload encoding: {encoding}")
+
+
+def _memory_tier() -> MemoryTier | None:
+    """Return the hot tier for the cache directory, or None when disabled."""
+    max_bytes = _cache_memory_bytes()
+    if not max_bytes:
+        return None
+    tier_key = (_cache_dir(), max_bytes)
+    tier = _memory_tiers.get(tier_key)
+    if tier is None:
+        tier = _memory_tiers[tier_key] = MemoryTier(max_bytes)
+    return tier
+
+
+def _envelope(key: str, schema_version: int, payload: dict) -> dict:
+    """Wrap a payload, compressing it when it is large enough to benefit.
+
+    Compressed payloads are stored as base64 text with ``payload_encoding``
+    naming the codec, and their checksum covers the compressed bytes so a
+    corrupt entry is rejected before it is decompressed.
+    """
+    envelope = {"schema_version": schema_version, "key": key, "stored_at": time.time()}
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+    if len(encoded) < COMPRESSION_MIN_BYTES:
+        envelope["payload"] = payload
+        envelope["payload_sha256"] = _payload_checksum(payload)
+        return envelope
+    encoding = _payload_encoding()
+    compressed = _compress(encoded, encoding)
+    envelope["payload_encoding"] = encoding
+    envelope["payload"] = base64.b64encode(compressed).decode("ascii")
+    envelope["payload_sha256"] = hashlib.sha256(compressed).hexdigest()
+    return envelope
+
+
+def _valid_payload(
+    envelope, key: str, schema_version: int, legacy: bool = True
+) -> dict | None:
+    if not isinstance(envelope, dict):
+        return None
+    versions = (LEGACY_SCHEMA_VERSION, schema_version) if legacy else (schema_version,)
+    if envelope.get("schema_version") not in versions:
+        return None
+    if envelope.get("key") != key:
+        return None
+    payload = envelope.get("payload")
+    encoding = envelope.get("payload_encoding")
+    if envelope.get("schema_version") == LEGACY_SCHEMA_VERSION or encoding is None:
+        if not isinstance(payload, dict):
+            return None
+        if envelope.get("payload_sha256") != _payload_checksum(payload):
+            return None
+        return payload
+    if not isinstance(payload, str):
+        return None
+    compressed = base64.b64decode(payload, validate=True)
+    if envelope.get("payload_sha256") != hashlib.sha256(compressed).hexdigest():
+        return None
+    payload = json.loads(_decompress(compressed, encoding))
+    return payload if isinstance(payload, dict) else None
+
+
+def _result_payload(result) -> dict:
+    return {
+        "format": result.format,
+        "content": result.content,
+        "metadata": result.metadata,
+        "fetched_at": time.time(),
+    }
+
+
+def _fetched_at(payload: dict, envelope: dict) -> float:
+    # Entries written before fetch timestamps fall back to the store time.
+    for fetched_at in (payload.get("fetched_at"), envelope.get("stored_at")):
+        if isinstance(fetched_at, (int, float)) and not isinstance(fetched_at, bool):
+            return float(fetched_at)
+    return 0.0
+
+
 def read_fetch_result(key: str, result_type):
     """Read a validated result, treating every cache problem as a miss."""
+    entry = read_fetch_entry(key, result_type)
+    return entry[0] if entry is not None else None
+
+
+def read_fetch_entry(key: str, result_type, *, fresh_only: bool = False):
+    """Read a validated result together with its ``cache_freshness``.
+
+    Returns ``(result, freshness)`` for fresh and stale entries. Expired
+    entries are misses, like every other cache problem. With ``fresh_only``,
+    stale entries and misses return ``None`` without being counted, for
+    callers that fall back to a full fetch which looks the key up again.
+    """
     if not _cache_enabled():
         return None
+    memory = _memory_tier()
+    if memory is not None:
+        remembered = memory.get(key)
+        if remembered is not None:
+            freshness = cache_freshness(remembered[1])
+            if fresh_only and freshness != FRESH:
+                return None
+            if freshness != EXPIRED:
+                if memory.touch_due(key):
+                    _cache_backend().touch(RESULT_NAMESPACE, key)
+                _trace_cache_hit()
+                metrics.cache_lookup(RESULT_NAMESPACE, hit=True, tier="memory")
+                return remembered[0], freshness
+            # Another process may have stored a newer result.
+            memory.discard(key)
+    backend = _cache_backend()
+    entry = None
     try:
-        with _cache_path(key).open("r", encoding="utf-8") as cache_file:
-            envelope = json.load(cache_file)
-        if envelope.get("schema_version") != CACHE_SCHEMA_VERSION:
-            return None
-        payload = envelope.get("payload")
-        if not isinstance(payload, dict) or envelope.get("key") != key:
-            return None
-        if envelope.get("payload_sha256") != _payload_checksum(payload):
-            return None
-        if payload.get("format") not in SUPPORTED_FORMATS or not isinstance(
-            payload.get("content"), str
+        envelope = backend.read(RESULT_NAMESPACE, key)
+        payload = _valid_payload(envelope, key, CACHE_SCHEMA_VERSION)
+        metadata = payload.get("metadata", {}) if payload is not None else None
+        if (
+            payload is not None
+            and payload.get("format") in SUPPORTED_FORMATS
+            and isinstance(payload.get("content"), str)
+            and isinstance(metadata, dict)
         ):
-            return None
-        metadata = payload.get("metadata", {})
-        if not isinstance(metadata, dict):
-            return None
-        result = result_type(
-            format=payload["format"], content=payload["content"], metadata=metadata
-        )
-        _trace_cache_hit()
-        return result
-    except (OSError, TypeError, ValueError, json.JSONDecodeError):
+            result = result_type(
+                format=payload["format"], content=payload["content"], metadata=metadata
+            )
+            fetched_at = _fetched_at(payload, envelope)
+            freshness = cache_freshness(fetched_at)
+            if freshness != EXPIRED:
+                entry = (result, freshness)
+                if memory is not None:
+                    memory.put(key, result, fetched_at)
+    except (TypeError, ValueError):
+        entry = None
+    if fresh_only and (entry is None or entry[1] != FRESH):
         return None
+    _record_lookup(backend, RESULT_NAMESPACE, hit=entry is not None)
+    if entry is None:
+        return None
+    backend.touch(RESULT_NAMESPACE, key)
+    _trace_cache_hit()
+    return entry
 
 
 def write_fetch_result(key: str, result) -> None:
-    """Atomically persist a result; cache failures must not affect fetching."""
+    """Persist a result; cache failures must not affect fetching."""
+    write_fetch_results([(key, result)])
+
+
+def write_fetch_results(items) -> None:
+    """Persist several (key, result) pairs in one backend batch."""
     if not _cache_enabled():
         return
-    temporary_file = None
+    memory = _memory_tier()
+    entries = []
+    for key, result in items:
+        payload = _result_payload(result)
+        entries.append(
+            (RESULT_NAMESPACE, key, _envelope(key, CACHE_SCHEMA_VERSION, payload))
+        )
+        if memory is not None:
+            memory.put(key, result, payload["fetched_at"])
+    _write(entries)
+
+
+def read_fetch_failure(key: str) -> FetchError | None:
+    """Read a cached deterministic failure that is younger than its TTL.
+
+    ``CARNIVORE_CACHE_FAILURE_TTL`` bounds how long a failure is replayed,
+    independently of the result TTL; ``0`` disables negative caching.
+    """
+    ttl = _seconds("CARNIVORE_CACHE_FAILURE_TTL", DEFAULT_CACHE_FAILURE_TTL)
+    if not _cache_enabled() or not ttl:
+        return None
+    backend = _cache_backend()
+    error = None
     try:
-        payload = {
-            "format": result.format,
-            "content": result.content,
-            "metadata": result.metadata,
-        }
-        envelope = {
-            "schema_version": CACHE_SCHEMA_VERSION,
-            "key": key,
-            "payload": payload,
-            "payload_sha256": _payload_checksum(payload),
-        }
-        cache_file = _cache_path(key)
-        cache_file.parent.mkdir(parents=True, exist_ok=True)
-        temporary_file = cache_file.with_name(
-            f".{cache_file.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        payload = _valid_payload(
+            backend.read(FAILURE_NAMESPACE, key),
+            key,
+            FAILURE_SCHEMA_VERSION,
+            legacy=False,
         )
-        with temporary_file.open("w", encoding="utf-8") as output:
-            json.dump(envelope, output, ensure_ascii=False, sort_keys=True)
-            output.flush()
-            os.fsync(output.fileno())
-        os.replace(temporary_file, cache_file)
+        if (
+            payload is not None
+            and payload.get("code") in ERROR_CODES
+            and isinstance(payload.get("message"), str)
+            and isinstance(payload.get("failed_at"), (int, float))
+            and time.time() - payload["failed_at"] < ttl
+        ):
+            status = payload.get("status")
+            error = FetchError(
+                payload["code"],
+                payload["message"],
+                status=status if isinstance(status, int) else None,
+            )
+    except (TypeError, ValueError):
+        error = None
+    _record_lookup(backend, FAILURE_NAMESPACE, hit=error is not None)
+    return error
+
+
+def write_fetch_failure(key: str, error: FetchError) -> None:
+    if not _cache_enabled():
+        return
+    if not _seconds("CARNIVORE_CACHE_FAILURE_TTL", DEFAULT_CACHE_FAILURE_TTL):
+        return
+    payload = {
+        "code": error.code,
+        "message": error.message,
+        "status": error.status,
+        "failed_at": time.time(),
+    }
+    _write([(FAILURE_NAMESPACE, key, _envelope(key, FAILURE_SCHEMA_VERSION, payload))])
+
+
+def read_stage(stage: str, key: str) -> dict | None:
+    """Read an intermediate stage payload; every cache problem is a miss.
+
+    Stage entries are versioned separately from final results so a stage
+    format change does not drop final results. Callers validate the payload
+    shape for their stage.
+    """
+    if not _cache_enabled():
+        return None
+    backend = _cache_backend()
+    try:
+        payload = _valid_payload(backend.read(stage, key), key, STAGE_SCHEMA_VERSION)
+    except (TypeError, ValueError):
+        payload = None
+    _record_lookup(backend, stage, hit=payload is not None)
+    if payload is not None:
+        backend.touch(stage, key)
+    return payload
+
+
+def write_stage(stage: str, key: str, payload: dict) -> None:
+    if not _cache_enabled():
+        return
+    _write([(stage, key, _envelope(key, STAGE_SCHEMA_VERSION, payload))])
+
+
+def _record_lookup(backend: CacheBackend, namespace: str, hit: bool) -> None:
+    backend.record(namespace, hit=hit)
+    metrics.cache_lookup(namespace, hit=hit)
+
+
+def _write(entries: list[tuple[str, str, dict]]) -> None:
+    try:
+        _cache_backend().write_many(entries)
     except (OSError, TypeError, ValueError):
-        if temporary_file is not None:
-            try:
-                temporary_file.unlink()
-            except OSError:
-                pass
+        return
+    _maybe_prune()
+
+
+def prune_cache(
+    max_bytes: int | None = None,
+    max_entries: int | None = None,
+    max_age: float = 0,
+) -> dict:
+    """Evict least recently used entries until the cache fits its budget.
+
+    A budget of zero means unlimited. ``max_age`` also evicts entries stored
+    more than that many seconds ago. Returns the removed entry count and bytes.
+    """
+    max_bytes = _cache_max_bytes() if max_bytes is None else max_bytes
+    max_entries = _cache_max_entries() if max_entries is None else max_entries
+    return _cache_backend().prune(max_bytes, max_entries, max_age)
+
+
+def _maybe_prune() -> None:
+    """Prune after writes, checking the budget at most once per interval."""
+    if not _cache_max_bytes() and not _cache_max_entries():
+        return
+    marker = _cache_dir() / PRUNE_MARKER
+    try:
+        if time.time() - marker.stat().st_mtime < PRUNE_INTERVAL_SECONDS:
+            return
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return
+    try:
+        marker.touch()
+    except OSError:
+        return
+    prune_cache()
+
+
+def cache_stats() -> dict:
+    """Report entry count, size, and per-namespace hit rates.
+
+    Backend lookups count only reads that reached the backend. When the
+    in-memory tier is enabled, its process-local counters are under
+    ``memory``.
+    """
+    backend = _cache_backend()
+    entries, size = backend.usage()
+    lookups = backend.counters()
+    for counts in lookups.values():
+        total = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = counts["hits"] / total if total else 0.0
+    stats = {
+        "backend": backend.name,
+        "directory": str(_cache_dir()),
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": _cache_max_bytes(),
+        "max_entries": _cache_max_entries(),
+        "lookups": dict(sorted(lookups.items())),
+    }
+    memory = _memory_tier()
+    if memory is not None:
+        stats["memory"] = memory.stats()
+    return stats
 
 
 def cached():
@@ -0,0 +1,272 @@
+"""SQLite cache backend selected with ``CARNIVORE_CACHE_BACKEND=sqlite``.
+
+All envelopes live in one WAL-mode database in the cache directory, so many
+processes can read while one writes, and a write costs one transaction
+instead of a temporary file, fsync, and rename per entry. Recency updates and
+hit counters are buffered and flushed with the next write, when the buffer
+fills, or at exit, so cache hits do not each need a write transaction.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .cache import CacheBackend
+
+
+DATABASE_NAME = "cache.sqlite3"
+BUSY_TIMEOUT_MILLISECONDS = 5000
+PENDING_FLUSH_THRESHOLD = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    envelope TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+CREATE TABLE IF NOT EXISTS counters (
+    namespace TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (namespace, outcome)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteCacheBackend(CacheBackend):
+    name = "sqlite"
+
+    def __init__(self, directory: Path):
+        self.path = directory / DATABASE_NAME
+        self._connection = None
+        self._lock = threading.Lock()
+        self._touched: dict[tuple[str, str], float] = {}
+        self._counts: dict[tuple[str, str], int] = {}
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path,
+                timeout=BUSY_TIMEOUT_MILLISECONDS / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            try:
+                # auto_vacuum only takes effect before the first table exists.
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(SCHEMA)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+    def read(self, namespace: str, key: str) -> dict | None:
+        try:
+            with self._lock:
+                row = (
+                    self._connect()
+                    .execute(
+                        "SELECT envelope FROM entries WHERE namespace = ? AND key = ?",
+                        (namespace, key),
+                    )
+                    .fetchone()
+                )
+        except (sqlite3.Error, OSError):
+            return None
+        if row is None:
+            return None
+        try:
+            envelope = json.loads(row[0])
+        except ValueError:
+            return None
+        return envelope if isinstance(envelope, dict) else None
+
+    def write_many(self, entries: list[tuple[str, str, dict]]) -> None:
+        now = time.time()
+        rows = []
+        for namespace, key, envelope in entries:
+            encoded = json.dumps(envelope, ensure_ascii=False, sort_keys=True)
+            rows.append(
+                (
+                    namespace,
+                    key,
+                    encoded,
+                    len(encoded.encode("utf-8")),
+                    envelope.get("stored_at", now),
+                    now,
+                )
+            )
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO entries "
+                        "(namespace, key, envelope, size, stored_at, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    self._flush_pending(connection)
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+        except (sqlite3.Error, OSError):
+            return
+
+    def touch(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._touched[(namespace, key)] = time.time()
+        self._flush_if_full()
+
+    def record(self, namespace: str, hit: bool) -> None:
+        outcome = "hits" if hit else "misses"
+        with self._lock:
+            self._counts[(namespace, outcome)] = (
+                self._counts.get((namespace, outcome), 0) + 1
+            )
+        self._flush_if_full()
+
+    def _flush_if_full(self) -> None:
+        if len(self._touched) + len(self._counts) >= PENDING_FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered recency updates and counters in one transaction."""
+        try:
+            with self._lock:
+                if not self._touched and not self._counts:
+                    return
+                connection = self._connect()
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    self._flush_pending(connection)
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+        except (sqlite3.Error, OSError):
+            return
+
+    def _flush_pending(self, connection: sqlite3.Connection) -> None:
+        touched, self._touched = self._touched, {}
+        counts, self._counts = self._counts, {}
+        connection.executemany(
+            "UPDATE entries SET last_used = max(last_used, ?) "
+            "WHERE namespace = ? AND key = ?",
+            [(used, namespace, key) for (namespace, key), used in touched.items()],
+        )
+        connection.executemany(
+            "INSERT INTO counters (namespace, outcome, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (namespace, outcome) DO UPDATE "
+            "SET count = count + excluded.count",
+            [
+                (namespace, outcome, count)
+                for (namespace, outcome), count in counts.items()
+            ],
+        )
+
+    def counters(self) -> dict[str, dict[str, int]]:
+        self.flush()
+        counts = {}
+        try:
+            with self._lock:
+                rows = (
+                    self._connect()
+                    .execute("SELECT namespace, outcome, count FROM counters")
+                    .fetchall()
+                )
+        except (sqlite3.Error, OSError):
+            return counts
+        for namespace, outcome, count in rows:
+            counts.setdefault(namespace, {"hits": 0, "misses": 0})[outcome] = count
+        return counts
+
+    def usage(self) -> tuple[int, int]:
+        try:
+            with self._lock:
+                count, size = (
+                    self._connect()
+                    .execute("SELECT count(*), coalesce(sum(size), 0) FROM entries")
+                    .fetchone()
+                )
+        except (sqlite3.Error, OSError):
+            return 0, 0
+        return count, size
+
+    def prune(self, max_bytes: int, max_entries: int, max_age: float) -> dict:
+        self.flush()
+        removed = {"entries": 0, "bytes": 0}
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    if max_age:
+                        self._delete(
+                            connection,
+                            connection.execute(
+                                "SELECT namespace, key, size FROM entries "
+                                "WHERE stored_at < ?",
+                                (time.time() - max_age,),
+                            ).fetchall(),
+                            removed,
+                        )
+                    count, size = connection.execute(
+                        "SELECT count(*), coalesce(sum(size), 0) FROM entries"
+                    ).fetchone()
+                    victims = []
+                    if (max_bytes and size > max_bytes) or (
+                        max_entries and count > max_entries
+                    ):
+                        for namespace, key, entry_size in connection.execute(
+                            "SELECT namespace, key, size FROM entries "
+                            "ORDER BY last_used"
+                        ):
+                            if not (max_bytes and size > max_bytes) and not (
+                                max_entries and count > max_entries
+                            ):
+                                break
+                            victims.append((namespace, key, entry_size))
+                            size -= entry_size
+                            count -= 1
+                    self._delete(connection, victims, removed)
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+                if removed["entries"]:
+                    connection.execute("PRAGMA incremental_vacuum")
+        except (sqlite3.Error, OSError):
+            pass
+        return removed
+
+    def _delete(self, connection, rows, removed: dict) -> None:
+        connection.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?",
+            [(namespace, key) for namespace, key, _size in rows],
+        )
+        removed["entries"] += len(rows)
+        removed["bytes"] += sum(size for _namespace, _key, size in rows)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
@@ -1,57 +1,256 @@
 import argparse
 import asyncio
-import io
 import json
 import sys
 
-from ruamel.yaml import YAML
-
+from . import metrics
+from .cache import cache_stats, prune_cache
+from .metrics import DEFAULT_DUMP_INTERVAL_SECONDS
 from .models import (
+    DEFAULT_BATCH_CONCURRENCY,
     ERROR_INTERNAL,
     ERROR_INVALID_INPUT,
     FetchError,
     FetchRequest,
+    request_from_fields,
 )
-from .pipeline import fetch
-
-
-def _frontmatter(metadata: dict, content: str) -> str:
-    stream = io.StringIO()
-    stream.write("---\n")
-    YAML().dump(metadata, stream)
-    stream.write("---\n\n")
-    stream.write(content)
-    return stream.getvalue()
+from .output import (
+    error_envelope,
+    frontmatter,
+    print_envelope,
+    result_envelope,
+    result_fields,
+)
+from .pipeline import FetchPipeline, fetch_many
 
 
 def _parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Fetch readable web content")
-    parser.add_argument("url", help="Absolute HTTP(S) URL to fetch")
-    parser.add_argument("--format", default="markdown")
+    parser.add_argument("url", nargs="?", help="Absolute HTTP(S) URL to fetch")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help=(
+            "Fetch every URL or JSON request line in FILE (- for stdin) and "
+            "stream one JSON envelope per line as each completes"
+        ),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help="Maximum concurrent fetches in batch mode",
+    )
+    parser.add_argument(
+        "--format",
+        default="markdown",
+        help=(
+            "Output format, or a comma-separated list of formats rendered once "
+            "and reported together with --output json"
+        ),
+    )
     parser.add_argument("--output", default="raw")
     parser.add_argument("--resource-mode", default="omit")
+    parser.add_argument(
+        "--markdown-engine",
+        default="pandoc",
+        help="Markdown converter: pandoc or the in-process native engine",
+    )
+    parser.add_argument(
+        "--loading-strategy",
+        default="browser",
+        help=(
+            "How to load the page: browser renders it, http fetches the "
+            "document without a browser, auto renders only when needed, and "
+            "adaptive renders but stops waiting once the page is quiet"
+        ),
+    )
     parser.add_argument(
         "--timeout",
         type=float,
         default=30.0,
         help="End-to-end fetch budget in seconds",
     )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Include per-stage timings in JSON envelopes",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help=(
+            "Write Prometheus-format metrics to FILE periodically and when "
+            "the run finishes"
+        ),
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=DEFAULT_DUMP_INTERVAL_SECONDS,
+        help="Seconds between --metrics-file writes",
+    )
+    return parser
+
+
+def _cache_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="carnivore cache", description="Inspect or prune the fetch cache"
+    )
+    parser.add_argument("action", choices=("stats", "prune"))
+    parser.add_argument("--output", default="raw")
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        help="Byte budget for prune; defaults to CARNIVORE_CACHE_MAX_BYTES",
+    )
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        help="Entry budget for prune; defaults to CARNIVORE_CACHE_MAX_ENTRIES",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=0,
+        help="Also prune entries stored more than this many seconds ago",
+    )
+    return parser
+
+
+def _serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="carnivore serve",
+        description="Serve fetches over a local HTTP/JSON API",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to bind")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help="Size of the warm browser, worker, and converter pools",
+    )
     return parser
 
 
+async def _run_serve(argv) -> int:
+    args = _serve_parser().parse_args(argv)
+    if args.concurrency <= 0:
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Concurrency must be positive"), "json"
+        )
+    from .serve import serve
+
+    return await serve(args.host, args.port, args.concurrency)
+
+
+def _run_cache(argv) -> int:
+    args = _cache_parser().parse_args(argv)
+    if args.output not in ("raw", "json"):
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Unsupported output mode"), args.output
+        )
+    if args.action == "stats":
+        report = cache_stats()
+    else:
+        report = {
+            "removed": prune_cache(
+                max_bytes=args.max_bytes,
+                max_entries=args.max_entries,
+                max_age=args.max_age,
+            ),
+            **cache_stats(),
+        }
+    if args.output == "json":
+        print_envelope({"ok": True, **report})
+        return 0
+    if "removed" in report:
+        print(
+            f"removed: {report['removed']['entries']} entries, "
+            f"{report['removed']['bytes']} bytes"
+        )
+    print(f"backend: {report['backend']}")
+    print(f"directory: {report['directory']}")
+    print(f"entries: {report['entries']}")
+    print(f"bytes: {report['bytes']}")
+    for namespace, counts in report["lookups"].items():
+        print(
+            f"{namespace}: {counts['hits']} hits, {counts['misses']} misses, "
+            f"{counts['hit_rate']:.1%} hit rate"
+        )
+    if "memory" in report:
+        memory = report["memory"]
+        print(
+            f"memory: {memory['entries']} entries, {memory['bytes']} bytes, "
+            f"{memory['hits']} hits, {memory['misses']} misses"
+        )
+    return 0
+
+
 async def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["cache"]:
+        return _run_cache(argv[1:])
+    if argv[:1] == ["serve"]:
+        return await _run_serve(argv[1:])
     args = _parser().parse_args(argv)
+    if args.metrics_file is None:
+        return await _run_fetch(args)
+    if args.metrics_interval <= 0:
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Metrics interval must be positive"),
+            "json" if args.batch is not None else args.output,
+        )
+    metrics.enable()
+    dumping = asyncio.ensure_future(
+        metrics.dump_periodically(args.metrics_file, args.metrics_interval)
+    )
+    try:
+        return await _run_fetch(args)
+    finally:
+        dumping.cancel()
+        await asyncio.gather(dumping, return_exceptions=True)
+
+
+async def _run_fetch(args) -> int:
+    if args.batch is not None:
+        if args.url is not None:
+            return _report_error(
+                FetchError(ERROR_INVALID_INPUT, "Use either a URL or --batch"),
+                "json",
+            )
+        return await _run_batch(args)
     if args.output not in ("raw", "json"):
         return _report_error(
             FetchError(ERROR_INVALID_INPUT, "Unsupported output mode"), args.output
         )
+    if args.url is None:
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "A URL or --batch is required"),
+            args.output,
+        )
+    formats = args.format.split(",")
+    pipeline = FetchPipeline()
+    try:
+        if len(formats) > 1:
+            return await _run_formats(pipeline, args, formats)
+        return await _run_single(pipeline, args)
+    finally:
+        # Output is already printed; finish any stale-result refresh.
+        await pipeline.aclose()
+
+
+async def _run_single(pipeline: FetchPipeline, args) -> int:
     try:
-        result = await fetch(
+        result = await pipeline.fetch(
             FetchRequest(
                 url=args.url,
                 format=args.format,
                 resource_mode=args.resource_mode,
                 timeout=args.timeout,
+                markdown_engine=args.markdown_engine,
+                loading_strategy=args.loading_strategy,
             )
         )
     except FetchError as error:
@@ -60,37 +259,135 @@ async def main(argv=None) -> int:
         return _report_error(FetchError(ERROR_INTERNAL), args.output)
 
     if args.output == "json":
-        print(
-            json.dumps(
-                {
-                    "ok": True,
-                    "format": result.format,
-                    "content": result.content,
-                    "metadata": result.metadata,
-                },
-                ensure_ascii=False,
-                sort_keys=True,
-            )
-        )
+        print_envelope(result_envelope(result, timings=args.timings))
     elif result.format == "markdown":
-        print(_frontmatter(result.metadata, result.content), end="")
+        print(frontmatter(result.metadata, result.content), end="")
     else:
         print(result.content, end="")
     return 0
 
 
+async def _run_formats(pipeline: FetchPipeline, args, formats: list[str]) -> int:
+    if args.output != "json":
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Multiple formats require JSON output"),
+            args.output,
+        )
+    try:
+        results = await pipeline.fetch_formats(
+            FetchRequest(
+                url=args.url,
+                resource_mode=args.resource_mode,
+                timeout=args.timeout,
+                markdown_engine=args.markdown_engine,
+                loading_strategy=args.loading_strategy,
+            ),
+            formats,
+        )
+    except FetchError as error:
+        return _report_error(error, args.output)
+    except Exception:
+        return _report_error(FetchError(ERROR_INTERNAL), args.output)
+    print_envelope(
+        {
+            "ok": True,
+            "results": [
+                result_fields(result, timings=args.timings)
+                for result in results.values()
+            ],
+        }
+    )
+    return 0
+
+
+async def _run_batch(args) -> int:
+    if args.concurrency <= 0:
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Concurrency must be positive"), "json"
+        )
+    if "," in args.format:
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Batch mode fetches one format per line"),
+            "json",
+        )
+    try:
+        if args.batch == "-":
+            # Read stdin up front so a slow producer cannot stall the event loop.
+            lines = sys.stdin.readlines()
+            stream = None
+        else:
+            stream = lines = open(args.batch, encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Batch input cannot be read"), "json"
+        )
+
+    line_numbers = []
+    failed = False
+
+    def requests():
+        nonlocal failed
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                request = _batch_request(line, args)
+            except FetchError as error:
+                failed = True
+                print_envelope(error_envelope(error, line=line_number))
+                continue
+            line_numbers.append(line_number)
+            yield request
+
+    try:
+        async for item in fetch_many(requests(), concurrency=args.concurrency):
+            line_number = line_numbers[item.index]
+            if item.error is not None:
+                failed = True
+                envelope = error_envelope(
+                    item.error, line=line_number, url=item.request.url
+                )
+            else:
+                envelope = result_envelope(
+                    item.result,
+                    timings=args.timings,
+                    line=line_number,
+                    url=item.request.url,
+                )
+            print_envelope(envelope)
+    except (OSError, UnicodeDecodeError):
+        return _report_error(
+            FetchError(ERROR_INVALID_INPUT, "Batch input cannot be read"), "json"
+        )
+    finally:
+        if stream is not None:
+            stream.close()
+    return 1 if failed else 0
+
+
+def _batch_request(line: str, args) -> FetchRequest:
+    defaults = {
+        "format": args.format,
+        "resource_mode": args.resource_mode,
+        "timeout": args.timeout,
+        "markdown_engine": args.markdown_engine,
+        "loading_strategy": args.loading_strategy,
+        # Batch renders yield to interactive ones sharing the scheduler.
+        "priority": "batch",
+    }
+    if not line.startswith("{"):
+        return FetchRequest(url=line, **defaults)
+    try:
+        fields = json.loads(line)
+    except json.JSONDecodeError:
+        raise FetchError(ERROR_INVALID_INPUT, "Batch line is not valid JSON")
+    return request_from_fields(fields, defaults)
+
+
 def _report_error(error: FetchError, output: str) -> int:
     if output == "json":
-        print(
-            json.dumps(
-                {
-                    "ok": False,
-                    "error": {"code": error.code, "detail": error.message},
-                },
-                ensure_ascii=False,
-                sort_keys=True,
-            )
-        )
+        print_envelope(error_envelope(error))
     else:
         print(error, file=sys.stderr)
     return 2 if error.code == ERROR_INVALID_INPUT else 1
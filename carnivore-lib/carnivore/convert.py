@@ -1,7 +1,18 @@
+import asyncio
+import http.client
+import json
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
 from bs4 import BeautifulSoup
 
+from . import gfm
+from .models import MAX_OUTPUT_BYTES
 from .process import invoke_command
-from .render import MAX_OUTPUT_BYTES
 
 
 RESOURCE_TAGS = (
@@ -15,6 +26,18 @@ RESOURCE_TAGS = (
     "embed",
     "svg",
 )
+PANDOC_FORMAT = {"from": "html", "to": "gfm-raw_html", "wrap": "none"}
+DEFAULT_PANDOC_CONNECTIONS = 4
+PANDOC_SERVER_STARTUP_SECONDS = 10.0
+PANDOC_SERVER_RETRY_SECONDS = 30.0
+# Budget for one server conversion when the caller does not pass one.
+PANDOC_REQUEST_TIMEOUT_SECONDS = 30.0
+# pandoc-server's own limit, 2 seconds by default. Callers' budgets are
+# enforced by ``PandocServer.convert``; this only has to stay out of the way.
+PANDOC_SERVER_TIMEOUT_SECONDS = 3600
+# The server listens inside its own network namespace, so any port is free.
+PANDOC_SERVER_PORT = 3030
+PANDOC_RELAY = Path(__file__).with_name("pandoc_relay.py")
 
 
 def remove_resources(html: str) -> str:
@@ -40,7 +63,228 @@ async def embed_html(url: str, html: str) -> str:
     )
 
 
-async def html_to_markdown(html: str) -> str:
+class PandocServer:
+    """Convert through a managed local ``pandoc-server`` process.
+
+    The server is started on demand in a private network namespace, since
+    it cannot be bound to loopback only, and reached through a Unix socket
+    relayed by ``pandoc_relay.py`` over a small pool of keep-alive
+    connections. It is restarted after it exits or a conversion times out.
+    Whenever the server cannot be used, including where ``unshare`` cannot
+    create the namespace, ``html_to_markdown`` falls back to the one-shot
+    ``pandoc`` subprocess, and a failed start is not retried for
+    ``PANDOC_SERVER_RETRY_SECONDS``.
+    """
+
+    def __init__(
+        self,
+        connections: int = DEFAULT_PANDOC_CONNECTIONS,
+        command: str = "pandoc-server",
+    ):
+        if connections <= 0:
+            raise ValueError("Pandoc connection pool size must be positive")
+        self.connections = connections
+        self.command = command
+        self._socket_dir = None
+        self._process = None
+        self._idle: asyncio.Queue | None = None
+        self._lock = asyncio.Lock()
+        self._unavailable_until = 0.0
+
+    async def start(self) -> None:
+        async with self._lock:
+            await self._start_locked()
+
+    async def _start_locked(self) -> None:
+        if self._process is not None and self._process.returncode is None:
+            return
+        await self._stop_locked()
+        if time.monotonic() < self._unavailable_until:
+            raise RuntimeError("Pandoc server is unavailable")
+        try:
+            self._socket_dir = tempfile.mkdtemp(prefix="carnivore-pandoc-")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+                listener.bind(self._socket_path)
+                listener.listen()
+                # The relay is the namespace's init process, so killing the
+                # ``unshare`` process also stops pandoc-server.
+                self._process = await asyncio.create_subprocess_exec(
+                    "unshare",
+                    "--net",
+                    "--map-root-user",
+                    "--pid",
+                    "--fork",
+                    "--kill-child",
+                    sys.executable,
+                    str(PANDOC_RELAY),
+                    str(listener.fileno()),
+                    str(PANDOC_SERVER_PORT),
+                    self.command,
+                    "--port",
+                    str(PANDOC_SERVER_PORT),
+                    "--timeout",
+                    str(PANDOC_SERVER_TIMEOUT_SECONDS),
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    pass_fds=(listener.fileno(),),
+                )
+            await self._wait_until_ready()
+        except BaseException:
+            self._unavailable_until = time.monotonic() + PANDOC_SERVER_RETRY_SECONDS
+            await self._stop_locked()
+            raise
+        self._idle = asyncio.Queue()
+        for _ in range(self.connections):
+            self._idle.put_nowait(None)
+
+    async def _wait_until_ready(self) -> None:
+        deadline = time.monotonic() + PANDOC_SERVER_STARTUP_SECONDS
+        while True:
+            if self._process.returncode is not None:
+                raise RuntimeError("Pandoc server exited during startup")
+            try:
+                await asyncio.to_thread(_get_version, self._socket_path)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError("Pandoc server did not become ready")
+                await asyncio.sleep(0.05)
+
+    @property
+    def _socket_path(self) -> str:
+        return str(Path(self._socket_dir) / "pandoc.sock")
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._stop_locked()
+
+    async def _stop_locked(self) -> None:
+        idle, self._idle = self._idle, None
+        while idle is not None and not idle.empty():
+            connection = idle.get_nowait()
+            if connection is not None:
+                connection.close()
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+        socket_dir, self._socket_dir = self._socket_dir, None
+        if socket_dir is not None:
+            shutil.rmtree(socket_dir, ignore_errors=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_args):
+        await self.close()
+
+    async def convert(
+        self, html: str, timeout: float = PANDOC_REQUEST_TIMEOUT_SECONDS
+    ) -> str:
+        """Convert ``html`` within ``timeout`` seconds.
+
+        A timed-out server may still be busy with the document, so it is
+        killed and the next conversion starts a new one.
+        """
+        await self.start()
+        process = self._process
+        try:
+            async with asyncio.timeout(timeout):
+                return await self._convert(html, timeout)
+        except TimeoutError:
+            async with self._lock:
+                if self._process is process:
+                    await self._stop_locked()
+            raise
+
+    async def _convert(self, html: str, timeout: float) -> str:
+        idle = self._idle
+        connection = await idle.get()
+        try:
+            if connection is None:
+                connection = _UnixHTTPConnection(self._socket_path, timeout)
+            elif connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            connection.timeout = timeout
+            body = json.dumps({**PANDOC_FORMAT, "text": html}).encode("utf-8")
+            try:
+                return await asyncio.to_thread(_post_conversion, connection, body)
+            except (OSError, http.client.HTTPException) as error:
+                if isinstance(error, TimeoutError):
+                    raise
+                # A keep-alive connection may have been closed by the server.
+                connection.close()
+                return await asyncio.to_thread(_post_conversion, connection, body)
+        except BaseException:
+            if connection is not None:
+                connection.close()
+            connection = None
+            raise
+        finally:
+            idle.put_nowait(connection)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def _get_version(socket_path: str) -> None:
+    connection = _UnixHTTPConnection(socket_path, 1)
+    try:
+        connection.request("GET", "/version")
+        connection.getresponse().read()
+    finally:
+        connection.close()
+
+
+def _post_conversion(connection, body: bytes) -> str:
+    connection.request(
+        "POST",
+        "/",
+        body=body,
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
+    )
+    response = connection.getresponse()
+    data = response.read(MAX_OUTPUT_BYTES * 2 + 1)
+    if response.status != 200:
+        raise RuntimeError("Pandoc server conversion failed")
+    if len(data) > MAX_OUTPUT_BYTES * 2 or not response.isclosed():
+        raise RuntimeError("Subprocess output exceeded the configured limit")
+    result = json.loads(data)
+    output = result.get("output")
+    if result.get("base64") or not isinstance(output, str):
+        raise RuntimeError("Pandoc server conversion failed")
+    if len(output.encode("utf-8")) > MAX_OUTPUT_BYTES:
+        raise RuntimeError("Subprocess output exceeded the configured limit")
+    # Match the one-shot path, whose output ``invoke_command`` strips.
+    return output.strip()
+
+
+async def html_to_markdown(
+    html: str,
+    server: PandocServer | None = None,
+    engine: str = "pandoc",
+    timeout: float = PANDOC_REQUEST_TIMEOUT_SECONDS,
+) -> str:
+    if engine == "native":
+        # Keep the event loop responsive while a large document converts.
+        return await asyncio.to_thread(gfm.convert, html)
+    if server is not None:
+        try:
+            return await server.convert(html, timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
     return await invoke_command(
         [
             "pandoc",
@@ -0,0 +1,256 @@
+"""HTTP-only document loading for server-rendered pages.
+
+``fetch_document`` retrieves the main document without a browser under the
+same ``RenderPolicy`` as a render: the address space is checked on every
+redirect hop, redirects are bounded by ``MAX_REDIRECTS``, and the decoded
+body by ``MAX_MAIN_DOCUMENT_BYTES``. A ``DocumentClient`` keeps keep-alive
+connections per origin so repeated fetches skip TCP and TLS setup; idle
+connections are bounded per origin and in total, and are dropped after
+``DOCUMENT_IDLE_SECONDS`` because servers close quiet keep-alive sockets.
+"""
+
+import asyncio
+import http.client
+import time
+import zlib
+from urllib.parse import urljoin, urlsplit
+
+from bs4.dammit import UnicodeDammit
+
+from .models import (
+    ERROR_HTTP,
+    ERROR_INVALID_INPUT,
+    ERROR_NETWORK,
+    ERROR_RESOURCE,
+    ERROR_TIMEOUT,
+    FetchError,
+)
+from .policy import (
+    EXTRA_HTTP_HEADERS,
+    MAX_MAIN_DOCUMENT_BYTES,
+    MAX_REDIRECTS,
+    REDIRECT_STATUSES,
+    USER_AGENT,
+    RenderPolicy,
+    _host_is_loopback,
+    _inject_base_href,
+)
+
+DEFAULT_DOCUMENT_CONNECTIONS = 4
+DEFAULT_DOCUMENT_IDLE_CONNECTIONS = 32
+DOCUMENT_IDLE_SECONDS = 4.0
+DOCUMENT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    **EXTRA_HTTP_HEADERS,
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+class DocumentClient:
+    """Fetch main documents over pooled keep-alive HTTP(S) connections.
+
+    At most ``connections`` idle connections are kept per origin and
+    ``max_idle`` across all origins; the least recently released one is
+    closed first. Requests run in worker threads with the standard library
+    client, which verifies certificates by default just like the browser.
+    """
+
+    def __init__(
+        self,
+        connections: int = DEFAULT_DOCUMENT_CONNECTIONS,
+        max_idle: int = DEFAULT_DOCUMENT_IDLE_CONNECTIONS,
+    ):
+        if connections <= 0 or max_idle <= 0:
+            raise ValueError("Document connection pool size must be positive")
+        self.connections = connections
+        self.max_idle = max_idle
+        # Idle connections per origin as (connection, released_at), oldest first.
+        self._idle: dict[tuple[str, str, int], list] = {}
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _released_at in connections:
+                connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        await self.close()
+
+    async def fetch(
+        self, url: str, timeout: float, validators: dict | None = None
+    ) -> str:
+        return await fetch_document(url, timeout, client=self, validators=validators)
+
+    def _checkout(self, origin: tuple[str, str, int], timeout: float):
+        """Return ``(connection, reused)`` for ``origin``."""
+        self._expire(time.monotonic())
+        idle = self._idle.get(origin)
+        if idle:
+            connection, _released_at = idle.pop()
+            if not idle:
+                del self._idle[origin]
+            connection.timeout = timeout
+            return connection, True
+        scheme, host, port = origin
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, origin: tuple[str, str, int], connection) -> None:
+        now = time.monotonic()
+        self._expire(now)
+        idle = self._idle.setdefault(origin, [])
+        if len(idle) >= self.connections:
+            idle.pop(0)[0].close()
+        idle.append((connection, now))
+        while sum(map(len, self._idle.values())) > self.max_idle:
+            oldest = min(self._idle, key=lambda origin: self._idle[origin][0][1])
+            self._idle[oldest].pop(0)[0].close()
+            if not self._idle[oldest]:
+                del self._idle[oldest]
+
+    def _expire(self, now: float) -> None:
+        for origin in list(self._idle):
+            idle = self._idle[origin]
+            while idle and now - idle[0][1] > DOCUMENT_IDLE_SECONDS:
+                idle.pop(0)[0].close()
+            if not idle:
+                del self._idle[origin]
+
+    async def _get(self, url: str, deadline: float, timeout: float):
+        parsed = urlsplit(url)
+        origin = (
+            parsed.scheme,
+            parsed.hostname,
+            parsed.port or (443 if parsed.scheme == "https" else 80),
+        )
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise FetchError(ERROR_TIMEOUT, f"Timed out after {timeout} seconds")
+        connection, reused = self._checkout(origin, remaining)
+        try:
+            status, headers, body, reusable = await asyncio.wait_for(
+                asyncio.to_thread(_request, connection, path, reused),
+                timeout=remaining,
+            )
+        except asyncio.TimeoutError:
+            connection.close()
+            raise FetchError(ERROR_TIMEOUT, f"Timed out after {timeout} seconds")
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise FetchError(ERROR_NETWORK, "Navigation failed")
+        except BaseException:
+            connection.close()
+            raise
+        if reusable:
+            self._release(origin, connection)
+        else:
+            connection.close()
+        return status, headers, body
+
+
+def _request(connection, path: str, reused: bool):
+    try:
+        connection.request("GET", path, headers=DOCUMENT_HEADERS)
+        response = connection.getresponse()
+    except (OSError, http.client.HTTPException) as error:
+        # Only a pooled keep-alive connection gets a second attempt: the
+        # server may have closed it while idle. Fresh connections and
+        # timeouts fail as they are.
+        if not reused or isinstance(error, TimeoutError):
+            raise
+        connection.close()
+        connection.request("GET", path, headers=DOCUMENT_HEADERS)
+        response = connection.getresponse()
+    body = response.read(MAX_MAIN_DOCUMENT_BYTES + 1)
+    headers = {name.lower(): value for name, value in response.getheaders()}
+    return response.status, headers, body, response.isclosed()
+
+
+def _decode(body: bytes, headers: dict) -> str:
+    encoding = headers.get("content-encoding", "").strip().lower()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        # Bound the inflated size so a compressed bomb cannot grow unchecked.
+        wbits = 47 if encoding != "deflate" else 15
+        try:
+            inflater = zlib.decompressobj(wbits)
+            body = inflater.decompress(body, MAX_MAIN_DOCUMENT_BYTES + 1)
+        except zlib.error:
+            if encoding != "deflate":
+                raise FetchError(ERROR_NETWORK, "Navigation failed")
+            inflater = zlib.decompressobj(-15)
+            body = inflater.decompress(body, MAX_MAIN_DOCUMENT_BYTES + 1)
+    elif encoding not in ("", "identity"):
+        raise FetchError(ERROR_NETWORK, "Navigation failed")
+    if len(body) > MAX_MAIN_DOCUMENT_BYTES:
+        raise FetchError(ERROR_RESOURCE, "Main document too large")
+    charset = None
+    for parameter in headers.get("content-type", "").split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip('"')
+    decoded = UnicodeDammit(
+        body, known_definite_encodings=[charset] if charset else [], is_html=True
+    ).unicode_markup
+    return decoded if decoded is not None else body.decode("utf-8", "replace")
+
+
+async def fetch_document(
+    url: str,
+    timeout: float,
+    client: DocumentClient | None = None,
+    validators: dict | None = None,
+) -> str:
+    """Fetch a main document over HTTP under the bounded render policy.
+
+    Returns the decoded HTML with a ``<base>`` for the final URL after
+    redirects, like a rendered snapshot. Raises the same stable
+    ``FetchError`` codes as ``render_browser``. When ``validators`` is a dict,
+    the document's ETag and Last-Modified headers are stored in it.
+    """
+    parsed = urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise FetchError(ERROR_INVALID_INPUT, "URL must be an absolute HTTP(S) URL")
+    if client is None:
+        async with DocumentClient(connections=1) as owned:
+            return await fetch_document(url, timeout, owned, validators)
+    policy = RenderPolicy(allow_loopback=_host_is_loopback(parsed.hostname))
+    deadline = asyncio.get_running_loop().time() + timeout
+    current_url = url
+    for _ in range(MAX_REDIRECTS + 1):
+        await policy.check_navigation_url(current_url)
+        if policy.error is not None:
+            raise policy.error
+        status, headers, body = await client._get(current_url, deadline, timeout)
+        policy.add_transfer(len(body))
+        if policy.error is not None:
+            raise policy.error
+        location = headers.get("location")
+        if status in REDIRECT_STATUSES and location:
+            policy.check_redirect()
+            if policy.error is not None:
+                raise policy.error
+            current_url = urljoin(current_url, location)
+            continue
+        break
+    if len(body) > MAX_MAIN_DOCUMENT_BYTES:
+        raise FetchError(ERROR_RESOURCE, "Main document too large")
+    if status >= 400:
+        raise FetchError(ERROR_HTTP, f"HTTP status {status}", status=status)
+    html = _decode(body, headers)
+    policy.check_document(html)
+    if policy.error is not None:
+        raise policy.error
+    if status == 200 and current_url == url and validators is not None:
+        policy.record_validators(headers)
+        validators.update(policy.validators)
+    if current_url != url:
+        html = _inject_base_href(html, current_url)
+    return html
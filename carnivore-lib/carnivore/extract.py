@@ -1,16 +1,225 @@
+import asyncio
+import itertools
 import json
+import weakref
 from pathlib import Path
 
+from .models import MAX_OUTPUT_BYTES
 from .process import invoke_command
-from .render import MAX_OUTPUT_BYTES
 
 
 READABILITY_DIR = Path(__file__).with_name("readability")
+DEFAULT_READABILITY_WORKERS = 1
+# Extraction normally takes well under a second; a worker this slow is wedged.
+DEFAULT_READABILITY_TIMEOUT_SECONDS = 60.0
 
 
-async def extract_readability(html: str) -> dict:
+class ReadabilityWorkerPool:
+    """Keep resident Node Readability workers for the life of a pipeline.
+
+    Requests are multiplexed over framed stdin/stdout streams and spread across
+    ``size`` workers. A crashed worker fails only its pending requests and is
+    restarted on the next request. Every response is held to
+    ``MAX_OUTPUT_BYTES`` just like the one-shot subprocess.
+
+    A request that takes longer than ``timeout`` seconds fails. A worker
+    whose request is abandoned while in flight, by that deadline or by the
+    caller being cancelled, is killed and restarted, so later requests do not
+    queue behind the document it is still working on. The other requests it
+    was serving are sent again to the replacement within their own timeouts.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_READABILITY_WORKERS,
+        timeout: float = DEFAULT_READABILITY_TIMEOUT_SECONDS,
+    ):
+        if size <= 0:
+            raise ValueError("Readability worker pool size must be positive")
+        self.size = size
+        self._workers = [_ReadabilityWorker(timeout) for _ in range(size)]
+        self._ids = itertools.count(1)
+
+    async def start(self) -> None:
+        for worker in self._workers:
+            await worker.ensure_running()
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            await worker.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_args):
+        await self.close()
+
+    async def extract(self, html: str) -> dict:
+        worker = min(self._workers, key=lambda candidate: len(candidate.pending))
+        return await worker.request(next(self._ids), html.encode("utf-8"))
+
+
+class _ReadabilityWorker:
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.process = None
+        self.reader = None
+        # Requests in flight on the current process; each process has its own.
+        self.pending: dict[str, asyncio.Future] = {}
+        # Processes killed because a request was abandoned on them.
+        self._retired = weakref.WeakSet()
+        self._start_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def ensure_running(self) -> None:
+        async with self._start_lock:
+            if self.process is not None and not self.reader.done():
+                return
+            self.process = await asyncio.create_subprocess_exec(
+                "node",
+                "index.mjs",
+                "--worker",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                cwd=READABILITY_DIR,
+            )
+            self.pending = {}
+            self.reader = asyncio.create_task(
+                self._read_responses(self.process, self.pending)
+            )
+
+    async def request(self, request_id: int, body: bytes) -> dict:
+        try:
+            async with asyncio.timeout(self.timeout):
+                while True:
+                    try:
+                        return await self._request_once(str(request_id), body)
+                    except _WorkerRetired:
+                        # Another request's worker was killed under this one.
+                        continue
+        except TimeoutError:
+            raise RuntimeError("Readability worker timed out")
+
+    async def _request_once(self, key: str, body: bytes) -> dict:
+        await self.ensure_running()
+        process, pending = self.process, self.pending
+        future = asyncio.get_running_loop().create_future()
+        pending[key] = future
+        try:
+            async with self._write_lock:
+                process.stdin.write(f"{key} {len(body)}\n".encode("ascii"))
+                process.stdin.write(body)
+                await process.stdin.drain()
+            return await future
+        except (BrokenPipeError, ConnectionResetError):
+            if process in self._retired:
+                raise _WorkerRetired()
+            raise RuntimeError("Readability worker exited")
+        finally:
+            pending.pop(key, None)
+            # Awaiting the future cancels it when the caller gives up.
+            if future.cancelled() or not future.done():
+                # The worker may still be busy with this document or hold a
+                # partial request, so it is replaced instead of reused.
+                self._retired.add(process)
+                self._abandon(process)
+
+    def _abandon(self, process) -> None:
+        if self.process is process:
+            self.process = None
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def _read_responses(self, process, pending: dict) -> None:
+        try:
+            while True:
+                header = await process.stdout.readline()
+                if not header:
+                    break
+                key, length = header.decode("ascii").split()
+                length = int(length)
+                if length > MAX_OUTPUT_BYTES:
+                    await _discard(process.stdout, length)
+                    _resolve(
+                        pending,
+                        key,
+                        error=RuntimeError(
+                            "Subprocess output exceeded the configured limit"
+                        ),
+                    )
+                    continue
+                response = json.loads(await process.stdout.readexactly(length))
+                if response.get("ok") is not True:
+                    # Readability found no article in the page.
+                    _resolve(pending, key, result=None)
+                    continue
+                response.pop("ok")
+                _resolve(pending, key, result=response)
+        except (asyncio.IncompleteReadError, OSError, ValueError):
+            pass
+        finally:
+            self._abandon(process)
+            retired = process in self._retired
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(
+                        _WorkerRetired()
+                        if retired
+                        else RuntimeError("Readability worker exited")
+                    )
+            await process.wait()
+
+    async def close(self) -> None:
+        process, self.process = self.process, None
+        if process is not None and process.returncode is None:
+            try:
+                process.stdin.close()
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except Exception:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+        if self.reader is not None:
+            await self.reader
+
+
+class _WorkerRetired(Exception):
+    """The worker was replaced while serving another, abandoned request."""
+
+
+def _resolve(pending: dict, key: str, result=None, error=None) -> None:
+    future = pending.get(key)
+    if future is None or future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+async def _discard(stream, length: int) -> None:
+    while length:
+        chunk = await stream.readexactly(min(length, 64 * 1024))
+        length -= len(chunk)
+
+
+async def extract_readability(
+    html: str, workers: ReadabilityWorkerPool | None = None
+) -> dict | None:
+    """Return Readability's article for ``html``, or ``None`` if it finds none.
+
+    A failure to run Readability at all (a crashed or missing Node process,
+    an oversized response) raises instead.
+    """
+    if workers is not None:
+        return await workers.extract(html)
     output = await invoke_command(
-        ["node", "index.mjs"],
+        ["node", "index.mjs", "--empty-as-null"],
         input=html,
         cwd=READABILITY_DIR,
         max_output_bytes=MAX_OUTPUT_BYTES,
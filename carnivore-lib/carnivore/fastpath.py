@@ -0,0 +1,100 @@
+"""Serve fresh CLI cache hits without starting the fetch pipeline.
+
+``python -m carnivore`` calls ``serve_cached_fetch`` before importing the
+CLI. For a plain single-URL fetch it builds the same request and cache key
+as the pipeline, and prints a fresh cached result exactly as the CLI would,
+without importing asyncio, argparse, or the renderer. Everything else
+returns ``None`` and runs through ``cli.run``: other commands and options,
+arguments it does not recognize, invalid requests, misses, stale entries
+that need a refresh, and cached failures.
+"""
+
+from dataclasses import replace
+
+from . import timing
+from .cache import _cache_enabled, read_fetch_entry
+from .keys import _cache_key
+from .models import FetchError, FetchRequest, FetchResult, validate_request
+from .output import frontmatter, print_envelope, result_envelope
+
+# CLI options that map to request fields; the parser defaults match the
+# ``FetchRequest`` defaults.
+REQUEST_OPTIONS = {
+    "--format": "format",
+    "--resource-mode": "resource_mode",
+    "--markdown-engine": "markdown_engine",
+    "--loading-strategy": "loading_strategy",
+    "--timeout": "timeout",
+}
+
+
+def serve_cached_fetch(argv) -> int | None:
+    """Print a fresh cached result for ``argv`` and return the exit status.
+
+    Returns ``None`` when the full CLI has to handle ``argv``.
+    """
+    if not _cache_enabled():
+        return None
+    parsed = _parse(list(argv))
+    if parsed is None:
+        return None
+    request, output, timings = parsed
+    try:
+        validate_request(request)
+    except FetchError:
+        return None
+
+    with timing.measure() as measured:
+        with timing.stage("cache_read"):
+            entry = read_fetch_entry(_cache_key(request), FetchResult, fresh_only=True)
+    if entry is None:
+        return None
+    result = entry[0]
+    if output == "json":
+        if timings:
+            result = replace(result, timings=measured.as_dict())
+        print_envelope(result_envelope(result, timings=timings))
+    elif result.format == "markdown":
+        print(frontmatter(result.metadata, result.content), end="")
+    else:
+        print(result.content, end="")
+    return 0
+
+
+def _parse(argv: list[str]):
+    """Parse the subset of fetch arguments served here, or return ``None``."""
+    url = None
+    fields = {}
+    output = "raw"
+    timings = False
+    while argv:
+        argument = argv.pop(0)
+        if not argument.startswith("-"):
+            if url is not None:
+                return None
+            url = argument
+            continue
+        if argument == "--timings":
+            timings = True
+            continue
+        option, equals, value = argument.partition("=")
+        if option != "--output" and option not in REQUEST_OPTIONS:
+            return None
+        if not equals:
+            if not argv:
+                return None
+            value = argv.pop(0)
+        if option == "--output":
+            output = value
+        else:
+            fields[REQUEST_OPTIONS[option]] = value
+    if url is None or output not in ("raw", "json"):
+        return None
+    if "," in fields.get("format", ""):
+        return None
+    if "timeout" in fields:
+        try:
+            fields["timeout"] = float(fields["timeout"])
+        except ValueError:
+            return None
+    return FetchRequest(url=url, **fields), output, timings
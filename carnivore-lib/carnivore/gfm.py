@@ -0,0 +1,330 @@
+"""In-process HTML to GitHub-flavored Markdown conversion.
+
+This engine covers the HTML subset Readability emits: headings, paragraphs,
+lists, links, emphasis, code, tables, blockquotes, and images. Its output
+follows pandoc's ``gfm-raw_html --wrap=none`` writer for that subset, so the
+two engines can be compared on the benchmark corpus. Unknown elements keep
+their text and drop their markup, as pandoc does without raw HTML.
+"""
+
+import re
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import Comment, Declaration, Doctype, ProcessingInstruction
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+SKIPPED_TAGS = frozenset(
+    ("head", "script", "style", "noscript", "template", "title", "meta", "link")
+)
+BLOCK_TAGS = frozenset(
+    (
+        *HEADING_TAGS,
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "body",
+        "dd",
+        "details",
+        "div",
+        "dl",
+        "dt",
+        "figcaption",
+        "figure",
+        "footer",
+        "header",
+        "hr",
+        "html",
+        "li",
+        "main",
+        "nav",
+        "ol",
+        "p",
+        "pre",
+        "section",
+        "summary",
+        "table",
+        "ul",
+    )
+)
+IGNORED_NODES = (Comment, Declaration, Doctype, ProcessingInstruction)
+HORIZONTAL_RULE = "-" * 72
+LINE_BREAK = "\x00"
+
+_WHITESPACE = re.compile(r"[ \t\r\n\f]+")
+_ESCAPED = re.compile(r"([\\`*_\[\]<>])")
+_LINE_START = re.compile(r"^(#|[-+=] |\d+[.)] )")
+
+
+def convert(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    return "\n\n".join(_blocks(soup)).strip()
+
+
+def _blocks(node) -> list[str]:
+    blocks = []
+    inline = []
+
+    def flush():
+        paragraph = _paragraph("".join(inline))
+        if paragraph:
+            blocks.append(paragraph)
+        inline.clear()
+
+    for child in node.children:
+        if isinstance(child, IGNORED_NODES):
+            continue
+        if isinstance(child, Tag) and child.name in SKIPPED_TAGS:
+            continue
+        if isinstance(child, Tag) and child.name in BLOCK_TAGS:
+            flush()
+            blocks.extend(_block(child))
+        else:
+            inline.append(_inline(child))
+    flush()
+    return blocks
+
+
+def _block(tag: Tag) -> list[str]:
+    name = tag.name
+    if name in HEADING_TAGS:
+        text = _paragraph(_inline_children(tag), escape_start=False)
+        return [f"{'#' * int(name[1])} {text}"] if text else []
+    if name == "p":
+        text = _paragraph(_inline_children(tag))
+        return [text] if text else []
+    if name == "hr":
+        return [HORIZONTAL_RULE]
+    if name == "pre":
+        return [_code_block(tag)]
+    if name in ("ul", "ol"):
+        rendered = _list(tag, ordered=name == "ol")
+        return [rendered] if rendered else []
+    if name == "blockquote":
+        inner = "\n\n".join(_blocks(tag))
+        if not inner:
+            return []
+        return ["\n".join(f"> {line}" if line else ">" for line in inner.split("\n"))]
+    if name == "table":
+        rendered = _table(tag)
+        return [rendered] if rendered else []
+    return _blocks(tag)
+
+
+def _inline(node) -> str:
+    if isinstance(node, IGNORED_NODES):
+        return ""
+    if isinstance(node, NavigableString):
+        return _ESCAPED.sub(r"\\\1", _WHITESPACE.sub(" ", str(node)))
+    name = node.name
+    if name in SKIPPED_TAGS:
+        return ""
+    if name == "br":
+        return LINE_BREAK
+    if name in ("em", "i", "cite", "var", "dfn"):
+        return _wrap(_inline_children(node), "*")
+    if name in ("strong", "b"):
+        return _wrap(_inline_children(node), "**")
+    if name in ("del", "s", "strike"):
+        return _wrap(_inline_children(node), "~~")
+    if name in ("code", "kbd", "samp", "tt"):
+        return _inline_code(node.get_text())
+    if name == "a":
+        return _link(node)
+    if name == "img":
+        return _image(node)
+    if name in BLOCK_TAGS:
+        # Block content inside inline content is flattened to its text flow.
+        return " " + _inline_children(node) + " "
+    return _inline_children(node)
+
+
+def _inline_children(tag: Tag) -> str:
+    return "".join(_inline(child) for child in tag.children)
+
+
+def _wrap(text: str, marker: str) -> str:
+    stripped = text.strip(" ")
+    if not stripped:
+        return text
+    leading = " " if text.startswith(" ") else ""
+    trailing = " " if text.endswith(" ") else ""
+    return f"{leading}{marker}{stripped}{marker}{trailing}"
+
+
+def _inline_code(text: str) -> str:
+    text = _WHITESPACE.sub(" ", text)
+    if not text:
+        return ""
+    longest = max((len(run) for run in re.findall(r"`+", text)), default=0)
+    fence = "`" * (longest + 1)
+    if text.startswith("`") or text.endswith("`"):
+        text = f" {text} "
+    return f"{fence}{text}{fence}"
+
+
+def _destination(url: str, title: str | None) -> str:
+    url = url.strip()
+    if re.search(r"[\s()<>]", url):
+        url = f"<{url.replace('>', '%3E')}>"
+    if title:
+        escaped = title.replace("\\", "\\\\").replace('"', '\\"')
+        return f'{url} "{escaped}"'
+    return url
+
+
+def _link(tag: Tag) -> str:
+    href = tag.get("href")
+    text = _inline_children(tag).strip(" ")
+    if href is None:
+        return text
+    title = tag.get("title")
+    if (
+        not title
+        and tag.get_text() == href
+        and re.match(r"^(https?:|mailto:)\S+$", href)
+        and ">" not in href
+    ):
+        return f"<{href}>"
+    return f"[{text}]({_destination(href, title)})"
+
+
+def _image(tag: Tag) -> str:
+    src = tag.get("src")
+    if not src:
+        return ""
+    alt = _ESCAPED.sub(r"\\\1", _WHITESPACE.sub(" ", tag.get("alt", ""))).strip()
+    return f"![{alt}]({_destination(src, tag.get('title'))})"
+
+
+def _paragraph(text: str, escape_start: bool = True) -> str:
+    lines = []
+    for line in text.split(LINE_BREAK):
+        line = _WHITESPACE.sub(" ", line).strip()
+        if escape_start:
+            line = _LINE_START.sub(lambda match: _escape_marker(match.group(1)), line)
+        lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    while lines and not lines[0]:
+        lines.pop(0)
+    return "\\\n".join(lines)
+
+
+def _escape_marker(marker: str) -> str:
+    if marker[0].isdigit():
+        return re.sub(r"([.)])", r"\\\1", marker)
+    return "\\" + marker
+
+
+def _code_block(tag: Tag) -> str:
+    code = tag.find("code")
+    source = code if code is not None else tag
+    language = ""
+    for candidate in (source, tag):
+        for css_class in candidate.get("class", []):
+            if css_class.startswith("language-"):
+                language = css_class[len("language-") :]
+                break
+        if language:
+            break
+    text = source.get_text().rstrip("\n")
+    longest = max((len(run) for run in re.findall(r"^`{3,}", text, re.M)), default=2)
+    fence = "`" * (longest + 1)
+    return f"{fence}{language}\n{text}\n{fence}" if text else f"{fence}\n{fence}"
+
+
+def _list(tag: Tag, ordered: bool) -> str:
+    items = [child for child in tag.find_all("li", recursive=False)]
+    if not items:
+        return ""
+    loose = any(item.find("p", recursive=False) for item in items)
+    try:
+        number = int(tag.get("start", 1))
+    except ValueError:
+        number = 1
+    rendered = []
+    for item in items:
+        marker = f"{number}. " if ordered else "- "
+        number += 1
+        body = ("\n\n" if loose else "\n").join(_blocks(item))
+        indent = " " * len(marker)
+        lines = body.split("\n")
+        rendered.append(
+            "\n".join(
+                [marker + lines[0]]
+                + [indent + line if line else "" for line in lines[1:]]
+            ).rstrip()
+        )
+    return ("\n\n" if loose else "\n").join(rendered)
+
+
+def _table(tag: Tag) -> str:
+    rows = []
+    header = None
+    for row in tag.find_all("tr"):
+        if row.find_parent("table") is not tag:
+            continue
+        cells = row.find_all(("th", "td"), recursive=False)
+        rendered = [_table_cell(cell) for cell in cells]
+        if (
+            header is None
+            and not rows
+            and (
+                row.parent.name == "thead"
+                or (cells and all(cell.name == "th" for cell in cells))
+            )
+        ):
+            header = (rendered, [_alignment(cell) for cell in cells])
+        else:
+            rows.append((rendered, [_alignment(cell) for cell in cells]))
+    if header is None and not rows:
+        return ""
+    width = max(len(cells) for cells, _ in ([header] if header else []) + rows)
+    if header is None:
+        header = ([""] * width, [_alignment(None)] * width)
+        alignments = rows[0][1] if rows else []
+    else:
+        alignments = header[1]
+    alignments = list(alignments) + [""] * (width - len(alignments))
+    header_cells = header[0] + [""] * (width - len(header[0]))
+    body = [cells + [""] * (width - len(cells)) for cells, _ in rows]
+    widths = [
+        max([3] + [len(cells[index]) for cells in [header_cells] + body])
+        for index in range(width)
+    ]
+
+    def line(cells):
+        return (
+            "| "
+            + " | ".join(cell.ljust(widths[index]) for index, cell in enumerate(cells))
+            + " |"
+        )
+
+    separators = []
+    for index, alignment in enumerate(alignments):
+        # Separators span the cell padding so alignment colons sit on the pipes.
+        dashes = "-" * widths[index]
+        left = ":" if alignment in ("left", "center") else "-"
+        right = ":" if alignment in ("right", "center") else "-"
+        separators.append(f"{left}{dashes}{right}")
+    return "\n".join(
+        [line(header_cells), "|" + "|".join(separators) + "|"]
+        + [line(cells) for cells in body]
+    )
+
+
+def _table_cell(cell: Tag) -> str:
+    text = _inline_children(cell).replace(LINE_BREAK, " ")
+    return _WHITESPACE.sub(" ", text).strip().replace("|", "\\|")
+
+
+def _alignment(cell: Tag | None) -> str:
+    if cell is None:
+        return ""
+    align = (cell.get("align") or "").lower()
+    style = (cell.get("style") or "").replace(" ", "").lower()
+    for candidate in ("left", "right", "center"):
+        if align == candidate or f"text-align:{candidate}" in style:
+            return candidate
+    return ""
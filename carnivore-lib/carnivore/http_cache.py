@@ -0,0 +1,242 @@
+"""Shared HTTP cache for browser subresources.
+
+Every render starts from a fresh browser profile, so without this cache the
+same scripts and stylesheets are downloaded again for every page. The cache
+keeps only what a shared HTTP cache may store: successful GET responses to
+requests without credentials that carry no cookies, ``no-store``,
+``private``, or ``Vary: *``. Entries are matched by URL and the request
+headers named in ``Vary``. Fresh entries are served as they are; stale ones
+with an ``ETag`` or ``Last-Modified`` validator must be revalidated first.
+"""
+
+import email.utils
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+DEFAULT_SUBRESOURCE_CACHE_BYTES = 64 * 1024 * 1024
+# A single response may use at most this share of the byte budget.
+MAX_ENTRY_SHARE = 8
+VALIDATOR_HEADERS = ("etag", "last-modified")
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+UNCACHEABLE_DIRECTIVES = frozenset(("no-store", "private"))
+# Headers that describe one transfer rather than the stored body.
+TRANSFER_HEADERS = frozenset(
+    (
+        "connection",
+        "content-encoding",
+        "content-length",
+        "keep-alive",
+        "set-cookie",
+        "transfer-encoding",
+    )
+)
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    vary: dict[str, str]
+    validators: dict[str, str]
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(
+            len(name) + len(value) for name, value in self.headers.items()
+        )
+
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+def _directives(headers: dict) -> dict[str, str]:
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip().strip('"')
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _freshness_lifetime(headers: dict) -> float:
+    """Seconds a response stays fresh; explicit lifetimes only, no heuristics."""
+    directives = _directives(headers)
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                lifetime = float(directives[name])
+            except ValueError:
+                return 0.0
+            break
+    else:
+        expires = _http_date(headers.get("expires"))
+        if expires is None:
+            return 0.0
+        date = _http_date(headers.get("date"))
+        lifetime = expires - (date if date is not None else time.time())
+    try:
+        age = float(headers.get("age", 0))
+    except ValueError:
+        age = 0.0
+    return max(lifetime - age, 0.0)
+
+
+def _vary_names(headers: dict) -> list[str] | None:
+    """Lowercase ``Vary`` header names, or None for ``Vary: *``."""
+    names = [
+        name.strip().lower()
+        for name in headers.get("vary", "").split(",")
+        if name.strip()
+    ]
+    return None if "*" in names else names
+
+
+def _has_credentials(request_headers: dict) -> bool:
+    return any(request_headers.get(name) for name in CREDENTIAL_HEADERS)
+
+
+class SubresourceCache:
+    """Byte-bounded in-process LRU of shareable subresource responses.
+
+    Keyed by URL; a stored response only matches requests that agree on every
+    header its ``Vary`` names. Sizes count the body and header text.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str, request_headers: dict) -> CachedResponse | None:
+        """Return the matching response, fresh or not, for a GET request."""
+        if _has_credentials(request_headers):
+            return None
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or any(
+                request_headers.get(name) != value for name, value in entry.vary.items()
+            ):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            return entry
+
+    def store(
+        self,
+        url: str,
+        request_headers: dict,
+        status: int,
+        response_headers: dict,
+        body: bytes,
+    ) -> None:
+        """Keep a GET response if a shared cache may reuse it."""
+        vary = _vary_names(response_headers)
+        if (
+            status != 200
+            or vary is None
+            or _has_credentials(request_headers)
+            or "set-cookie" in response_headers
+            or UNCACHEABLE_DIRECTIVES.intersection(_directives(response_headers))
+        ):
+            return
+        lifetime = _freshness_lifetime(response_headers)
+        validators = {
+            name: response_headers[name]
+            for name in VALIDATOR_HEADERS
+            if response_headers.get(name)
+        }
+        if not lifetime and not validators:
+            return
+        entry = CachedResponse(
+            status=status,
+            headers={
+                name: value
+                for name, value in response_headers.items()
+                if name not in TRANSFER_HEADERS
+            },
+            body=body,
+            vary={name: request_headers.get(name) for name in vary},
+            validators=validators,
+            expires_at=time.monotonic() + lifetime,
+        )
+        with self._lock:
+            self._discard(url)
+            if entry.size > self.max_bytes // MAX_ENTRY_SHARE:
+                return
+            self._entries[url] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                _url, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+
+    def refresh(self, entry: CachedResponse, response_headers: dict) -> None:
+        """Extend an entry's freshness after a 304 Not Modified answer."""
+        entry.expires_at = time.monotonic() + _freshness_lifetime(
+            {**entry.headers, **response_headers}
+        )
+
+    def _discard(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_caches: dict[int, SubresourceCache] = {}
+
+
+def subresource_cache() -> SubresourceCache | None:
+    """Return the process-wide cache, or None when it is disabled.
+
+    ``CARNIVORE_SUBRESOURCE_CACHE_BYTES`` sets the byte budget; ``0``
+    disables the cache.
+    """
+    try:
+        max_bytes = max(
+            int(
+                os.environ.get(
+                    "CARNIVORE_SUBRESOURCE_CACHE_BYTES",
+                    DEFAULT_SUBRESOURCE_CACHE_BYTES,
+                )
+            ),
+            0,
+        )
+    except ValueError:
+        max_bytes = DEFAULT_SUBRESOURCE_CACHE_BYTES
+    if not max_bytes:
+        return None
+    cache = _caches.get(max_bytes)
+    if cache is None:
+        cache = _caches[max_bytes] = SubresourceCache(max_bytes)
+    return cache
@@ -0,0 +1,76 @@
+"""Cache keys for fetch results and pipeline stages.
+
+Keys hash the request fields that change the output together with the ids
+of the pipeline, loading strategy, and extractor that produced it, so
+changing any of them invalidates old entries. This module only needs the
+standard library, which lets the CLI look up cache hits without loading
+the pipeline.
+"""
+
+import hashlib
+import json
+
+from .blocklist import configured_blocklist
+from .models import FetchRequest
+
+PIPELINE_ID = "fetch-pipeline"
+LOADING_STRATEGY_ID = "browser-domcontentloaded-settle-v1"
+HTTP_LOADING_STRATEGY_ID = "http-document-v1"
+LOADING_STRATEGY_IDS = {
+    "browser": LOADING_STRATEGY_ID,
+    "http": HTTP_LOADING_STRATEGY_ID,
+    "auto": "auto-http-then-browser-v1",
+    "adaptive": "browser-domcontentloaded-adaptive-settle-v1",
+}
+EXTRACTOR_ID = "mozilla-readability-v1"
+RENDERED_HTML_STAGE = "rendered_html"
+READABILITY_STAGE = "readability"
+
+
+def _cache_key(request: FetchRequest) -> str:
+    key_data = {
+        "pipeline_id": PIPELINE_ID,
+        "url_sha256": hashlib.sha256(request.url.encode("utf-8")).hexdigest(),
+        "format": request.format,
+        "resource_mode": request.resource_mode,
+        "loading_strategy_id": LOADING_STRATEGY_IDS[request.loading_strategy],
+    }
+    # Pandoc keys predate engine selection, so only other engines are keyed.
+    if request.format == "markdown" and request.markdown_engine != "pandoc":
+        key_data["markdown_engine"] = request.markdown_engine
+    blocklist = configured_blocklist() if request.loading_strategy != "http" else None
+    if blocklist is not None:
+        key_data["blocklist_sha256"] = blocklist.digest
+    return hashlib.sha256(
+        json.dumps(key_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def _stage_key(stage: str, **identity) -> str:
+    key_data = {"pipeline_id": PIPELINE_ID, "stage": stage, **identity}
+    return hashlib.sha256(
+        json.dumps(key_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def _rendered_html_key(
+    url: str,
+    loading_strategy_id=LOADING_STRATEGY_ID,
+    blocklist_sha256: str | None = None,
+) -> str:
+    identity = {
+        "url_sha256": hashlib.sha256(url.encode("utf-8")).hexdigest(),
+        "loading_strategy_id": loading_strategy_id,
+    }
+    # Blocking can change what a render shows, so blocklists are keyed.
+    if blocklist_sha256 is not None:
+        identity["blocklist_sha256"] = blocklist_sha256
+    return _stage_key(RENDERED_HTML_STAGE, **identity)
+
+
+def _readability_key(rendered_html: str) -> str:
+    return _stage_key(
+        READABILITY_STAGE,
+        html_sha256=hashlib.sha256(rendered_html.encode("utf-8")).hexdigest(),
+        extractor_id=EXTRACTOR_ID,
+    )
@@ -5,7 +5,7 @@ import shutil
 from typing import List
 
 from . import util
-from .render import MAX_OUTPUT_BYTES
+from .models import MAX_OUTPUT_BYTES
 from .cache import cached
 import os
 import json
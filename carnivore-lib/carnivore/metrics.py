@@ -0,0 +1,330 @@
+"""Prometheus-style metrics for long-running and batch fetches.
+
+Metrics are off until ``enable()`` creates the process-wide
+``MetricsRegistry``; ``carnivore serve`` enables them for ``GET /metrics`` and
+batch runs with ``--metrics-file``. The recording helpers at the bottom of
+this module are what the pipeline, renderer, cache, and subprocess helpers
+call. Each returns immediately while metrics are disabled. The cache imports
+this module, so ``asyncio`` and ``tempfile`` are imported where they are used.
+
+``MetricsRegistry.render`` produces the Prometheus text exposition format.
+"""
+
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+from .models import LOADING_STRATEGIES, SUPPORTED_FORMATS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Fetches and stages range from cache reads to full renders near the timeout.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DEFAULT_DUMP_INTERVAL_SECONDS = 10.0
+# Label value for request fields outside their fixed set, so requests that
+# fail validation cannot create a new series per distinct input.
+INVALID_LABEL = "invalid"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], lock):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = lock
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, value: float = 1, **labels) -> None:
+        self.inc(-value, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels, lock, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels, lock)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts, then the +Inf count and the sum.
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self):
+        for key, series in sorted(self._series.items()):
+            labels = dict(zip(self.labels, key))
+            for bound, count in zip(self.buckets, series):
+                yield f"{self.name}_bucket", {**labels, "le": _number(bound)}, count
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, series[-2]
+            yield f"{self.name}_sum", labels, series[-1]
+            yield f"{self.name}_count", labels, series[-2]
+
+
+class MetricsRegistry:
+    """Named counters, gauges, and histograms with fixed label names."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    def counter(self, name: str, help: str, labels=()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels=()) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels=()) -> Histogram:
+        return self._get(Histogram, name, help, labels)
+
+    def _get(self, kind, name, help, labels):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(
+                    name, kind(name, help, tuple(labels), self._lock)
+                )
+        if type(metric) is not kind or metric.labels != tuple(labels):
+            raise ValueError(f"Metric {name} is already registered differently")
+        return metric
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._metrics):
+                metric = self._metrics[name]
+                lines.append(f"# HELP {name} {_escape_help(metric.help)}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+                for sample, labels, value in metric.samples():
+                    lines.append(f"{sample}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        """Replace ``path`` with the current exposition atomically."""
+        import tempfile
+
+        path = Path(path)
+        descriptor, temporary = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as stream:
+                stream.write(self.render())
+            os.replace(temporary, path)
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            raise
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = (
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+_registry: MetricsRegistry | None = None
+
+
+def enable() -> MetricsRegistry:
+    """Start collecting metrics in this process; returns the registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def registry() -> MetricsRegistry | None:
+    """The process-wide registry, or ``None`` while metrics are disabled."""
+    return _registry
+
+
+async def dump_periodically(
+    path: str | Path, interval: float = DEFAULT_DUMP_INTERVAL_SECONDS
+) -> None:
+    """Write the registry to ``path`` every ``interval`` seconds until cancelled.
+
+    The file is written once more on cancellation, so it ends up with the
+    final values.
+    """
+    import asyncio
+
+    metrics = enable()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(_write_quietly, metrics, path)
+    finally:
+        _write_quietly(metrics, path)
+
+
+def _write_quietly(metrics: MetricsRegistry, path) -> None:
+    try:
+        metrics.write(path)
+    except OSError:
+        # A metrics file that cannot be written must not fail the batch.
+        pass
+
+
+def observe_fetch(request, timings: dict, error_code: str | None) -> None:
+    """Record one finished fetch from its ``FetchTimings.as_dict()``."""
+    metrics = _registry
+    if metrics is None:
+        return
+    outcome = error_code or "ok"
+    metrics.counter(
+        "carnivore_fetches_total",
+        "Fetches by format, loading strategy, and outcome.",
+        ("format", "loading_strategy", "outcome"),
+    ).inc(
+        format=_bounded(request.format, SUPPORTED_FORMATS),
+        loading_strategy=_bounded(request.loading_strategy, LOADING_STRATEGIES),
+        outcome=outcome,
+    )
+    if error_code is not None:
+        metrics.counter(
+            "carnivore_fetch_errors_total",
+            "Failed fetches by error code.",
+            ("code",),
+        ).inc(code=error_code)
+    metrics.histogram(
+        "carnivore_fetch_duration_seconds",
+        "End-to-end fetch latency.",
+        ("outcome",),
+    ).observe(timings["total"], outcome="ok" if error_code is None else "error")
+    stages = metrics.histogram(
+        "carnivore_fetch_stage_seconds",
+        "Time spent in each fetch stage.",
+        ("stage",),
+    )
+    for stage, seconds in timings["stages"].items():
+        stages.observe(seconds, stage=stage)
+    for name, value in timings["counters"].items():
+        metrics.counter(
+            f"carnivore_render_{name}_total",
+            f"Render {name.replace('_', ' ')} summed over fetches.",
+        ).inc(value)
+
+
+def _bounded(value, allowed: tuple[str, ...]) -> str:
+    return value if value in allowed else INVALID_LABEL
+
+
+def cache_lookup(namespace: str, hit: bool, tier: str = "backend") -> None:
+    metrics = _registry
+    if metrics is None:
+        return
+    metrics.counter(
+        "carnivore_cache_lookups_total",
+        "Cache lookups by namespace, tier, and outcome.",
+        ("namespace", "tier", "outcome"),
+    ).inc(namespace=namespace, tier=tier, outcome="hit" if hit else "miss")
+
+
+def render_in_progress(change: int) -> None:
+    metrics = _registry
+    if metrics is None:
+        return
+    metrics.gauge(
+        "carnivore_renders_in_progress", "Browser renders currently running."
+    ).inc(change)
+
+
+def render_finished(outcome: str) -> None:
+    metrics = _registry
+    if metrics is None:
+        return
+    metrics.counter(
+        "carnivore_renders_total",
+        "Browser renders by outcome: ok or an error code.",
+        ("outcome",),
+    ).inc(outcome=outcome)
+
+
+def render_queue(running: int, queued: int) -> None:
+    metrics = _registry
+    if metrics is None:
+        return
+    metrics.gauge(
+        "carnivore_render_slots_in_use", "Render scheduler slots in use."
+    ).set(running)
+    metrics.gauge(
+        "carnivore_render_queue_depth", "Renders waiting for a scheduler slot."
+    ).set(queued)
+
+
+def subprocess_finished(command: str, started: float, ok: bool) -> None:
+    metrics = _registry
+    if metrics is None:
+        return
+    metrics.histogram(
+        "carnivore_subprocess_duration_seconds",
+        "Helper subprocess run time by command.",
+        ("command",),
+    ).observe(time.perf_counter() - started, command=command)
+    metrics.counter(
+        "carnivore_subprocesses_total",
+        "Helper subprocess runs by command and outcome.",
+        ("command", "outcome"),
+    ).inc(command=command, outcome="ok" if ok else "error")
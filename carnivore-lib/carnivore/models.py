@@ -1,9 +1,25 @@
 from dataclasses import dataclass, field
 from typing import Any
+from urllib.parse import urlsplit
 
 
 SUPPORTED_FORMATS = ("markdown", "html", "full_html")
 RESOURCE_MODES = ("omit", "link", "embed")
+MARKDOWN_ENGINES = ("pandoc", "native")
+LOADING_STRATEGIES = ("browser", "http", "auto", "adaptive")
+PRIORITIES = ("interactive", "batch")
+# Fields a JSON request (a ``--batch`` line or a service request) may set.
+REQUEST_FIELDS = frozenset(
+    (
+        "url",
+        "format",
+        "resource_mode",
+        "timeout",
+        "markdown_engine",
+        "loading_strategy",
+        "priority",
+    )
+)
 
 ERROR_INVALID_INPUT = "invalid_input"
 ERROR_NETWORK = "network_error"
@@ -11,7 +27,9 @@ ERROR_TIMEOUT = "timeout"
 ERROR_HTTP = "http_error"
 ERROR_POLICY = "policy_denied"
 ERROR_RESOURCE = "resource_limit"
+ERROR_OVERLOADED = "overloaded"
 ERROR_NO_CONTENT = "no_content"
+ERROR_EXTRACTION = "extraction_error"
 ERROR_CONVERSION = "conversion_error"
 ERROR_INTERNAL = "internal_error"
 
@@ -23,21 +41,29 @@ ERROR_CODES = frozenset(
         ERROR_HTTP,
         ERROR_POLICY,
         ERROR_RESOURCE,
+        ERROR_OVERLOADED,
         ERROR_NO_CONTENT,
+        ERROR_EXTRACTION,
         ERROR_CONVERSION,
         ERROR_INTERNAL,
     )
 )
 
 DEFAULT_TIMEOUT = 30.0
+MAX_OUTPUT_BYTES = 10 * 1024 * 1024
+DEFAULT_BATCH_CONCURRENCY = 4
 
 
 class FetchError(Exception):
-    """A stable, desensitized pipeline error with a machine-readable code."""
+    """A stable, desensitized pipeline error with a machine-readable code.
+
+    ``status`` carries the HTTP status of an ``ERROR_HTTP`` failure.
+    """
 
-    def __init__(self, code: str, message: str = ""):
+    def __init__(self, code: str, message: str = "", status: int | None = None):
         self.code = code
         self.message = message or code
+        self.status = status
         super().__init__(f"{self.code}: {self.message}")
 
     def __str__(self) -> str:
@@ -50,10 +76,63 @@ class FetchRequest:
     format: str = "markdown"
     resource_mode: str = "omit"
     timeout: float = DEFAULT_TIMEOUT
+    markdown_engine: str = "pandoc"
+    loading_strategy: str = "browser"
+    priority: str = "interactive"
 
 
 @dataclass(frozen=True)
 class FetchResult:
+    """Fetched content; ``timings`` describes the fetch that returned it.
+
+    ``timings`` is never cached and is ignored when comparing results.
+    """
+
     format: str
     content: str
     metadata: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, Any] | None = field(default=None, compare=False)
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """One completed batch item; exactly one of result and error is set."""
+
+    index: int
+    request: FetchRequest
+    result: FetchResult | None = None
+    error: FetchError | None = None
+
+
+def request_from_fields(fields, defaults: dict, source: str = "batch") -> FetchRequest:
+    """Build a request from JSON ``fields`` over option ``defaults``."""
+    if not isinstance(fields, dict) or not REQUEST_FIELDS.issuperset(fields):
+        raise FetchError(ERROR_INVALID_INPUT, f"Unsupported {source} request fields")
+    if not isinstance(fields.get("url"), str):
+        raise FetchError(ERROR_INVALID_INPUT, "URL must be an absolute HTTP(S) URL")
+    for name in REQUEST_FIELDS.intersection(fields).difference(("url", "timeout")):
+        if not isinstance(fields[name], str):
+            label = name.replace("_", " ")
+            raise FetchError(ERROR_INVALID_INPUT, f"Unsupported {label}")
+    timeout = fields.get("timeout", defaults["timeout"])
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+        raise FetchError(ERROR_INVALID_INPUT, "Timeout must be a positive number")
+    return FetchRequest(**{**defaults, **fields, "timeout": float(timeout)})
+
+
+def validate_request(request: FetchRequest) -> None:
+    parsed = urlsplit(request.url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise FetchError(ERROR_INVALID_INPUT, "URL must be an absolute HTTP(S) URL")
+    if request.format not in SUPPORTED_FORMATS:
+        raise FetchError(ERROR_INVALID_INPUT, "Unsupported format")
+    if request.resource_mode not in RESOURCE_MODES:
+        raise FetchError(ERROR_INVALID_INPUT, "Unsupported resource mode")
+    if request.markdown_engine not in MARKDOWN_ENGINES:
+        raise FetchError(ERROR_INVALID_INPUT, "Unsupported markdown engine")
+    if request.loading_strategy not in LOADING_STRATEGIES:
+        raise FetchError(ERROR_INVALID_INPUT, "Unsupported loading strategy")
+    if request.priority not in PRIORITIES:
+        raise FetchError(ERROR_INVALID_INPUT, "Unsupported priority")
+    if request.timeout <= 0:
+        raise FetchError(ERROR_INVALID_INPUT, "Timeout must be a positive number")
@@ -0,0 +1,45 @@
+"""Envelopes and raw output shared by the CLI and the fetch service."""
+
+import io
+import json
+
+from .models import FetchError
+
+
+def frontmatter(metadata: dict, content: str) -> str:
+    # ruamel.yaml is only needed for raw Markdown output.
+    from ruamel.yaml import YAML
+
+    stream = io.StringIO()
+    stream.write("---\n")
+    YAML().dump(metadata, stream)
+    stream.write("---\n\n")
+    stream.write(content)
+    return stream.getvalue()
+
+
+def result_envelope(result, *, timings: bool = False, **identity) -> dict:
+    return {"ok": True, **identity, **result_fields(result, timings=timings)}
+
+
+def result_fields(result, *, timings: bool = False) -> dict:
+    fields = {
+        "format": result.format,
+        "content": result.content,
+        "metadata": result.metadata,
+    }
+    if timings and result.timings is not None:
+        fields["timings"] = result.timings
+    return fields
+
+
+def error_envelope(error: FetchError, **identity) -> dict:
+    return {
+        "ok": False,
+        **identity,
+        "error": {"code": error.code, "detail": error.message},
+    }
+
+
+def print_envelope(envelope: dict) -> None:
+    print(json.dumps(envelope, ensure_ascii=False, sort_keys=True), flush=True)
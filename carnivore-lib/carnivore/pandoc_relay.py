@@ -0,0 +1,78 @@
+"""Serve ``pandoc-server`` from a private network namespace.
+
+pandoc-server has no bind-address option and listens on every interface, so
+``PandocServer`` runs this script under ``unshare --net``, where the only
+interface is a loopback that nothing outside the namespace can reach. The
+script brings that loopback up, starts the server on it, and relays each
+connection accepted on the Unix socket it inherits to the server. It exits
+when the server does. Only the standard library is used, because it runs as
+a standalone script.
+
+Usage: pandoc_relay.py LISTEN_FD PORT COMMAND [ARG ...]
+"""
+
+import fcntl
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+
+SIOCGIFFLAGS = 0x8913
+SIOCSIFFLAGS = 0x8914
+IFF_UP = 0x1
+# struct ifreq: the interface name followed by a union, here its flags.
+IFREQ_FLAGS = struct.Struct("16sH22x")
+RELAY_BUFFER_BYTES = 65536
+
+
+def main(argv: list[str]) -> None:
+    listener = socket.socket(fileno=int(argv[1]))
+    port = int(argv[2])
+    _bring_up_loopback()
+    server = subprocess.Popen(argv[3:], stdin=subprocess.DEVNULL)
+    threading.Thread(target=_exit_with, args=(server,), daemon=True).start()
+    while True:
+        client, _ = listener.accept()
+        threading.Thread(target=_relay, args=(client, port), daemon=True).start()
+
+
+def _bring_up_loopback() -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as control:
+        request = IFREQ_FLAGS.pack(b"lo", 0)
+        _, flags = IFREQ_FLAGS.unpack(fcntl.ioctl(control, SIOCGIFFLAGS, request))
+        fcntl.ioctl(control, SIOCSIFFLAGS, IFREQ_FLAGS.pack(b"lo", flags | IFF_UP))
+
+
+def _exit_with(server: subprocess.Popen) -> None:
+    os._exit(server.wait())
+
+
+def _relay(client: socket.socket, port: int) -> None:
+    try:
+        upstream = socket.create_connection(("127.0.0.1", port))
+    except OSError:
+        # The server is not listening yet; the client sees a closed connection.
+        client.close()
+        return
+    threading.Thread(target=_pump, args=(upstream, client), daemon=True).start()
+    _pump(client, upstream)
+
+
+def _pump(source: socket.socket, target: socket.socket) -> None:
+    try:
+        while data := source.recv(RELAY_BUFFER_BYTES):
+            target.sendall(data)
+    except OSError:
+        pass
+    # Either side closing ends the relayed connection in both directions.
+    for sock in (source, target):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,86 +1,592 @@
 import asyncio
-import hashlib
-import json
-from urllib.parse import urlsplit
+import os
+import re
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from dataclasses import replace
+from typing import TYPE_CHECKING
 
-from .cache import read_fetch_result, write_fetch_result
-from .convert import embed_html, html_to_markdown, remove_resources
-from .extract import extract_readability
+from . import metrics, timing
+from .blocklist import configured_blocklist
+from .cache import (
+    FRESH,
+    STALE,
+    cache_freshness,
+    read_fetch_entry,
+    read_fetch_failure,
+    read_stage,
+    write_fetch_failure,
+    write_fetch_result,
+    write_fetch_results,
+    write_stage,
+)
+from .keys import (
+    LOADING_STRATEGY_IDS,
+    READABILITY_STAGE,
+    RENDERED_HTML_STAGE,
+    _cache_key,
+    _readability_key,
+    _rendered_html_key,
+)
 from .models import (
+    DEFAULT_BATCH_CONCURRENCY,
     ERROR_CONVERSION,
+    ERROR_EXTRACTION,
+    ERROR_HTTP,
+    ERROR_INTERNAL,
     ERROR_INVALID_INPUT,
     ERROR_NO_CONTENT,
+    ERROR_POLICY,
     ERROR_RESOURCE,
     ERROR_TIMEOUT,
+    MAX_OUTPUT_BYTES,
+    BatchResult,
     FetchError,
     FetchRequest,
     FetchResult,
-    RESOURCE_MODES,
-    SUPPORTED_FORMATS,
+    validate_request,
 )
-from .render import MAX_OUTPUT_BYTES, render_browser
+from .scheduler import RenderScheduler, default_render_concurrency
 
+if TYPE_CHECKING:
+    from .convert import PandocServer
+    from .document import DocumentClient
+    from .extract import ReadabilityWorkerPool
+    from .render import BrowserPool
 
-PIPELINE_ID = "fetch-pipeline"
-LOADING_STRATEGY_ID = "browser-domcontentloaded-settle-v1"
 
+# Auto mode renders in the browser when the HTTP document yields less text.
+AUTO_MIN_TEXT_LENGTH = 500
+JS_REQUIRED_PATTERN = re.compile(
+    r"<noscript[^>]*>[^<]*(?:enable|requires?|turn on)[^<]*javascript",
+    re.IGNORECASE,
+)
+# Failures that repeat deterministically for a request are cached briefly.
+NEGATIVE_CACHE_CODES = frozenset((ERROR_POLICY, ERROR_NO_CONTENT))
+NEGATIVE_CACHE_HTTP_STATUSES = frozenset((404, 410))
 
-def _cache_key(request: FetchRequest) -> str:
-    key_data = {
-        "pipeline_id": PIPELINE_ID,
-        "url_sha256": hashlib.sha256(request.url.encode("utf-8")).hexdigest(),
-        "format": request.format,
-        "resource_mode": request.resource_mode,
-        "loading_strategy_id": LOADING_STRATEGY_ID,
-    }
-    return hashlib.sha256(
-        json.dumps(key_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
-    ).hexdigest()
+
+def _negatively_cacheable(error: FetchError) -> bool:
+    if error.code == ERROR_HTTP:
+        return error.status in NEGATIVE_CACHE_HTTP_STATUSES
+    return error.code in NEGATIVE_CACHE_CODES
+
+
+def _timeout_error(request: FetchRequest) -> FetchError:
+    return FetchError(ERROR_TIMEOUT, f"Timed out after {request.timeout} seconds")
+
+
+class SingleFlight:
+    """Share one in-flight task between concurrent callers of the same key.
+
+    Every caller waits on the shared task through its own cancellation scope,
+    so a caller timing out leaves the work running for the others. The task is
+    cancelled only once no caller is waiting for it.
+
+    Stage timeouts inside the work come from the caller that started it. A
+    caller with a later ``deadline`` that sees the shared task time out starts
+    a fresh attempt of its own instead of inheriting the shorter budget.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, start, deadline: float | None = None):
+        """Await the shared task for ``key``, starting it with ``start()``.
+
+        ``deadline`` is the caller's own deadline in event loop time, or
+        ``None`` for no deadline.
+        """
+        while True:
+            flight = self._flights.get(key)
+            if flight is None or flight.task.done():
+                flight = _Flight(asyncio.ensure_future(start()), deadline)
+                self._flights[key] = flight
+                flight.task.add_done_callback(
+                    lambda task, flight=flight: self._finish(key, flight, task)
+                )
+            flight.waiters += 1
+            try:
+                return await asyncio.shield(flight.task)
+            except (asyncio.TimeoutError, FetchError) as error:
+                if not (_timed_out(error) and _earlier(flight.deadline, deadline)):
+                    raise
+            finally:
+                flight.waiters -= 1
+                if flight.waiters == 0 and not flight.task.done():
+                    self._forget(key, flight)
+                    flight.task.cancel()
+
+    def _finish(self, key: str, flight, task) -> None:
+        self._forget(key, flight)
+        if not task.cancelled():
+            # Mark the outcome retrieved when every caller has already left.
+            task.exception()
+
+    def _forget(self, key: str, flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
 
 
-def validate_request(request: FetchRequest) -> None:
-    parsed = urlsplit(request.url)
-    if parsed.scheme not in ("http", "https") or not parsed.netloc:
-        raise FetchError(ERROR_INVALID_INPUT, "URL must be an absolute HTTP(S) URL")
-    if request.format not in SUPPORTED_FORMATS:
-        raise FetchError(ERROR_INVALID_INPUT, "Unsupported format")
-    if request.resource_mode not in RESOURCE_MODES:
-        raise FetchError(ERROR_INVALID_INPUT, "Unsupported resource mode")
-    if request.timeout <= 0:
-        raise FetchError(ERROR_INVALID_INPUT, "Timeout must be a positive number")
+class _Flight:
+    def __init__(self, task: asyncio.Future, deadline: float | None):
+        self.task = task
+        self.deadline = deadline
+        self.waiters = 0
+
+
+def _timed_out(error: BaseException) -> bool:
+    if isinstance(error, FetchError):
+        return error.code == ERROR_TIMEOUT
+    return isinstance(error, asyncio.TimeoutError)
+
+
+def _earlier(deadline: float | None, other: float | None) -> bool:
+    return deadline is not None and (other is None or deadline < other)
+
+
+def _deadline(request: FetchRequest) -> float:
+    return asyncio.get_running_loop().time() + request.timeout
 
 
 class FetchPipeline:
-    """Coordinate fetch stages behind the public fetch(request) seam."""
+    """Coordinate fetch stages behind the public fetch(request) seam.
+
+    A pipeline may hold warm stage resources such as a ``BrowserPool``, a
+    ``DocumentClient``, a ``ReadabilityWorkerPool``, or a ``PandocServer``.
+    Use it as an async context manager so those resources are released on
+    exit.
+
+    Concurrent identical requests share one fetch, and concurrent requests for
+    the same URL share one browser render. Each caller keeps its own timeout.
+    Browser renders are admitted by a ``RenderScheduler``; time spent queued
+    for one counts against the request's timeout. Pipelines created without
+    a scheduler share one per event loop, so separate pipelines still respect
+    the process's render and per-host limits. Pipelines that hold no stage
+    resources also coalesce their fetches and renders with each other.
+
+    Stale cached results within the stale-while-revalidate window are returned
+    immediately and refreshed in the background; ``aclose`` waits for those
+    refreshes to finish.
+
+    Every result carries ``timings``: seconds per stage (cache reads and
+    writes, render queue wait, browser launch, navigation, settle, snapshot,
+    extraction, resource handling, conversion) plus render counters. A
+    ``metrics_hook`` is called after each ``fetch`` or ``fetch_formats`` with
+    the request, the timings, and the error code or ``None``; the same values
+    feed the process-wide ``metrics`` registry when it is enabled.
+    """
+
+    def __init__(
+        self,
+        browser_pool: "BrowserPool | None" = None,
+        readability_workers: "ReadabilityWorkerPool | None" = None,
+        pandoc_server: "PandocServer | None" = None,
+        document_client: "DocumentClient | None" = None,
+        scheduler: RenderScheduler | None = None,
+        metrics_hook: Callable[[FetchRequest, dict, str | None], None] | None = None,
+    ):
+        self.browser_pool = browser_pool
+        self.metrics_hook = metrics_hook
+        self._scheduler = scheduler
+        self.document_client = document_client
+        self.readability_workers = readability_workers
+        self.pandoc_server = pandoc_server
+        self._flights = None
+        if any(
+            resource is not None
+            for resource in (
+                browser_pool,
+                readability_workers,
+                pandoc_server,
+                document_client,
+            )
+        ):
+            # Work in flight may depend on this pipeline's own resources.
+            self._flights = _Flights()
+        self._refreshes: set[asyncio.Task] = set()
+
+    @property
+    def scheduler(self) -> RenderScheduler:
+        if self._scheduler is not None:
+            return self._scheduler
+        return _loop_defaults().scheduler
+
+    @property
+    def _fetches(self) -> SingleFlight:
+        return (self._flights or _loop_defaults()).fetches
+
+    @property
+    def _renders(self) -> SingleFlight:
+        return (self._flights or _loop_defaults()).renders
+
+    @classmethod
+    def pooled(cls, concurrency: int) -> "FetchPipeline":
+        """Create a pipeline with warm resources for ``concurrency`` fetches.
+
+        It holds a browser pool, an HTTP document client, Readability workers,
+        and a pandoc server of that size, and a render scheduler that also
+        respects the machine's render capacity.
+        """
+        from .convert import PandocServer
+        from .document import DocumentClient
+        from .extract import ReadabilityWorkerPool
+        from .render import BrowserPool
+
+        return cls(
+            browser_pool=BrowserPool(size=concurrency),
+            readability_workers=ReadabilityWorkerPool(
+                size=min(concurrency, os.cpu_count() or 1)
+            ),
+            pandoc_server=PandocServer(connections=concurrency),
+            document_client=DocumentClient(connections=concurrency),
+            scheduler=RenderScheduler(
+                concurrency=min(concurrency, default_render_concurrency())
+            ),
+        )
+
+    async def __aenter__(self):
+        if self.browser_pool is not None:
+            await self.browser_pool.start()
+        if self.readability_workers is not None:
+            await self.readability_workers.start()
+        if self.pandoc_server is not None:
+            try:
+                await self.pandoc_server.start()
+            except Exception:
+                # Conversion falls back to one-shot pandoc processes.
+                pass
+        return self
+
+    async def __aexit__(self, *_args):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._refreshes:
+            await asyncio.gather(*self._refreshes, return_exceptions=True)
+        if self.browser_pool is not None:
+            await self.browser_pool.close()
+        if self.document_client is not None:
+            await self.document_client.close()
+        if self.readability_workers is not None:
+            await self.readability_workers.close()
+        if self.pandoc_server is not None:
+            await self.pandoc_server.close()
 
     async def fetch(self, request: FetchRequest) -> FetchResult:
+        with timing.measure() as timings:
+            result = await self._measured(request, timings, self._fetch(request))
+        return replace(result, timings=timings.as_dict())
+
+    async def _measured(self, request: FetchRequest, timings, fetching):
+        try:
+            result = await fetching
+        except Exception as error:
+            self._report(request, timings, error)
+            raise
+        self._report(request, timings, None)
+        return result
+
+    def _report(self, request: FetchRequest, timings, error) -> None:
+        timings.finish()
+        if self.metrics_hook is None and metrics.registry() is None:
+            return
+        if error is not None:
+            error = error.code if isinstance(error, FetchError) else ERROR_INTERNAL
+        measured = timings.as_dict()
+        metrics.observe_fetch(request, measured, error)
+        if self.metrics_hook is None:
+            return
+        try:
+            self.metrics_hook(request, measured, error)
+        except Exception:
+            # Metrics are best effort and never fail the fetch.
+            pass
+
+    async def _fetch(self, request: FetchRequest) -> FetchResult:
         validate_request(request)
         cache_key = _cache_key(request)
-        cached_result = read_fetch_result(cache_key, FetchResult)
-        if cached_result is not None:
+        with timing.stage("cache_read"):
+            cached = read_fetch_entry(cache_key, FetchResult)
+        if cached is not None:
+            cached_result, freshness = cached
+            if freshness == STALE:
+                self._refresh(request, cache_key)
             return cached_result
+        with timing.stage("cache_read"):
+            failure = read_fetch_failure(cache_key)
+        if failure is not None:
+            raise failure
+        deadline = _deadline(request)
         try:
-            async with asyncio.timeout(request.timeout):
-                result = await self._fetch_within_budget(request)
+            async with asyncio.timeout_at(deadline):
+                return await self._fetches.run(
+                    cache_key,
+                    lambda: self._fetch_and_store(request, cache_key),
+                    deadline,
+                )
         except asyncio.TimeoutError:
-            raise FetchError(
-                ERROR_TIMEOUT, f"Timed out after {request.timeout} seconds"
+            raise _timeout_error(request)
+
+    async def fetch_formats(
+        self, request: FetchRequest, formats: Sequence[str]
+    ) -> dict[str, FetchResult]:
+        """Fetch several formats of one URL from a single render and extraction.
+
+        ``request.format`` is ignored. Every format is cached under the same key
+        a single-format request would use, so cached formats are served
+        without rendering and only the missing ones are derived. Every result
+        carries the timings of the whole call.
+        """
+        with timing.measure() as timings:
+            results = await self._measured(
+                request, timings, self._fetch_formats(request, formats)
             )
-        write_fetch_result(cache_key, result)
+        timings = timings.as_dict()
+        return {
+            name: replace(result, timings=timings) for name, result in results.items()
+        }
+
+    async def _fetch_formats(
+        self, request: FetchRequest, formats: Sequence[str]
+    ) -> dict[str, FetchResult]:
+        formats = tuple(dict.fromkeys(formats))
+        if not formats:
+            raise FetchError(ERROR_INVALID_INPUT, "Unsupported format")
+        requests = {name: replace(request, format=name) for name in formats}
+        for format_request in requests.values():
+            validate_request(format_request)
+        cache_keys = {name: _cache_key(requests[name]) for name in formats}
+        results = {}
+        for name in formats:
+            with timing.stage("cache_read"):
+                cached = read_fetch_entry(cache_keys[name], FetchResult)
+            if cached is not None:
+                results[name], freshness = cached
+                if freshness == STALE:
+                    self._refresh(requests[name], cache_keys[name])
+        missing = {name: requests[name] for name in formats if name not in results}
+        for name in missing:
+            with timing.stage("cache_read"):
+                failure = read_fetch_failure(cache_keys[name])
+            if failure is not None:
+                raise failure
+        if missing:
+            flight_key = "formats:" + ",".join(cache_keys[name] for name in missing)
+            deadline = _deadline(request)
+            try:
+                async with asyncio.timeout_at(deadline):
+                    fetched = await self._fetches.run(
+                        flight_key,
+                        lambda: self._fetch_formats_and_store(missing, cache_keys),
+                        deadline,
+                    )
+            except asyncio.TimeoutError:
+                raise _timeout_error(request)
+            results.update(fetched)
+        return {name: results[name] for name in formats}
+
+    def _refresh(self, request: FetchRequest, cache_key: str) -> None:
+        """Refetch a stale result in the background, sharing any live fetch."""
+
+        async def refresh() -> None:
+            try:
+                # Kept apart from the timings of the fetch that served stale.
+                with timing.measure():
+                    deadline = _deadline(request)
+                    async with asyncio.timeout_at(deadline):
+                        await self._fetches.run(
+                            cache_key,
+                            lambda: self._fetch_and_store(request, cache_key),
+                            deadline,
+                        )
+            except Exception:
+                # The stale result was already served; a failed refresh
+                # leaves it in place until it expires.
+                pass
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _fetch_and_store(
+        self, request: FetchRequest, cache_key: str
+    ) -> FetchResult:
+        # Shared work has no deadline of its own: each waiter applies its own,
+        # and the work is cancelled once every waiter has gone.
+        try:
+            result = await self._fetch_within_budget(request)
+        except FetchError as error:
+            if _negatively_cacheable(error):
+                with timing.stage("cache_write"):
+                    write_fetch_failure(cache_key, error)
+            raise
+        with timing.stage("cache_write"):
+            write_fetch_result(cache_key, result)
         return result
 
-    async def _fetch_within_budget(self, request: FetchRequest) -> FetchResult:
-        rendered_html = await render_browser(request.url, request.timeout)
+    async def _fetch_formats_and_store(
+        self, requests: dict[str, FetchRequest], cache_keys: dict[str, str]
+    ) -> dict[str, FetchResult]:
+        request = next(iter(requests.values()))
+        derived = {}
         try:
-            extracted = await extract_readability(rendered_html)
-        except FetchError:
+            rendered_html, extracted = await self._render_and_extract(request)
+        except FetchError as error:
+            # Render and extraction failures apply to every format.
+            if _negatively_cacheable(error):
+                with timing.stage("cache_write"):
+                    for name in requests:
+                        write_fetch_failure(cache_keys[name], error)
             raise
-        except Exception:
-            raise FetchError(ERROR_NO_CONTENT, "Fetched content is empty")
-        if not extracted or not extracted.get("html"):
-            raise FetchError(ERROR_NO_CONTENT, "Fetched content is empty")
+        results = {
+            name: await self._result(format_request, rendered_html, extracted, derived)
+            for name, format_request in requests.items()
+        }
+        with timing.stage("cache_write"):
+            write_fetch_results(
+                (cache_keys[name], result) for name, result in results.items()
+            )
+        return results
+
+    async def _fetch_within_budget(self, request: FetchRequest) -> FetchResult:
+        rendered_html, extracted = await self._render_and_extract(request)
+        return await self._result(request, rendered_html, extracted)
+
+    async def _render_and_extract(self, request: FetchRequest) -> tuple[str, dict]:
+        if request.loading_strategy != "auto":
+            return await self._load_and_extract(request, request.loading_strategy)
         try:
-            content = await self._convert(request, rendered_html, extracted)
+            rendered_html, extracted = await self._load_and_extract(request, "http")
+        except FetchError as error:
+            if not _browser_may_help(error):
+                raise
+            return await self._load_and_extract(request, "browser")
+        if _looks_js_dependent(rendered_html, extracted):
+            return await self._load_and_extract(request, "browser")
+        return rendered_html, extracted
+
+    async def _load_and_extract(
+        self, request: FetchRequest, strategy: str
+    ) -> tuple[str, dict]:
+        rendered_html, load_metadata = await self._renders.run(
+            f"{strategy}:{request.url}",
+            lambda: self._load(request, strategy),
+            _deadline(request),
+        )
+        readability_key = _readability_key(rendered_html)
+        with timing.stage("cache_read"):
+            extracted = read_stage(READABILITY_STAGE, readability_key)
+        if not _valid_extraction(extracted):
+            try:
+                with timing.stage("extraction"):
+                    extracted = await extract_readability(
+                        rendered_html, workers=self.readability_workers
+                    )
+            except FetchError:
+                raise
+            except Exception:
+                # Readability could not run; unlike an empty article this says
+                # nothing about the page, so it is never negatively cached.
+                raise FetchError(ERROR_EXTRACTION, "Content extraction failed")
+            if not extracted or not extracted.get("html"):
+                raise FetchError(ERROR_NO_CONTENT, "Fetched content is empty")
+            with timing.stage("cache_write"):
+                write_stage(READABILITY_STAGE, readability_key, extracted)
+        if load_metadata:
+            extracted = {
+                **extracted,
+                "metadata": {**extracted.get("metadata", {}), **load_metadata},
+            }
+        return rendered_html, extracted
+
+    async def _load(self, request: FetchRequest, strategy: str) -> tuple[str, dict]:
+        """Load a URL, reusing a cached snapshot from the same strategy.
+
+        ``browser`` renders the page and ``http`` fetches the document alone.
+        ``adaptive`` renders with a settle window that ends once the page is
+        quiet. Returns the snapshot with metadata about loading it, which is
+        cached alongside it: ``settleSeconds`` for ``adaptive``, and
+        ``blockedRequests`` for renders with a ``CARNIVORE_BLOCKLIST``.
+
+        A snapshot past its TTL is revalidated with a conditional request for
+        the main document. On 304 it is reused and re-stamped, so extraction
+        is served from the readability stage instead of running again.
+        """
+        blocklist = configured_blocklist() if strategy != "http" else None
+        rendered_key = _rendered_html_key(
+            request.url,
+            LOADING_STRATEGY_IDS[strategy],
+            blocklist.digest if blocklist is not None else None,
+        )
+        with timing.stage("cache_read"):
+            cached = read_stage(RENDERED_HTML_STAGE, rendered_key)
+        if cached is not None and isinstance(cached.get("html"), str):
+            fetched_at = cached.get("fetched_at", 0)
+            validators = cached.get("validators")
+            load_metadata = cached.get("load_metadata")
+            if not isinstance(fetched_at, (int, float)):
+                fetched_at = 0
+            if not isinstance(load_metadata, dict):
+                load_metadata = {}
+            if cache_freshness(fetched_at) == FRESH:
+                return cached["html"], load_metadata
+            unchanged = False
+            if isinstance(validators, dict):
+                with timing.stage("revalidation"):
+                    unchanged = await revalidate_document(
+                        request.url, validators, request.timeout
+                    )
+            if unchanged:
+                _write_rendered_html(
+                    rendered_key, cached["html"], validators, load_metadata
+                )
+                return cached["html"], load_metadata
+        validators = {}
+        stats = {}
+        if strategy == "http":
+            with timing.stage("navigation"):
+                rendered_html = await fetch_document(
+                    request.url,
+                    request.timeout,
+                    client=self.document_client,
+                    validators=validators,
+                )
+        else:
+            async with self.scheduler.slot(request.url, request.priority) as waited:
+                timing.record("queue_wait", waited)
+                if waited >= request.timeout:
+                    raise _timeout_error(request)
+                rendered_html = await render_browser(
+                    request.url,
+                    request.timeout - waited,
+                    pool=self.browser_pool,
+                    validators=validators,
+                    settle="adaptive" if strategy == "adaptive" else "fixed",
+                    blocklist=blocklist,
+                    stats=stats,
+                )
+        load_metadata = {}
+        if strategy == "adaptive" and "settle_seconds" in stats:
+            load_metadata["settleSeconds"] = round(stats["settle_seconds"], 3)
+        if "blocked_requests" in stats:
+            load_metadata["blockedRequests"] = stats["blocked_requests"]
+        _write_rendered_html(rendered_key, rendered_html, validators, load_metadata)
+        return rendered_html, load_metadata
+
+    async def _result(
+        self,
+        request: FetchRequest,
+        rendered_html: str,
+        extracted: dict,
+        derived: dict | None = None,
+    ) -> FetchResult:
+        try:
+            content = await self._convert(request, rendered_html, extracted, derived)
         except FetchError:
             raise
         except Exception:
@@ -96,32 +602,243 @@ class FetchPipeline:
         }
         return FetchResult(format=request.format, content=content, metadata=metadata)
 
-    async def _convert(self, request, rendered_html, extracted):
+    async def _convert(self, request, rendered_html, extracted, derived=None):
         polished_html = extracted["html"]
         if request.format == "full_html":
-            html = rendered_html
-            if request.resource_mode == "omit":
-                return remove_resources(html)
-            if request.resource_mode == "embed":
-                return await embed_html(request.url, html)
-            return html
+            return await _apply_resource_mode(
+                request.url, rendered_html, request.resource_mode
+            )
 
-        html = polished_html
-        if request.resource_mode == "omit":
-            html = remove_resources(html)
-        elif request.resource_mode == "embed":
-            html = await embed_html(request.url, html)
+        if derived is not None and "html" in derived:
+            # html and markdown outputs share the resource-processed article.
+            html = derived["html"]
+        else:
+            html = await _apply_resource_mode(
+                request.url, polished_html, request.resource_mode
+            )
+            if derived is not None:
+                derived["html"] = html
         if request.format == "html":
             return html
         try:
-            markdown = await html_to_markdown(html)
+            with timing.stage("conversion"):
+                markdown = await html_to_markdown(
+                    html,
+                    server=self.pandoc_server,
+                    engine=request.markdown_engine,
+                    timeout=request.timeout,
+                )
         except Exception:
             markdown = None
         if markdown:
             return markdown
-        rendered_html = remove_resources(rendered_html)
-        return await html_to_markdown(rendered_html)
+        rendered_html = await _apply_resource_mode(request.url, rendered_html, "omit")
+        with timing.stage("conversion"):
+            return await html_to_markdown(
+                rendered_html,
+                server=self.pandoc_server,
+                engine=request.markdown_engine,
+                timeout=request.timeout,
+            )
+
+
+async def _apply_resource_mode(url: str, html: str, resource_mode: str) -> str:
+    with timing.stage("resources"):
+        if resource_mode == "omit":
+            return remove_resources(html)
+        if resource_mode == "embed":
+            return await embed_html(url, html)
+        return html
+
+
+def _write_rendered_html(
+    key: str,
+    rendered_html: str,
+    validators: dict,
+    load_metadata: dict | None = None,
+) -> None:
+    payload = {
+        "html": rendered_html,
+        "fetched_at": time.time(),
+        "validators": validators,
+    }
+    if load_metadata:
+        payload["load_metadata"] = load_metadata
+    with timing.stage("cache_write"):
+        write_stage(RENDERED_HTML_STAGE, key, payload)
+
+
+def _browser_may_help(error: FetchError) -> bool:
+    """Whether an HTTP-only failure is worth retrying in the browser."""
+    if error.code in (ERROR_POLICY, ERROR_RESOURCE, ERROR_TIMEOUT):
+        return False
+    return not (
+        error.code == ERROR_HTTP and error.status in NEGATIVE_CACHE_HTTP_STATUSES
+    )
+
+
+def _looks_js_dependent(html: str, extracted: dict) -> bool:
+    length = extracted.get("metadata", {}).get("length")
+    if not isinstance(length, int):
+        from bs4 import BeautifulSoup
+
+        length = len(BeautifulSoup(extracted["html"], "html.parser").get_text())
+    return length < AUTO_MIN_TEXT_LENGTH or bool(JS_REQUIRED_PATTERN.search(html))
+
+
+def _valid_extraction(extracted) -> bool:
+    return (
+        isinstance(extracted, dict)
+        and isinstance(extracted.get("html"), str)
+        and bool(extracted["html"])
+        and isinstance(extracted.get("metadata", {}), dict)
+    )
+
+
+# Stage modules load Playwright, BeautifulSoup, and helper processes. They are
+# imported on first use, so cache hits and invalid requests never load them.
+
+
+async def render_browser(*args, **kwargs) -> str:
+    from .render import render_browser
+
+    return await render_browser(*args, **kwargs)
+
+
+async def revalidate_document(*args, **kwargs) -> bool:
+    from .render import revalidate_document
+
+    return await revalidate_document(*args, **kwargs)
+
+
+async def fetch_document(*args, **kwargs) -> str:
+    from .document import fetch_document
+
+    return await fetch_document(*args, **kwargs)
+
+
+async def extract_readability(*args, **kwargs) -> dict:
+    from .extract import extract_readability
+
+    return await extract_readability(*args, **kwargs)
+
+
+async def html_to_markdown(*args, **kwargs) -> str:
+    from .convert import html_to_markdown
+
+    return await html_to_markdown(*args, **kwargs)
+
+
+async def embed_html(*args, **kwargs) -> str:
+    from .convert import embed_html
+
+    return await embed_html(*args, **kwargs)
+
+
+def remove_resources(html: str) -> str:
+    from .convert import remove_resources
+
+    return remove_resources(html)
+
+
+class _Flights:
+    __slots__ = ("fetches", "renders")
+
+    def __init__(self):
+        self.fetches = SingleFlight()
+        self.renders = SingleFlight()
+
+
+class _LoopDefaults(_Flights):
+    __slots__ = ("scheduler",)
+
+    def __init__(self):
+        super().__init__()
+        self.scheduler = RenderScheduler()
+
+
+# Schedulers and single flights hold futures of one event loop, so the state
+# shared between pipelines is kept per loop.
+_loop_state: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _loop_defaults() -> _LoopDefaults:
+    loop = asyncio.get_running_loop()
+    defaults = _loop_state.get(loop)
+    if defaults is None:
+        defaults = _loop_state[loop] = _LoopDefaults()
+    return defaults
+
+
+# Module-level ``fetch`` calls share one pipeline per event loop, so their
+# stale-while-revalidate refreshes outlive the call that served stale content
+# and concurrent calls for one URL coalesce.
+_default_pipelines: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _default_pipeline() -> FetchPipeline:
+    loop = asyncio.get_running_loop()
+    pipeline = _default_pipelines.get(loop)
+    if pipeline is None:
+        pipeline = _default_pipelines[loop] = FetchPipeline()
+    return pipeline
 
 
 async def fetch(request: FetchRequest) -> FetchResult:
-    return await FetchPipeline().fetch(request)
+    return await _default_pipeline().fetch(request)
+
+
+async def fetch_many(
+    requests: Iterable[FetchRequest],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    pipeline: FetchPipeline | None = None,
+) -> AsyncIterator[BatchResult]:
+    """Fetch requests with bounded concurrency, yielding in completion order.
+
+    ``requests`` is consumed lazily, so it may stream from a file. Without an
+    explicit pipeline, the batch owns a ``FetchPipeline.pooled`` one sized for
+    ``concurrency``; its resources start on first use and close when the
+    iterator finishes.
+    """
+    if concurrency <= 0:
+        raise ValueError("Batch concurrency must be positive")
+    owned = pipeline is None
+    if owned:
+        pipeline = FetchPipeline.pooled(concurrency)
+    pending = enumerate(requests)
+    completed: asyncio.Queue = asyncio.Queue()
+
+    async def work() -> None:
+        try:
+            for index, request in pending:
+                try:
+                    result = await pipeline.fetch(request)
+                except FetchError as error:
+                    completed.put_nowait(BatchResult(index, request, error=error))
+                except Exception:
+                    completed.put_nowait(
+                        BatchResult(index, request, error=FetchError(ERROR_INTERNAL))
+                    )
+                else:
+                    completed.put_nowait(BatchResult(index, request, result=result))
+        finally:
+            completed.put_nowait(None)
+
+    workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            item = await completed.get()
+            if item is None:
+                running -= 1
+                continue
+            yield item
+        for worker in workers:
+            # Surface failures of the request iterable itself.
+            await worker
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if owned:
+            await pipeline.aclose()
@@ -0,0 +1,275 @@
+"""Network policy shared by browser renders and HTTP-only document loads.
+
+``RenderPolicy`` enforces the scheme and address space of every navigation
+hop and bounds redirects, subrequests, transferred bytes, and document
+sizes. Host names are resolved through a process-wide ``HostResolver`` cache
+shared by every fetch. Nothing here needs Playwright, so the HTTP-only
+loading strategy can apply the same policy without loading the browser
+stack.
+"""
+
+import asyncio
+import ipaddress
+import os
+import socket
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+from .blocklist import Blocklist
+from .models import ERROR_POLICY, ERROR_RESOURCE, FetchError
+
+MAX_REDIRECTS = 10
+MAX_MAIN_DOCUMENT_BYTES = 10 * 1024 * 1024
+MAX_DOM_BYTES = 10 * 1024 * 1024
+MAX_SUBRESOURCE_REQUESTS = 200
+MAX_TRANSFER_BYTES = 50 * 1024 * 1024
+
+DEFAULT_DNS_CACHE_TTL = 60.0
+# Failed lookups are remembered briefly so a dead host is not re-queried per hop.
+DNS_NEGATIVE_CACHE_TTL = 5.0
+DNS_CACHE_MAX_ENTRIES = 1024
+DNS_RESOLVERS = ("system", "aiodns")
+
+REDIRECT_STATUSES = frozenset((300, 301, 302, 303, 307, 308))
+# Main-document validators recorded for conditional revalidation.
+CONDITIONAL_HEADERS = {"etag": "If-None-Match", "last-modified": "If-Modified-Since"}
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    " (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
+)
+EXTRA_HTTP_HEADERS = {
+    "Sec-CH-UA": '"Chromium";v="130", "Not_A Brand";v="24"',
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def _host_is_loopback(host: str) -> bool:
+    host = (host or "").strip("[]").lower()
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _address_allowed(address: str, allow_loopback: bool) -> bool:
+    parsed = ipaddress.ip_address(address)
+    if parsed.is_loopback:
+        return allow_loopback
+    return parsed.is_global
+
+
+async def _system_lookup(host: str) -> list[str]:
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except OSError:
+        return []
+    return [info[4][0] for info in infos]
+
+
+def _aiodns_lookup():
+    resolver = None
+
+    async def lookup(host: str) -> list[str]:
+        nonlocal resolver
+        if _host_is_literal(host):
+            return [host.strip("[]")]
+        if resolver is None or resolver.loop is not asyncio.get_running_loop():
+            resolver = aiodns.DNSResolver(loop=asyncio.get_running_loop())
+        try:
+            result = await resolver.gethostbyname(host, socket.AF_UNSPEC)
+        except aiodns.error.DNSError:
+            return []
+        return list(result.addresses)
+
+    return lookup
+
+
+def _host_is_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+
+class HostResolver:
+    """Resolve host names with a shared, TTL-bounded cache.
+
+    Only addresses are cached, never allow or deny decisions, so every
+    navigation hop still checks the addresses against its own policy.
+    Failed lookups are cached for ``negative_ttl`` seconds, and concurrent
+    lookups of one host on the same event loop share a single query.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_DNS_CACHE_TTL,
+        negative_ttl: float = DNS_NEGATIVE_CACHE_TTL,
+        max_entries: int = DNS_CACHE_MAX_ENTRIES,
+        lookup=None,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.lookup = lookup or _system_lookup
+        self._entries: OrderedDict[str, tuple[float, tuple[str, ...]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def resolve(self, host: str) -> tuple[str, ...]:
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(host)
+        if entry is not None and entry[0] > loop.time():
+            self._entries.move_to_end(host)
+            return entry[1]
+        inflight = self._inflight.get(host)
+        if inflight is not None and inflight.get_loop() is loop:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only look the host up again if the shared query was dropped.
+                if not inflight.cancelled():
+                    raise
+        future = loop.create_future()
+        self._inflight[host] = future
+        try:
+            addresses = tuple(await self.lookup(host))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Waiters re-raise it; mark it retrieved when nobody waits.
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(host) is future:
+                del self._inflight[host]
+        future.set_result(addresses)
+        self._store(host, addresses, loop.time())
+        return addresses
+
+    def _store(self, host: str, addresses: tuple[str, ...], now: float) -> None:
+        ttl = self.ttl if addresses else self.negative_ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[host] = (now + ttl, addresses)
+        self._entries.move_to_end(host)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_resolvers: dict[tuple[str, float], HostResolver] = {}
+
+
+def host_resolver() -> HostResolver:
+    """Return the process-wide resolver for the configured backend and TTL.
+
+    ``CARNIVORE_DNS_RESOLVER=aiodns`` queries DNS directly on the event loop
+    when the optional ``aiodns`` package is installed; otherwise lookups use
+    ``getaddrinfo`` in the default thread pool.
+    """
+    backend = os.environ.get("CARNIVORE_DNS_RESOLVER", "system")
+    if backend not in DNS_RESOLVERS or aiodns is None:
+        backend = "system"
+    try:
+        ttl = max(float(os.environ.get("CARNIVORE_DNS_CACHE_TTL", "")), 0.0)
+    except ValueError:
+        ttl = DEFAULT_DNS_CACHE_TTL
+    resolver = _resolvers.get((backend, ttl))
+    if resolver is None:
+        lookup = _aiodns_lookup() if backend == "aiodns" else _system_lookup
+        resolver = _resolvers[(backend, ttl)] = HostResolver(ttl=ttl, lookup=lookup)
+    return resolver
+
+
+@dataclass
+class RenderPolicy:
+    """Tracks and enforces the bounded-rendering security policy."""
+
+    allow_loopback: bool
+    redirect_count: int = 0
+    subrequest_count: int = 0
+    transfer_bytes: int = 0
+    error: FetchError | None = None
+    validators: dict[str, str] = field(default_factory=dict)
+    settle: str = "fixed"
+    settle_seconds: float = 0.0
+    blocklist: Blocklist | None = None
+    blocked_requests: int = 0
+    inflight_subrequests: int = 0
+    last_network_activity: float = 0.0
+
+    def fail(self, code: str, message: str, status: int | None = None) -> None:
+        if self.error is None:
+            self.error = FetchError(code, message, status=status)
+
+    async def check_navigation_url(self, url: str) -> None:
+        parsed = urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            self.fail(ERROR_POLICY, "Navigation outside HTTP(S)")
+            return
+        if not await self._host_allowed(parsed.hostname):
+            self.fail(ERROR_POLICY, "Address outside allowed address space")
+
+    async def _host_allowed(self, host: str) -> bool:
+        addresses = await host_resolver().resolve((host or "").lower())
+        return any(
+            _address_allowed(address, self.allow_loopback) for address in addresses
+        )
+
+    def check_redirect(self) -> None:
+        self.redirect_count += 1
+        if self.redirect_count > MAX_REDIRECTS:
+            self.fail(ERROR_POLICY, "Too many redirects")
+
+    def check_subrequest(self) -> None:
+        self.subrequest_count += 1
+        if self.subrequest_count > MAX_SUBRESOURCE_REQUESTS:
+            self.fail(ERROR_RESOURCE, "Too many subresource requests")
+
+    def add_transfer(self, size: int) -> None:
+        self.transfer_bytes += size
+        if self.transfer_bytes > MAX_TRANSFER_BYTES:
+            self.fail(ERROR_RESOURCE, "Transfer limit exceeded")
+
+    def check_document(self, body: str) -> None:
+        if len(body.encode("utf-8")) > MAX_MAIN_DOCUMENT_BYTES:
+            self.fail(ERROR_RESOURCE, "Main document too large")
+
+    def check_dom(self, html: str) -> None:
+        if len(html.encode("utf-8")) > MAX_DOM_BYTES:
+            self.fail(ERROR_RESOURCE, "DOM too large")
+
+    def network_activity(self, started: bool) -> None:
+        self.inflight_subrequests += 1 if started else -1
+        self.last_network_activity = asyncio.get_running_loop().time()
+
+    def network_quiet_for(self, now: float) -> float:
+        if self.inflight_subrequests:
+            return 0.0
+        return now - self.last_network_activity
+
+    def record_validators(self, headers: dict) -> None:
+        for name in CONDITIONAL_HEADERS:
+            value = headers.get(name)
+            if value:
+                self.validators[name] = value
+
+
+def _inject_base_href(html: str, final_url: str) -> str:
+    parsed = urlsplit(final_url)
+    href = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    return html.replace("<head>", f'<head><base href="{href}">', 1)
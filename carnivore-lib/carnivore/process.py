@@ -1,4 +1,8 @@
 import asyncio
+import os
+import time
+
+from . import metrics
 
 
 async def invoke_command(
@@ -7,6 +11,17 @@ async def invoke_command(
     max_output_bytes: int | None = None,
     **kwargs,
 ) -> str:
+    started = time.perf_counter()
+    ok = False
+    try:
+        output = await _run(command, input, max_output_bytes, **kwargs)
+        ok = True
+        return output
+    finally:
+        metrics.subprocess_finished(os.path.basename(command[0]), started, ok)
+
+
+async def _run(command, input, max_output_bytes, **kwargs) -> str:
     process = await asyncio.create_subprocess_exec(
         *command,
         stdin=asyncio.subprocess.PIPE,
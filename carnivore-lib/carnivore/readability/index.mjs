@@ -1,32 +1,17 @@
 import { JSDOM } from 'jsdom';
 import { Readability } from '@mozilla/readability';
 
-// Read HTML content from stdin
-let html = '';
-
-process.stdin.setEncoding('utf8');
-process.stdin.on('data', chunk => {
-  html += chunk;
-});
-
-process.stdin.on('end', () => {
-  if (!html) {
-    console.error('No HTML content provided.');
-    process.exit(1);
-  }
-
+function extract(html) {
   // Parse the HTML content
   const doc = new JSDOM(html);
   const reader = new Readability(doc.window.document);
   const article = reader.parse();
 
   if (!article) {
-    console.error('Failed to parse the article.');
-    process.exit(1);
+    return null;
   }
 
-  // Output the HTML content and metadata to stdout
-  console.log(JSON.stringify({
+  return {
     html: article.content,
     metadata: {
       title: article.title,
@@ -35,5 +20,105 @@ process.stdin.on('end', () => {
       excerpt: article.excerpt,
       siteName: article.siteName,
     }
-  }));
-});
+  };
+}
+
+function writeFrame(id, response) {
+  const body = Buffer.from(JSON.stringify(response), 'utf8');
+  process.stdout.write(`${id} ${body.length}\n`);
+  process.stdout.write(body);
+}
+
+// Resident mode: every frame is a "<id> <byte length>\n" header followed by
+// that many bytes of HTML. Responses use the same framing with a JSON body,
+// so one Node process serves many pages without reloading jsdom.
+function runWorker() {
+  let buffered = Buffer.alloc(0);
+  let pendingChunks = [];
+  let pendingLength = 0;
+  // Bytes needed before the next frame can be parsed; avoids re-joining the
+  // buffer on every chunk of a large document.
+  let needed = 0;
+
+  process.stdin.on('data', chunk => {
+    pendingChunks.push(chunk);
+    pendingLength += chunk.length;
+    if (buffered.length + pendingLength < needed) {
+      return;
+    }
+    buffered = Buffer.concat([buffered, ...pendingChunks]);
+    pendingChunks = [];
+    pendingLength = 0;
+    for (;;) {
+      const newline = buffered.indexOf(10);
+      if (newline === -1) {
+        needed = 0;
+        return;
+      }
+      const [id, length] = buffered.subarray(0, newline).toString('utf8').split(' ');
+      const size = Number(length);
+      if (!id || !Number.isInteger(size) || size < 0) {
+        console.error('Invalid request frame.');
+        process.exit(1);
+      }
+      if (buffered.length < newline + 1 + size) {
+        needed = newline + 1 + size;
+        return;
+      }
+      const html = buffered.subarray(newline + 1, newline + 1 + size).toString('utf8');
+      buffered = buffered.subarray(newline + 1 + size);
+      needed = 0;
+      let article = null;
+      try {
+        article = html ? extract(html) : null;
+      } catch (error) {
+        article = null;
+      }
+      writeFrame(id, article ? { ok: true, ...article } : { ok: false });
+    }
+  });
+
+  process.stdin.on('end', () => {
+    process.exit(0);
+  });
+}
+
+// With --empty-as-null, a page without an article prints null and exits
+// successfully, so callers can tell it apart from a failure to run.
+function runOnce(emptyAsNull) {
+  // Read HTML content from stdin
+  let html = '';
+
+  process.stdin.setEncoding('utf8');
+  process.stdin.on('data', chunk => {
+    html += chunk;
+  });
+
+  process.stdin.on('end', () => {
+    if (!html && !emptyAsNull) {
+      console.error('No HTML content provided.');
+      process.exit(1);
+    }
+
+    const article = html ? extract(html) : null;
+
+    if (!article && emptyAsNull) {
+      console.log('null');
+      return;
+    }
+
+    if (!article) {
+      console.error('Failed to parse the article.');
+      process.exit(1);
+    }
+
+    // Output the HTML content and metadata to stdout
+    console.log(JSON.stringify(article));
+  });
+}
+
+if (process.argv.includes('--worker')) {
+  runWorker();
+} else {
+  runOnce(process.argv.includes('--empty-as-null'));
+}
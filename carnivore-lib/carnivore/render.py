@@ -3,15 +3,19 @@
 This module owns the browser and network policy for rendering untrusted
 pages: scheme and address-space enforcement on every navigation hop,
 bounded redirects and resources, a temporary isolated profile, a single
-top-level page, and a fixed settle window.
+top-level page, and a fixed or adaptive settle window. The address, size,
+and redirect limits themselves live in ``policy``. A ``BrowserPool`` can
+keep the browser processes warm while still isolating every render in a
+new context, subresources are served from a shared ``SubresourceCache``
+when HTTP caching rules allow it, and ``revalidate_document`` applies the
+same address policy to conditional requests for previously rendered
+documents.
 """
 
 import asyncio
-import ipaddress
+import http.client
 import shutil
-import socket
 import tempfile
-from dataclasses import dataclass, field
 from urllib.parse import urljoin, urlsplit
 
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
@@ -22,130 +26,55 @@ try:
 except Exception:
     Stealth = None
 
+from . import metrics, timing
+from .blocklist import Blocklist
+from .http_cache import CachedResponse, subresource_cache
 from .models import (
     ERROR_HTTP,
     ERROR_INTERNAL,
     ERROR_INVALID_INPUT,
     ERROR_NETWORK,
-    ERROR_POLICY,
-    ERROR_RESOURCE,
+    ERROR_OVERLOADED,
     ERROR_TIMEOUT,
     FetchError,
 )
-
-SETTLE_WINDOW_SECONDS = 2.0
-MAX_REDIRECTS = 10
-MAX_MAIN_DOCUMENT_BYTES = 10 * 1024 * 1024
-MAX_DOM_BYTES = 10 * 1024 * 1024
-MAX_SUBRESOURCE_REQUESTS = 200
-MAX_TRANSFER_BYTES = 50 * 1024 * 1024
-MAX_OUTPUT_BYTES = 10 * 1024 * 1024
-
-REDIRECT_STATUSES = frozenset((300, 301, 302, 303, 307, 308))
-SKIPPED_RESOURCE_TYPES = frozenset(("image", "media", "font"))
-
-USER_AGENT = (
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-    " (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
+from .policy import (
+    CONDITIONAL_HEADERS,
+    EXTRA_HTTP_HEADERS,
+    MAX_REDIRECTS,
+    REDIRECT_STATUSES,
+    USER_AGENT,
+    RenderPolicy,
+    _host_is_loopback,
+    _inject_base_href,
 )
-EXTRA_HTTP_HEADERS = {
-    "Sec-CH-UA": '"Chromium";v="130", "Not_A Brand";v="24"',
-    "Accept-Language": "en-US,en;q=0.9",
-}
-
-
-def _host_is_loopback(host: str) -> bool:
-    host = (host or "").strip("[]").lower()
-    if host == "localhost":
-        return True
-    try:
-        return ipaddress.ip_address(host).is_loopback
-    except ValueError:
-        return False
-
-
-def _address_allowed(address: str, allow_loopback: bool) -> bool:
-    parsed = ipaddress.ip_address(address)
-    if parsed.is_loopback:
-        return allow_loopback
-    return parsed.is_global
 
+SETTLE_WINDOW_SECONDS = 2.0
+SETTLE_STRATEGIES = ("fixed", "adaptive")
+# Adaptive settling ends once the DOM and subrequests are quiet this long.
+ADAPTIVE_SETTLE_QUIET_SECONDS = 0.5
+ADAPTIVE_SETTLE_MAX_SECONDS = 10.0
 
-async def _resolve_host(host: str) -> list[str]:
-    loop = asyncio.get_running_loop()
-    try:
-        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
-    except OSError:
-        return []
-    return [info[4][0] for info in infos]
-
-
-@dataclass
-class RenderPolicy:
-    """Tracks and enforces the bounded-rendering security policy."""
-
-    allow_loopback: bool
-    redirect_count: int = 0
-    subrequest_count: int = 0
-    transfer_bytes: int = 0
-    error: FetchError | None = None
-    _resolve_cache: dict[str, bool] = field(default_factory=dict)
-
-    def fail(self, code: str, message: str) -> None:
-        if self.error is None:
-            self.error = FetchError(code, message)
-
-    async def check_navigation_url(self, url: str) -> None:
-        parsed = urlsplit(url)
-        if parsed.scheme not in ("http", "https") or not parsed.netloc:
-            self.fail(ERROR_POLICY, "Navigation outside HTTP(S)")
-            return
-        if not await self._host_allowed(parsed.hostname):
-            self.fail(ERROR_POLICY, "Address outside allowed address space")
-
-    async def _host_allowed(self, host: str) -> bool:
-        key = (host or "").lower()
-        if key not in self._resolve_cache:
-            addresses = await _resolve_host(key)
-            self._resolve_cache[key] = any(
-                _address_allowed(address, self.allow_loopback) for address in addresses
-            )
-        return self._resolve_cache[key]
-
-    def check_redirect(self) -> None:
-        self.redirect_count += 1
-        if self.redirect_count > MAX_REDIRECTS:
-            self.fail(ERROR_POLICY, "Too many redirects")
-
-    def check_subrequest(self) -> None:
-        self.subrequest_count += 1
-        if self.subrequest_count > MAX_SUBRESOURCE_REQUESTS:
-            self.fail(ERROR_RESOURCE, "Too many subresource requests")
-
-    def add_transfer(self, size: int) -> None:
-        self.transfer_bytes += size
-        if self.transfer_bytes > MAX_TRANSFER_BYTES:
-            self.fail(ERROR_RESOURCE, "Transfer limit exceeded")
+DEFAULT_BROWSER_POOL_SIZE = 1
+DEFAULT_BROWSER_MAX_USES = 50
+DEFAULT_BROWSER_MAX_QUEUE = 32
 
-    def check_document(self, body: str) -> None:
-        if len(body.encode("utf-8")) > MAX_MAIN_DOCUMENT_BYTES:
-            self.fail(ERROR_RESOURCE, "Main document too large")
+SKIPPED_RESOURCE_TYPES = frozenset(("image", "media", "font"))
 
-    def check_dom(self, html: str) -> None:
-        if len(html.encode("utf-8")) > MAX_DOM_BYTES:
-            self.fail(ERROR_RESOURCE, "DOM too large")
+# Resolves true when no node or text changes happen within the quiet window.
+# The observer lives only for one call, so nothing is left on the page.
+DOM_QUIET_SCRIPT = """(quietMs) => new Promise((resolve) => {
+  let mutated = false;
+  const observer = new MutationObserver(() => { mutated = true; });
+  observer.observe(document, {childList: true, characterData: true, subtree: true});
+  setTimeout(() => { observer.disconnect(); resolve(!mutated); }, quietMs);
+})"""
 
 
 def _is_main_document(request, page) -> bool:
     return request.is_navigation_request() and request.frame == page.main_frame
 
 
-def _inject_base_href(html: str, final_url: str) -> str:
-    parsed = urlsplit(final_url)
-    href = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-    return html.replace("<head>", f'<head><base href="{href}">', 1)
-
-
 async def _handle_main_navigation(route, request, policy: RenderPolicy) -> None:
     current_url = request.url
     final_url = current_url
@@ -173,7 +102,9 @@ async def _handle_main_navigation(route, request, policy: RenderPolicy) -> None:
         await route.abort()
         return
     if status >= 400:
-        policy.fail(ERROR_HTTP, f"HTTP status {status}")
+        policy.fail(ERROR_HTTP, f"HTTP status {status}", status=status)
+    if status == 200 and final_url == request.url:
+        policy.record_validators(response.headers)
     if final_url != request.url:
         body = _inject_base_href(body, final_url)
     await route.fulfill(status=status, content_type="text/html", body=body)
@@ -188,13 +119,50 @@ async def _handle_subresource(route, request, policy: RenderPolicy) -> None:
     if policy.error is not None:
         await route.abort()
         return
-    response = await route.fetch()
-    body = await response.body()
-    policy.add_transfer(len(body))
+    cache = subresource_cache() if request.method == "GET" else None
+    policy.network_activity(started=True)
+    try:
+        cached = headers = None
+        if cache is not None:
+            # ``request.headers`` omits Cookie and other security-sensitive
+            # headers; the credential and Vary checks need all of them.
+            headers = await request.all_headers()
+            cached = cache.lookup(request.url, headers)
+        if cached is not None and cached.fresh():
+            await _fulfill_cached(route, cached, policy)
+            return
+        conditional = {
+            header: cached.validators[name]
+            for name, header in CONDITIONAL_HEADERS.items()
+            if cached is not None and name in cached.validators
+        }
+        if conditional:
+            response = await route.fetch(headers={**request.headers, **conditional})
+            if response.status == 304:
+                cache.refresh(cached, response.headers)
+                await _fulfill_cached(route, cached, policy)
+                return
+        else:
+            response = await route.fetch()
+        body = await response.body()
+        policy.add_transfer(len(body))
+        if policy.error is not None:
+            await route.abort()
+            return
+        if cache is not None:
+            cache.store(request.url, headers, response.status, response.headers, body)
+        await route.fulfill(response=response)
+    finally:
+        policy.network_activity(started=False)
+
+
+async def _fulfill_cached(route, cached: CachedResponse, policy: RenderPolicy):
+    # Cached bytes still count toward the render's transfer budget.
+    policy.add_transfer(len(cached.body))
     if policy.error is not None:
         await route.abort()
         return
-    await route.fulfill(response=response)
+    await route.fulfill(status=cached.status, headers=cached.headers, body=cached.body)
 
 
 def _make_route_handler(page, policy: RenderPolicy):
@@ -207,6 +175,10 @@ def _make_route_handler(page, policy: RenderPolicy):
                 await _handle_main_navigation(route, request, policy)
             elif request.resource_type in SKIPPED_RESOURCE_TYPES:
                 await _safe_abort(route)
+            elif policy.blocklist is not None and policy.blocklist.blocks(request.url):
+                # Blocked before counting toward the subresource limit.
+                policy.blocked_requests += 1
+                await _safe_abort(route)
             else:
                 await _handle_subresource(route, request, policy)
         except Exception:
@@ -244,8 +216,10 @@ async def _within_deadline(operation, deadline: float, timeout: float):
         raise FetchError(ERROR_TIMEOUT, f"Timed out after {timeout} seconds")
 
 
-def _bind_rejections(context) -> None:
+def _bind_rejections(context, allowed_page=None) -> None:
     async def reject_new_page(page):
+        if page is allowed_page:
+            return
         try:
             await page.close()
         except Exception:
@@ -263,28 +237,335 @@ def _bind_rejections(context) -> None:
     )
 
 
-async def render_browser(url: str, timeout: float) -> str:
+async def _navigate(page, url: str, policy: RenderPolicy, deadline, within_deadline):
+    await within_deadline(
+        lambda: page.route("**/*", _make_route_handler(page, policy)),
+    )
+    try:
+        with timing.stage("navigation"):
+            await within_deadline(
+                lambda: page.goto(
+                    url,
+                    wait_until="domcontentloaded",
+                    timeout=max(
+                        1,
+                        int((deadline - asyncio.get_running_loop().time()) * 1000),
+                    ),
+                ),
+            )
+        settle_started = asyncio.get_running_loop().time()
+        with timing.stage("settle"):
+            if policy.settle == "adaptive":
+                await _adaptive_settle(page, policy, deadline, within_deadline)
+            else:
+                await within_deadline(
+                    lambda: asyncio.sleep(SETTLE_WINDOW_SECONDS),
+                )
+        policy.settle_seconds = asyncio.get_running_loop().time() - settle_started
+        with timing.stage("snapshot"):
+            return await within_deadline(page.content)
+    except asyncio.CancelledError:
+        raise
+    except FetchError:
+        raise
+    except Exception:
+        if policy.error is not None:
+            raise policy.error
+        raise FetchError(ERROR_NETWORK, "Navigation failed")
+    finally:
+        _count_resources(policy)
+
+
+def _count_resources(policy: RenderPolicy) -> None:
+    timing.count("redirects", policy.redirect_count)
+    timing.count("subrequests", policy.subrequest_count)
+    timing.count("transfer_bytes", policy.transfer_bytes)
+    if policy.blocklist is not None:
+        timing.count("blocked_requests", policy.blocked_requests)
+
+
+async def _adaptive_settle(page, policy: RenderPolicy, deadline, within_deadline):
+    """Wait until neither the DOM nor routed subrequests changed recently.
+
+    Ends after ``ADAPTIVE_SETTLE_MAX_SECONDS`` at most, and early enough to
+    leave one quiet window before the render deadline for the snapshot.
+    """
+    loop = asyncio.get_running_loop()
+    give_up = min(
+        loop.time() + ADAPTIVE_SETTLE_MAX_SECONDS,
+        deadline - ADAPTIVE_SETTLE_QUIET_SECONDS,
+    )
+    quiet_ms = int(ADAPTIVE_SETTLE_QUIET_SECONDS * 1000)
+    while loop.time() < give_up:
+        dom_quiet = await within_deadline(
+            lambda: page.evaluate(DOM_QUIET_SCRIPT, quiet_ms)
+        )
+        if (
+            dom_quiet
+            and policy.network_quiet_for(loop.time()) >= ADAPTIVE_SETTLE_QUIET_SECONDS
+        ):
+            return
+
+
+def _checked_snapshot(
+    policy: RenderPolicy,
+    rendered: str,
+    validators: dict | None = None,
+    stats: dict | None = None,
+) -> str:
+    if policy.error is not None:
+        raise policy.error
+    policy.check_dom(rendered)
+    if policy.error is not None:
+        raise policy.error
+    if validators is not None:
+        validators.update(policy.validators)
+    if stats is not None:
+        stats["settle_seconds"] = policy.settle_seconds
+        if policy.blocklist is not None:
+            stats["blocked_requests"] = policy.blocked_requests
+    return rendered
+
+
+class BrowserPool:
+    """Keep Chromium processes warm across renders.
+
+    Each render still receives a brand-new isolated context carrying the same
+    identity, stealth, route policy, and rejection bindings as a one-shot
+    render, so only the process launch is shared. Browsers are health-checked
+    on checkout and recycled after ``max_uses`` renders. At most ``max_queue``
+    renders may wait for a free browser before new renders are rejected.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_BROWSER_POOL_SIZE,
+        max_uses: int = DEFAULT_BROWSER_MAX_USES,
+        max_queue: int = DEFAULT_BROWSER_MAX_QUEUE,
+    ):
+        if size <= 0 or max_uses <= 0 or max_queue < 0:
+            raise ValueError("Browser pool limits must be positive")
+        self.size = size
+        self.max_uses = max_uses
+        self.max_queue = max_queue
+        self._playwright_manager = None
+        self._playwright = None
+        self._idle: asyncio.Queue | None = None
+        self._waiting = 0
+        self._closed = False
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Launch every browser up front instead of on first use."""
+        async with self._start_lock:
+            if self._closed:
+                raise FetchError(ERROR_INTERNAL, "Browser pool is closed")
+            if self._idle is not None:
+                return
+            self._playwright_manager = async_playwright()
+            self._playwright = await self._playwright_manager.__aenter__()
+            idle = asyncio.Queue()
+            try:
+                for _ in range(self.size):
+                    idle.put_nowait(_PooledBrowser(await self._launch()))
+            except BaseException:
+                while not idle.empty():
+                    await idle.get_nowait().close()
+                await self._exit_playwright()
+                raise
+            self._idle = idle
+
+    async def close(self) -> None:
+        async with self._start_lock:
+            self._closed = True
+            if self._idle is None:
+                return
+            while not self._idle.empty():
+                await self._idle.get_nowait().close()
+            self._idle = None
+            await self._exit_playwright()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_args):
+        await self.close()
+
+    async def _launch(self):
+        return await self._playwright.chromium.launch(channel="chromium")
+
+    async def _exit_playwright(self) -> None:
+        manager, self._playwright_manager = self._playwright_manager, None
+        self._playwright = None
+        if manager is not None:
+            try:
+                await manager.__aexit__(None, None, None)
+            except Exception:
+                pass
+
+    async def _checkout(self, within_deadline) -> "_PooledBrowser":
+        """Take a browser, waiting for one under ``queue_wait``.
+
+        Only starting the pool or replacing an unhealthy browser is charged to
+        ``browser_launch``.
+        """
+        if self._idle is None:
+            with timing.stage("browser_launch"):
+                await within_deadline(self.start)
+        if not self._idle.empty():
+            pooled = self._idle.get_nowait()
+        elif self._waiting >= self.max_queue:
+            raise FetchError(ERROR_OVERLOADED, "Render queue is full")
+        else:
+            self._waiting += 1
+            try:
+                with timing.stage("queue_wait"):
+                    pooled = await within_deadline(self._idle.get)
+            finally:
+                self._waiting -= 1
+        try:
+            if not pooled.healthy(self.max_uses):
+                await pooled.close()
+                with timing.stage("browser_launch"):
+                    pooled = _PooledBrowser(await within_deadline(self._launch))
+        except BaseException:
+            self._release(_PooledBrowser(None))
+            raise
+        pooled.uses += 1
+        return pooled
+
+    def _release(self, pooled: "_PooledBrowser") -> None:
+        if self._idle is None or self._closed:
+            asyncio.get_running_loop().create_task(pooled.close())
+            return
+        self._idle.put_nowait(pooled)
+
+    async def render(self, url: str, timeout: float) -> str:
+        return await render_browser(url, timeout, pool=self)
+
+    async def _render(self, url, policy, deadline, within_deadline) -> str:
+        pooled = await self._checkout(within_deadline)
+        context = None
+        try:
+            with timing.stage("browser_launch"):
+                context = await within_deadline(
+                    lambda: pooled.browser.new_context(
+                        user_agent=USER_AGENT,
+                        extra_http_headers=EXTRA_HTTP_HEADERS,
+                        # Keep certificate validation strict for public and
+                        # loopback HTTPS.
+                        ignore_https_errors=False,
+                    ),
+                )
+                await within_deadline(lambda: _apply_stealth(context))
+                page = await within_deadline(context.new_page)
+            _bind_rejections(context, allowed_page=page)
+            return await _navigate(page, url, policy, deadline, within_deadline)
+        finally:
+            if context is not None:
+                try:
+                    await within_deadline(context.close)
+                except Exception:
+                    # A context that cannot close cleanly leaves the browser in
+                    # an unknown state; retire it instead of reusing it.
+                    pooled.uses = self.max_uses
+            self._release(pooled)
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+
+    def healthy(self, max_uses: int) -> bool:
+        return (
+            self.browser is not None
+            and self.uses < max_uses
+            and self.browser.is_connected()
+        )
+
+    async def close(self) -> None:
+        browser, self.browser = self.browser, None
+        if browser is None:
+            return
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+
+async def render_browser(
+    url: str,
+    timeout: float,
+    pool: BrowserPool | None = None,
+    validators: dict | None = None,
+    settle: str = "fixed",
+    blocklist: Blocklist | None = None,
+    stats: dict | None = None,
+) -> str:
     """Render a single URL under the bounded browser policy.
 
     Returns the DOM snapshot taken after DOMContentLoaded plus the fixed
     settle window. Raises a stable ``FetchError`` for policy and resource
-    boundary violations.
+    boundary violations. With a ``pool``, the render borrows a warm browser
+    instead of launching and tearing down its own. When ``validators`` is a
+    dict, the main document's ETag and Last-Modified headers are stored in it
+    for ``revalidate_document``.
+
+    ``settle="adaptive"`` replaces the fixed window with one that ends once
+    the DOM and subrequests have been quiet for a short interval. Subrequests
+    matching ``blocklist`` are aborted before they count toward any limit.
+    When ``stats`` is a dict, the time spent settling is stored in it as
+    ``settle_seconds``, and with a blocklist the number of blocked requests
+    as ``blocked_requests``. Inside ``timing.measure()``, the time spent
+    launching, navigating, settling, and snapshotting is recorded as fetch
+    stages, along with the redirects, subrequests, and bytes transferred.
     """
     parsed = urlsplit(url)
     if parsed.scheme not in ("http", "https") or not parsed.netloc:
         raise FetchError(ERROR_INVALID_INPUT, "URL must be an absolute HTTP(S) URL")
+    if settle not in SETTLE_STRATEGIES:
+        raise FetchError(ERROR_INVALID_INPUT, "Unsupported settle strategy")
     allow_loopback = _host_is_loopback(parsed.hostname)
-    policy = RenderPolicy(allow_loopback=allow_loopback)
+    policy = RenderPolicy(
+        allow_loopback=allow_loopback, settle=settle, blocklist=blocklist
+    )
+    metrics.render_in_progress(1)
+    outcome = "cancelled"
+    try:
+        rendered = await _render_snapshot(url, timeout, pool, policy)
+        rendered = _checked_snapshot(policy, rendered, validators, stats)
+        outcome = "ok"
+        return rendered
+    except FetchError as error:
+        outcome = error.code
+        raise
+    except Exception:
+        outcome = ERROR_INTERNAL
+        raise
+    finally:
+        metrics.render_in_progress(-1)
+        metrics.render_finished(outcome)
+
+
+async def _render_snapshot(
+    url: str, timeout: float, pool: BrowserPool | None, policy: RenderPolicy
+) -> str:
     deadline = asyncio.get_running_loop().time() + timeout
+
+    async def within_deadline(operation):
+        return await _within_deadline(operation, deadline, timeout)
+
+    if pool is not None:
+        return await pool._render(url, policy, deadline, within_deadline)
+
     profile_dir = tempfile.mkdtemp(prefix="carnivore-render-")
     playwright_manager = None
     playwright = None
     context = None
     playwright_entered = False
 
-    async def within_deadline(operation):
-        return await _within_deadline(operation, deadline, timeout)
-
     async def cleanup_within_deadline(operation):
         cleanup_task = asyncio.create_task(operation())
         remaining = deadline - asyncio.get_running_loop().time()
@@ -296,49 +577,27 @@ async def render_browser(url: str, timeout: float) -> str:
             pass
 
     try:
-        playwright_manager = async_playwright()
-        playwright = await within_deadline(playwright_manager.__aenter__)
-        playwright_entered = True
-        context = await within_deadline(
-            lambda: playwright.chromium.launch_persistent_context(
-                profile_dir,
-                channel="chromium",
-                user_agent=USER_AGENT,
-                extra_http_headers=EXTRA_HTTP_HEADERS,
-                # Keep certificate validation strict for public and loopback HTTPS.
-                ignore_https_errors=False,
-            ),
-        )
+        with timing.stage("browser_launch"):
+            playwright_manager = async_playwright()
+            playwright = await within_deadline(playwright_manager.__aenter__)
+            playwright_entered = True
+            context = await within_deadline(
+                lambda: playwright.chromium.launch_persistent_context(
+                    profile_dir,
+                    channel="chromium",
+                    user_agent=USER_AGENT,
+                    extra_http_headers=EXTRA_HTTP_HEADERS,
+                    # Keep certificate validation strict for public and
+                    # loopback HTTPS.
+                    ignore_https_errors=False,
+                ),
+            )
         try:
-            await within_deadline(lambda: _apply_stealth(context))
+            with timing.stage("browser_launch"):
+                await within_deadline(lambda: _apply_stealth(context))
             page = context.pages[0]
             _bind_rejections(context)
-            await within_deadline(
-                lambda: page.route("**/*", _make_route_handler(page, policy)),
-            )
-            try:
-                await within_deadline(
-                    lambda: page.goto(
-                        url,
-                        wait_until="domcontentloaded",
-                        timeout=max(
-                            1,
-                            int((deadline - asyncio.get_running_loop().time()) * 1000),
-                        ),
-                    ),
-                )
-                await within_deadline(
-                    lambda: asyncio.sleep(SETTLE_WINDOW_SECONDS),
-                )
-                rendered = await within_deadline(page.content)
-            except asyncio.CancelledError:
-                raise
-            except FetchError:
-                raise
-            except Exception:
-                if policy.error is not None:
-                    raise policy.error
-                raise FetchError(ERROR_NETWORK, "Navigation failed")
+            rendered = await _navigate(page, url, policy, deadline, within_deadline)
         finally:
             try:
                 await within_deadline(context.close)
@@ -352,9 +611,58 @@ async def render_browser(url: str, timeout: float) -> str:
         await cleanup_within_deadline(
             lambda: asyncio.to_thread(shutil.rmtree, profile_dir, ignore_errors=True)
         )
-    if policy.error is not None:
-        raise policy.error
-    policy.check_dom(rendered)
-    if policy.error is not None:
-        raise policy.error
     return rendered
+
+
+async def revalidate_document(url: str, validators: dict, timeout: float) -> bool:
+    """Ask whether a previously rendered main document is unchanged.
+
+    Sends one conditional GET with the recorded validators under the same
+    scheme and address-space policy as a render. Returns True only for a 304
+    answered by ``url`` itself; redirects, errors, timeouts, and policy
+    violations return False so the caller renders the page again.
+    """
+    headers = {
+        header: validators[name]
+        for name, header in CONDITIONAL_HEADERS.items()
+        if isinstance(validators.get(name), str)
+    }
+    parsed = urlsplit(url)
+    if not headers or parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return False
+    policy = RenderPolicy(allow_loopback=_host_is_loopback(parsed.hostname))
+    await policy.check_navigation_url(url)
+    if policy.error is not None:
+        return False
+    try:
+        status = await asyncio.wait_for(
+            asyncio.to_thread(_conditional_status, parsed, headers, timeout),
+            timeout=timeout,
+        )
+    except (asyncio.TimeoutError, OSError, ValueError, http.client.HTTPException):
+        return False
+    return status == 304
+
+
+def _conditional_status(parsed, headers: dict, timeout: float) -> int:
+    if parsed.scheme == "https":
+        # The default context verifies certificates, matching rendering.
+        connection = http.client.HTTPSConnection(
+            parsed.hostname, parsed.port or 443, timeout=timeout
+        )
+    else:
+        connection = http.client.HTTPConnection(
+            parsed.hostname, parsed.port or 80, timeout=timeout
+        )
+    path = parsed.path or "/"
+    if parsed.query:
+        path = f"{path}?{parsed.query}"
+    try:
+        connection.request(
+            "GET",
+            path,
+            headers={"User-Agent": USER_AGENT, **EXTRA_HTTP_HEADERS, **headers},
+        )
+        return connection.getresponse().status
+    finally:
+        connection.close()
@@ -0,0 +1,186 @@
+"""Admission control for browser renders.
+
+A ``RenderScheduler`` sits in front of ``render_browser``. It caps the number
+of concurrent renders, limits how many run against one host at a time with an
+optional delay between their starts, and admits waiting renders by priority so
+interactive requests overtake queued batch work. Time spent waiting is
+returned to the caller, which charges it against the request's timeout.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import os
+from urllib.parse import urlsplit
+
+from . import metrics
+from .models import PRIORITIES
+
+# Each Chromium render is budgeted this much memory when sizing concurrency.
+RENDER_MEMORY_BYTES = 512 * 1024 * 1024
+DEFAULT_HOST_CONCURRENCY = 2
+DEFAULT_HOST_DELAY = 0.0
+PRIORITY_ORDER = {priority: rank for rank, priority in enumerate(PRIORITIES)}
+
+
+def default_render_concurrency() -> int:
+    """Concurrent renders the machine supports: one per CPU, memory allowing."""
+    cpus = os.cpu_count() or 1
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return cpus
+    return max(1, min(cpus, memory // RENDER_MEMORY_BYTES))
+
+
+def _env_number(name: str, default, kind=int):
+    try:
+        return max(kind(os.environ.get(name, default)), 0)
+    except ValueError:
+        return default
+
+
+class _Host:
+    __slots__ = ("running", "next_start")
+
+    def __init__(self):
+        self.running = 0
+        self.next_start = 0.0
+
+
+class RenderScheduler:
+    """Admit renders under global and per-host concurrency limits.
+
+    Limits default to ``CARNIVORE_RENDER_CONCURRENCY`` (sized to the CPUs and
+    memory when unset), ``CARNIVORE_HOST_CONCURRENCY``, and
+    ``CARNIVORE_HOST_DELAY`` seconds between render starts on one host.
+    Waiting renders are admitted in priority order, then first come first
+    served; a render whose host is at its limit does not block others.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        host_concurrency: int | None = None,
+        host_delay: float | None = None,
+    ):
+        if concurrency is None:
+            concurrency = (
+                _env_number("CARNIVORE_RENDER_CONCURRENCY", 0)
+                or default_render_concurrency()
+            )
+        if host_concurrency is None:
+            host_concurrency = _env_number(
+                "CARNIVORE_HOST_CONCURRENCY", DEFAULT_HOST_CONCURRENCY
+            )
+        if host_delay is None:
+            host_delay = _env_number(
+                "CARNIVORE_HOST_DELAY", DEFAULT_HOST_DELAY, kind=float
+            )
+        if concurrency <= 0 or host_concurrency <= 0 or host_delay < 0:
+            raise ValueError("Render scheduler limits must be positive")
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self.host_delay = host_delay
+        self.running = 0
+        self.admitted = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._queue: list[tuple[int, int, str, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._hosts: dict[str, _Host] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str, priority: str = "interactive"):
+        """Wait for a render slot for ``url``; yields the seconds waited."""
+        loop = asyncio.get_running_loop()
+        host = (urlsplit(url).hostname or "").lower()
+        queued_at = loop.time()
+        admission = loop.create_future()
+        heapq.heappush(
+            self._queue,
+            (PRIORITY_ORDER.get(priority, 0), next(self._order), host, admission),
+        )
+        self._dispatch()
+        try:
+            await admission
+        except asyncio.CancelledError:
+            if admission.done() and not admission.cancelled():
+                # Admitted just as the caller gave up; hand the slot on.
+                self._release(host)
+            raise
+        waited = loop.time() - queued_at
+        self.admitted += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            yield waited
+        finally:
+            self._release(host)
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        deferred = []
+        retry_at = None
+        while self._queue and self.running < self.concurrency:
+            entry = heapq.heappop(self._queue)
+            _priority, _order, host, admission = entry
+            if admission.done():
+                continue
+            state = self._hosts.get(host)
+            if state is not None and state.running >= self.host_concurrency:
+                deferred.append(entry)
+                continue
+            if state is not None and state.next_start > now:
+                deferred.append(entry)
+                if retry_at is None or state.next_start < retry_at:
+                    retry_at = state.next_start
+                continue
+            if state is None:
+                state = self._hosts[host] = _Host()
+            state.running += 1
+            state.next_start = now + self.host_delay
+            self.running += 1
+            admission.set_result(None)
+        for entry in deferred:
+            heapq.heappush(self._queue, entry)
+        if retry_at is not None and (
+            self._timer is None or self._timer.when() > retry_at
+        ):
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = loop.call_at(retry_at, self._wake)
+        metrics.render_queue(self.running, len(self._queue))
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _release(self, host: str) -> None:
+        loop = asyncio.get_running_loop()
+        self.running -= 1
+        state = self._hosts[host]
+        state.running -= 1
+        if state.running == 0:
+            if state.next_start > loop.time():
+                loop.call_at(state.next_start, self._forget_idle, host, state)
+            else:
+                del self._hosts[host]
+        self._dispatch()
+
+    def _forget_idle(self, host: str, state: _Host) -> None:
+        if self._hosts.get(host) is state and state.running == 0:
+            del self._hosts[host]
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "queued": sum(not entry[3].done() for entry in self._queue),
+            "admitted": self.admitted,
+            "wait_seconds": self.wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
@@ -0,0 +1,292 @@
+"""Long-running local HTTP/JSON fetch service.
+
+``carnivore serve`` keeps one pooled ``FetchPipeline`` warm, so browser
+processes, Readability workers, the pandoc server, and in-process caches
+are reused across requests instead of being started for every CLI call.
+
+``POST /fetch`` takes a JSON request with the same fields as a ``--batch``
+line and answers with the ``--output json`` envelope. A comma-separated
+``format`` returns one result per format, and ``"timings": true`` adds
+per-stage timings to each result. Errors keep their stable codes and
+map to HTTP statuses through ``ERROR_STATUSES``. ``GET /health`` reports
+whether the service accepts work, and ``GET /metrics`` exposes the
+process-wide ``metrics`` registry in the Prometheus text format. On
+SIGTERM or SIGINT the service drains: new fetches are refused with 503
+while in-flight ones finish, then the pipeline is closed.
+"""
+
+import asyncio
+import json
+import signal
+from http import HTTPStatus
+
+from . import metrics
+from .models import (
+    DEFAULT_TIMEOUT,
+    ERROR_CONVERSION,
+    ERROR_EXTRACTION,
+    ERROR_HTTP,
+    ERROR_INTERNAL,
+    ERROR_INVALID_INPUT,
+    ERROR_NETWORK,
+    ERROR_NO_CONTENT,
+    ERROR_OVERLOADED,
+    ERROR_POLICY,
+    ERROR_RESOURCE,
+    ERROR_TIMEOUT,
+    FetchError,
+    request_from_fields,
+)
+from .output import error_envelope, result_envelope, result_fields
+from .pipeline import FetchPipeline
+
+DEFAULT_SERVE_HOST = "127.0.0.1"
+DEFAULT_SERVE_PORT = 8080
+MAX_REQUEST_BYTES = 1024 * 1024
+MAX_HEADER_LINES = 100
+# Clients get this long to send their request line, headers, and body.
+REQUEST_READ_TIMEOUT_SECONDS = 10.0
+# Sent with every 503 so clients back off while the service is overloaded
+# or draining.
+RETRY_AFTER_SECONDS = 1
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+ERROR_STATUSES = {
+    ERROR_INVALID_INPUT: HTTPStatus.BAD_REQUEST,
+    ERROR_POLICY: HTTPStatus.FORBIDDEN,
+    ERROR_NO_CONTENT: HTTPStatus.UNPROCESSABLE_ENTITY,
+    ERROR_RESOURCE: HTTPStatus.UNPROCESSABLE_ENTITY,
+    ERROR_OVERLOADED: HTTPStatus.SERVICE_UNAVAILABLE,
+    ERROR_HTTP: HTTPStatus.BAD_GATEWAY,
+    ERROR_NETWORK: HTTPStatus.BAD_GATEWAY,
+    ERROR_TIMEOUT: HTTPStatus.GATEWAY_TIMEOUT,
+    ERROR_EXTRACTION: HTTPStatus.INTERNAL_SERVER_ERROR,
+    ERROR_CONVERSION: HTTPStatus.INTERNAL_SERVER_ERROR,
+    ERROR_INTERNAL: HTTPStatus.INTERNAL_SERVER_ERROR,
+}
+REQUEST_DEFAULTS = {
+    "format": "markdown",
+    "resource_mode": "omit",
+    "timeout": DEFAULT_TIMEOUT,
+    "markdown_engine": "pandoc",
+    "loading_strategy": "browser",
+    "priority": "interactive",
+}
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FetchService:
+    """Serve ``pipeline`` over HTTP until ``drain`` is called."""
+
+    def __init__(
+        self,
+        pipeline: FetchPipeline,
+        host: str = DEFAULT_SERVE_HOST,
+        port: int = DEFAULT_SERVE_PORT,
+    ):
+        self.pipeline = pipeline
+        self.host = host
+        self.port = port
+        self.draining = False
+        self._server: asyncio.AbstractServer | None = None
+        self.inflight = 0
+        self._drained = asyncio.Event()
+        self.metrics = metrics.enable()
+
+    async def start(self) -> tuple[str, int]:
+        """Listen for connections; returns the bound host and port."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        return self._server.sockets[0].getsockname()[:2]
+
+    def drain(self) -> None:
+        """Refuse new fetches and stop once in-flight ones finish."""
+        self.draining = True
+        if not self.inflight:
+            self._drained.set()
+
+    async def wait_drained(self) -> None:
+        await self._drained.wait()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle_connection(self, reader, writer) -> None:
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(
+                    _read_request(reader), REQUEST_READ_TIMEOUT_SECONDS
+                )
+            except _BadRequest as error:
+                status, envelope = error.status, error_envelope(
+                    FetchError(ERROR_INVALID_INPUT, error.message)
+                )
+            else:
+                status, envelope = await self._respond(method, path, body)
+            if isinstance(envelope, str):
+                payload, content_type = envelope, metrics.CONTENT_TYPE
+            else:
+                payload = json.dumps(envelope, ensure_ascii=False, sort_keys=True)
+                content_type = JSON_CONTENT_TYPE
+            writer.write(_response_bytes(status, payload.encode("utf-8"), content_type))
+            await writer.drain()
+        except (
+            asyncio.TimeoutError,
+            asyncio.IncompleteReadError,
+            ConnectionError,
+            ValueError,
+        ):
+            # Timed out, disconnected, or sent an over-long line.
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, path: str, body: bytes):
+        if path == "/health":
+            if method != "GET":
+                return _method_not_allowed()
+            return self._health()
+        if path == "/metrics":
+            if method != "GET":
+                return _method_not_allowed()
+            return HTTPStatus.OK, self.metrics.render()
+        if path != "/fetch":
+            return HTTPStatus.NOT_FOUND, error_envelope(
+                FetchError(ERROR_INVALID_INPUT, "Unknown endpoint")
+            )
+        if method != "POST":
+            return _method_not_allowed()
+        if self.draining:
+            return HTTPStatus.SERVICE_UNAVAILABLE, error_envelope(
+                FetchError(ERROR_INTERNAL, "Service is shutting down")
+            )
+        self.inflight += 1
+        try:
+            return await self._fetch(body)
+        finally:
+            self.inflight -= 1
+            if self.draining and not self.inflight:
+                self._drained.set()
+
+    def _health(self):
+        envelope = {
+            "ok": not self.draining,
+            "status": "draining" if self.draining else "ok",
+            "inflight": self.inflight,
+            "renders": self.pipeline.scheduler.stats(),
+        }
+        if self.draining:
+            return HTTPStatus.SERVICE_UNAVAILABLE, envelope
+        return HTTPStatus.OK, envelope
+
+    async def _fetch(self, body: bytes):
+        try:
+            try:
+                fields = json.loads(body)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise FetchError(ERROR_INVALID_INPUT, "Request body is not valid JSON")
+            timings = isinstance(fields, dict) and fields.pop("timings", False)
+            if not isinstance(timings, bool):
+                raise FetchError(ERROR_INVALID_INPUT, "Timings must be a boolean")
+            request = request_from_fields(fields, REQUEST_DEFAULTS, source="fetch")
+            formats = request.format.split(",")
+            if len(formats) > 1:
+                results = await self.pipeline.fetch_formats(request, formats)
+                envelope = {
+                    "ok": True,
+                    "results": [
+                        result_fields(result, timings=timings)
+                        for result in results.values()
+                    ],
+                }
+            else:
+                envelope = result_envelope(
+                    await self.pipeline.fetch(request), timings=timings
+                )
+        except FetchError as error:
+            return ERROR_STATUSES.get(
+                error.code, HTTPStatus.INTERNAL_SERVER_ERROR
+            ), error_envelope(error)
+        except Exception:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, error_envelope(
+                FetchError(ERROR_INTERNAL)
+            )
+        return HTTPStatus.OK, envelope
+
+
+def _method_not_allowed():
+    return HTTPStatus.METHOD_NOT_ALLOWED, error_envelope(
+        FetchError(ERROR_INVALID_INPUT, "Method not allowed")
+    )
+
+
+async def _read_request(reader) -> tuple[str, str, bytes]:
+    request_line = await reader.readline()
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        raise _BadRequest(HTTPStatus.BAD_REQUEST, "Malformed HTTP request")
+    method, target, _version = parts
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise _BadRequest(HTTPStatus.BAD_REQUEST, "Too many request headers")
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise _BadRequest(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise _BadRequest(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0:
+        raise _BadRequest(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > MAX_REQUEST_BYTES:
+        raise _BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def _response_bytes(
+    status: HTTPStatus, body: bytes, content_type: str = JSON_CONTENT_TYPE
+) -> bytes:
+    retry_after = (
+        f"Retry-After: {RETRY_AFTER_SECONDS}\r\n"
+        if status == HTTPStatus.SERVICE_UNAVAILABLE
+        else ""
+    )
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"{retry_after}"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def serve(host: str, port: int, concurrency: int) -> int:
+    """Run the service until SIGTERM or SIGINT, then drain and exit."""
+    loop = asyncio.get_running_loop()
+    async with FetchPipeline.pooled(concurrency) as pipeline:
+        service = FetchService(pipeline, host, port)
+        bound_host, bound_port = await service.start()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, service.drain)
+        print(
+            json.dumps({"ok": True, "listening": f"http://{bound_host}:{bound_port}"}),
+            flush=True,
+        )
+        try:
+            await service.wait_drained()
+        finally:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(signum)
+    return 0
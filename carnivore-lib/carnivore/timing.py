@@ -0,0 +1,107 @@
+"""Per-fetch stage timings and resource counters.
+
+``FetchPipeline`` opens a ``FetchTimings`` for every fetch with
+``measure()``; the stages it runs, including ``render_browser``, add to it
+through ``stage()`` and ``count()`` without passing it around. Tasks
+inherit the current timings, so work shared between concurrent callers is
+recorded on the caller that started it. Outside ``measure()`` both are
+no-ops.
+"""
+
+import contextlib
+import time
+from contextvars import ContextVar
+
+STAGES = (
+    "cache_read",
+    "queue_wait",
+    "revalidation",
+    "browser_launch",
+    "navigation",
+    "settle",
+    "snapshot",
+    "extraction",
+    "resources",
+    "conversion",
+    "cache_write",
+)
+
+
+class FetchTimings:
+    """Seconds spent per stage and counters for one fetch."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total: float | None = None
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def add(self, stage_name: str, seconds: float) -> None:
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self) -> None:
+        """Stop the clock; later calls keep the first total."""
+        if self.total is None:
+            self.total = time.perf_counter() - self.started
+
+    def elapsed(self) -> float:
+        if self.total is None:
+            return time.perf_counter() - self.started
+        return self.total
+
+    def as_dict(self) -> dict:
+        return {
+            "total": round(self.elapsed(), 4),
+            "stages": {
+                name: round(self.stages[name], 4)
+                for name in (*STAGES, *sorted(set(self.stages) - set(STAGES)))
+                if name in self.stages
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+_current: ContextVar[FetchTimings | None] = ContextVar(
+    "carnivore_fetch_timings", default=None
+)
+
+
+@contextlib.contextmanager
+def measure():
+    """Collect timings for the enclosed fetch; yields the ``FetchTimings``."""
+    timings = FetchTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        timings.finish()
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Add the time spent in the enclosed block to stage ``name``."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def record(name: str, seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def count(name: str, value: int = 1) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.count(name, value)
@@ -1,9 +1,43 @@
+import asyncio
 import json
+import os
+import sqlite3
+import subprocess
+import sys
+from dataclasses import replace
+from pathlib import Path
 
 import pytest
 
-from carnivore.models import FetchRequest, FetchResult
-from carnivore.pipeline import FetchPipeline, _cache_key
+from carnivore import cache as cache_module
+from carnivore import pipeline as pipeline_module
+from carnivore.cache import (
+    COUNTER_FLUSH_LOOKUPS,
+    STATS_DIR,
+    FileCacheBackend,
+    cache_stats,
+    prune_cache,
+    read_fetch_result,
+    write_fetch_result,
+)
+from carnivore.models import (
+    ERROR_EXTRACTION,
+    ERROR_HTTP,
+    ERROR_NO_CONTENT,
+    ERROR_TIMEOUT,
+    FetchError,
+    FetchRequest,
+    FetchResult,
+)
+from carnivore.pipeline import (
+    FetchPipeline,
+    _cache_key,
+    _default_pipeline,
+    _rendered_html_key,
+    fetch,
+    fetch_many,
+)
+from carnivore.scheduler import RenderScheduler
 
 
 @pytest.mark.asyncio
@@ -92,3 +126,903 @@ async def test_corrupt_cache_and_legacy_pickle_are_ignored(monkeypatch, tmp_path
     assert (await FetchPipeline().fetch(request)).content == "fresh"
     envelope = json.loads(cache_file.read_text(encoding="utf-8"))
     assert envelope["payload"]["content"] == "fresh"
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_large_payloads_are_compressed_and_checksummed(monkeypatch, tmp_path, codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    else:
+        monkeypatch.setattr(cache_module, "zstandard", None)
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    expected = FetchResult("html", "<p>repeated paragraph</p>" * 1000, {"t": "A"})
+
+    write_fetch_result("large", expected)
+    cache_file = tmp_path / "large.json"
+    envelope = json.loads(cache_file.read_text(encoding="utf-8"))
+    assert envelope["schema_version"] == 2
+    assert envelope["payload_encoding"] == codec
+    assert cache_file.stat().st_size < len(expected.content) / 10
+    assert read_fetch_result("large", FetchResult) == expected
+
+    envelope["payload"] = envelope["payload"][:-8] + "A" * 8
+    cache_file.write_text(json.dumps(envelope), encoding="utf-8")
+    assert read_fetch_result("large", FetchResult) is None
+
+
+def test_version_one_envelopes_remain_readable(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    payload = {"format": "markdown", "content": "legacy", "metadata": {}}
+    (tmp_path / "legacy.json").write_text(
+        json.dumps(
+            {
+                "schema_version": 1,
+                "key": "legacy",
+                "payload": payload,
+                "payload_sha256": cache_module._payload_checksum(payload),
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    assert read_fetch_result("legacy", FetchResult) == FetchResult(
+        "markdown", "legacy", {}
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_fetch(monkeypatch):
+    calls = 0
+
+    async def fetch_result(self, request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return FetchResult(request.format, "shared content", {})
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    pipeline = FetchPipeline()
+    request = FetchRequest("https://example.com/article")
+
+    results = await asyncio.gather(*(pipeline.fetch(request) for _ in range(5)))
+
+    assert calls == 1
+    # Each caller gets its own timings around the one shared result.
+    assert all(result.content is results[0].content for result in results)
+    assert len(pipeline._fetches) == 0
+    await pipeline.fetch(request)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_separate_default_pipelines_share_scheduler_and_fetches(monkeypatch):
+    calls = 0
+
+    async def fetch_result(self, request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return FetchResult(request.format, "shared content", {})
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    request = FetchRequest("https://example.com/article")
+    own = RenderScheduler(concurrency=1)
+
+    await asyncio.gather(*(FetchPipeline().fetch(request) for _ in range(3)))
+
+    assert calls == 1
+    assert FetchPipeline().scheduler is FetchPipeline().scheduler
+    assert FetchPipeline(scheduler=own).scheduler is own
+
+
+@pytest.mark.asyncio
+async def test_coalesced_callers_share_errors(monkeypatch):
+    calls = 0
+
+    async def fail(self, request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise FetchError(ERROR_NO_CONTENT, "Fetched content is empty")
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fail)
+    pipeline = FetchPipeline()
+    request = FetchRequest("https://example.com/article")
+
+    results = await asyncio.gather(
+        pipeline.fetch(request), pipeline.fetch(request), return_exceptions=True
+    )
+
+    assert calls == 1
+    assert [error.code for error in results] == [ERROR_NO_CONTENT] * 2
+
+
+@pytest.mark.asyncio
+async def test_coalesced_caller_timeout_does_not_cancel_shared_fetch(monkeypatch):
+    async def fetch_result(self, request):
+        await asyncio.sleep(0.1)
+        return FetchResult(request.format, "shared content", {})
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    pipeline = FetchPipeline()
+    url = "https://example.com/article"
+
+    patient = asyncio.create_task(pipeline.fetch(FetchRequest(url, timeout=5)))
+    await asyncio.sleep(0)
+    with pytest.raises(FetchError, match="timeout"):
+        await pipeline.fetch(FetchRequest(url, timeout=0.01))
+
+    assert (await patient).content == "shared content"
+
+
+@pytest.mark.asyncio
+async def test_impatient_first_caller_does_not_cut_later_callers_short(monkeypatch):
+    budgets = []
+
+    async def fetch_result(self, request):
+        budgets.append(request.timeout)
+        if request.url.endswith("/stage-timeout") and request.timeout < 1:
+            await asyncio.sleep(request.timeout)
+            raise FetchError(ERROR_TIMEOUT, "Timed out")
+        await asyncio.sleep(0.05)
+        return FetchResult(request.format, "shared content", {})
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    pipeline = FetchPipeline()
+
+    for url in ("https://example.com/article", "https://example.com/stage-timeout"):
+        impatient = asyncio.create_task(pipeline.fetch(FetchRequest(url, timeout=0.01)))
+        await asyncio.sleep(0)
+        patient = await pipeline.fetch(FetchRequest(url, timeout=5))
+        with pytest.raises(FetchError, match="timeout"):
+            await impatient
+        assert patient.content == "shared content"
+
+    # The shared work outlives the impatient caller; a stage that timed out on
+    # its budget is retried once with the patient caller's.
+    assert budgets == [0.01, 0.01, 5]
+
+
+@pytest.mark.asyncio
+async def test_shared_fetch_is_cancelled_when_every_caller_leaves(monkeypatch):
+    cancelled = asyncio.Event()
+
+    async def hang(self, request):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", hang)
+    pipeline = FetchPipeline()
+    request = FetchRequest("https://example.com/article", timeout=0.01)
+
+    for _ in range(2):
+        with pytest.raises(FetchError, match="timeout"):
+            await pipeline.fetch(request)
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert len(pipeline._fetches) == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_for_one_url_share_a_browser_render(monkeypatch):
+    renders = 0
+
+    async def render(url, timeout, **_options):
+        nonlocal renders
+        renders += 1
+        await asyncio.sleep(0.01)
+        return "<html><body><p>rendered</p></body></html>"
+
+    async def extract(html, **_options):
+        return {"html": "<p>rendered</p>", "metadata": {}}
+
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    pipeline = FetchPipeline()
+    url = "https://example.com/article"
+
+    await asyncio.gather(
+        pipeline.fetch(FetchRequest(url, format="html")),
+        pipeline.fetch(FetchRequest(url, format="full_html", resource_mode="link")),
+    )
+
+    assert renders == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_yields_in_completion_order_with_bounded_concurrency(
+    monkeypatch,
+):
+    running = 0
+    peak = 0
+
+    async def fetch_result(self, request):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(float(request.url.rsplit("/", 1)[1]) / 100)
+        running -= 1
+        if request.url.endswith("/0"):
+            raise FetchError(ERROR_NO_CONTENT, "Fetched content is empty")
+        return FetchResult(request.format, request.url, {})
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    requests = [FetchRequest(f"https://example.com/{delay}") for delay in (5, 3, 0, 1)]
+
+    items = [
+        item
+        async for item in fetch_many(requests, concurrency=2, pipeline=FetchPipeline())
+    ]
+
+    assert peak == 2
+    assert [item.index for item in items] == [1, 2, 3, 0]
+    assert items[1].error.code == ERROR_NO_CONTENT
+    assert items[1].result is None
+    assert [item.request for item in items] == [requests[i] for i in (1, 2, 3, 0)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_formats_renders_once_and_caches_each_format(monkeypatch, tmp_path):
+    calls = {"render": 0, "extract": 0, "strip": 0}
+
+    async def render(url, timeout, **_options):
+        calls["render"] += 1
+        return "<html><body><article><p>rendered</p></article></body></html>"
+
+    async def extract(html, **_options):
+        calls["extract"] += 1
+        return {"html": "<p>article</p>", "metadata": {"title": "Article"}}
+
+    def strip(html):
+        calls["strip"] += 1
+        return html
+
+    async def convert(html, **_options):
+        return "article"
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    monkeypatch.setattr(pipeline_module, "remove_resources", strip)
+    monkeypatch.setattr(pipeline_module, "html_to_markdown", convert)
+    request = FetchRequest("https://example.com/article")
+    formats = ("markdown", "html", "full_html")
+
+    results = await FetchPipeline().fetch_formats(request, formats)
+
+    assert list(results) == list(formats)
+    assert [result.content for result in results.values()] == [
+        "article",
+        "<p>article</p>",
+        "<html><body><article><p>rendered</p></article></body></html>",
+    ]
+    assert calls == {"render": 1, "extract": 1, "strip": 2}
+    assert len(list(tmp_path.glob("*.json"))) == 3
+
+    html_request = FetchRequest("https://example.com/article", format="html")
+    assert await FetchPipeline().fetch(html_request) == results["html"]
+    assert await FetchPipeline().fetch_formats(request, formats) == results
+    assert calls["render"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stage_cache_reuses_rendered_dom_and_readability_output(
+    monkeypatch, tmp_path
+):
+    calls = {"render": 0, "extract": 0}
+
+    async def render(url, timeout, **_options):
+        calls["render"] += 1
+        return "<html><body><article><p>rendered</p></article></body></html>"
+
+    async def extract(html, **_options):
+        calls["extract"] += 1
+        return {"html": "<p>article</p>", "metadata": {"title": "Article"}}
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    url = "https://example.com/article"
+
+    await FetchPipeline().fetch(FetchRequest(url, format="html"))
+    result = await FetchPipeline().fetch(
+        FetchRequest(url, format="html", resource_mode="link")
+    )
+
+    assert result.content == "<p>article</p>"
+    assert calls == {"render": 1, "extract": 1}
+    assert len(list(tmp_path.glob("rendered_html/*.json"))) == 1
+    assert len(list(tmp_path.glob("readability/*.json"))) == 1
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "0")
+    await FetchPipeline().fetch(FetchRequest(url, format="full_html"))
+    assert calls == {"render": 2, "extract": 2}
+
+
+@pytest.mark.asyncio
+async def test_corrupt_stage_entries_are_misses(monkeypatch, tmp_path):
+    renders = 0
+
+    async def render(url, timeout, **_options):
+        nonlocal renders
+        renders += 1
+        return "<html><body><p>rendered</p></body></html>"
+
+    async def extract(html, **_options):
+        return {"html": "<p>article</p>", "metadata": {}}
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    url = "https://example.com/article"
+    stage_file = tmp_path / "rendered_html" / f"{_rendered_html_key(url)}.json"
+    stage_file.parent.mkdir()
+    stage_file.write_text("not json", encoding="utf-8")
+
+    await FetchPipeline().fetch(FetchRequest(url, format="html"))
+
+    assert renders == 1
+    envelope = json.loads(stage_file.read_text(encoding="utf-8"))
+    assert envelope["payload"]["html"] == "<html><body><p>rendered</p></body></html>"
+
+
+@pytest.mark.asyncio
+async def test_expired_results_are_refetched_and_stale_ones_refreshed(
+    monkeypatch, tmp_path
+):
+    contents = iter(("first", "second", "third"))
+
+    async def fetch_result(self, request):
+        return FetchResult(request.format, next(contents), {})
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_TTL", "0.05")
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    request = FetchRequest("https://example.com/article")
+    pipeline = FetchPipeline()
+
+    assert (await pipeline.fetch(request)).content == "first"
+    assert (await pipeline.fetch(request)).content == "first"
+    await asyncio.sleep(0.1)
+    assert (await pipeline.fetch(request)).content == "second"
+
+    monkeypatch.setenv("CARNIVORE_CACHE_STALE_WHILE_REVALIDATE", "60")
+    await asyncio.sleep(0.1)
+    assert (await pipeline.fetch(request)).content == "second"
+    await pipeline.aclose()
+    assert (await pipeline.fetch(request)).content == "third"
+
+
+@pytest.mark.asyncio
+async def test_module_fetch_serves_stale_while_a_shared_pipeline_refreshes(
+    monkeypatch, tmp_path
+):
+    contents = iter(("first", "second"))
+    refreshed = asyncio.Event()
+
+    async def fetch_result(self, request):
+        content = next(contents)
+        if content == "second":
+            await refreshed.wait()
+        return FetchResult(request.format, content, {})
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_TTL", "0.05")
+    monkeypatch.setenv("CARNIVORE_CACHE_STALE_WHILE_REVALIDATE", "60")
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    request = FetchRequest("https://example.com/article")
+
+    assert (await fetch(request)).content == "first"
+    await asyncio.sleep(0.1)
+    # The stale result is served without waiting for the refresh.
+    assert (await fetch(request)).content == "first"
+    refreshed.set()
+    await _default_pipeline().aclose()
+
+    assert (await fetch(request)).content == "second"
+
+
+@pytest.mark.asyncio
+async def test_expired_render_is_revalidated_and_reused_on_not_modified(
+    monkeypatch, tmp_path
+):
+    calls = {"render": 0, "extract": 0}
+    revalidations = []
+    not_modified = True
+
+    async def render(url, timeout, validators=None, **_options):
+        calls["render"] += 1
+        validators["etag"] = '"v1"'
+        return "<html><body><article><p>rendered</p></article></body></html>"
+
+    async def extract(html, **_options):
+        calls["extract"] += 1
+        return {"html": "<p>article</p>", "metadata": {}}
+
+    async def revalidate(url, validators, timeout):
+        revalidations.append(validators)
+        return not_modified
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_TTL", "0.05")
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    monkeypatch.setattr(pipeline_module, "revalidate_document", revalidate)
+    request = FetchRequest("https://example.com/article", format="html")
+
+    await FetchPipeline().fetch(request)
+    await asyncio.sleep(0.1)
+    assert (await FetchPipeline().fetch(request)).content == "<p>article</p>"
+    assert calls == {"render": 1, "extract": 1}
+    assert revalidations == [{"etag": '"v1"'}]
+
+    not_modified = False
+    await asyncio.sleep(0.1)
+    await FetchPipeline().fetch(request)
+    assert calls == {"render": 2, "extract": 1}
+    assert len(revalidations) == 2
+
+
+@pytest.mark.asyncio
+async def test_deterministic_failures_are_cached_briefly(monkeypatch, tmp_path):
+    renders = []
+
+    async def render(url, timeout, **_options):
+        renders.append(url)
+        status = int(url.rsplit("/", 1)[1])
+        raise FetchError(ERROR_HTTP, f"HTTP status {status}", status=status)
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    missing = FetchRequest("https://example.com/404")
+    failing = FetchRequest("https://example.com/500")
+
+    for request in (missing, missing, failing, failing):
+        with pytest.raises(FetchError) as raised:
+            await FetchPipeline().fetch(request)
+    assert (raised.value.code, raised.value.status) == (ERROR_HTTP, 500)
+    assert renders == [missing.url, failing.url, failing.url]
+    with pytest.raises(FetchError) as raised:
+        await FetchPipeline().fetch(missing)
+    assert (raised.value.message, raised.value.status) == ("HTTP status 404", 404)
+    assert cache_stats()["lookups"]["failures"]["hits"] == 2
+
+    for path in (tmp_path / "failures").glob("*.json"):
+        envelope = json.loads(path.read_text())
+        path.write_text(json.dumps({**envelope, "schema_version": 1}))
+    with pytest.raises(FetchError):
+        await FetchPipeline().fetch(missing)
+    assert renders.count(missing.url) == 2
+
+    monkeypatch.setenv("CARNIVORE_CACHE_FAILURE_TTL", "0")
+    with pytest.raises(FetchError):
+        await FetchPipeline().fetch(missing)
+    assert renders.count(missing.url) == 3
+
+
+@pytest.mark.asyncio
+async def test_extraction_failures_are_not_cached_as_empty_content(
+    monkeypatch, tmp_path
+):
+    extractions = []
+
+    async def render(url, timeout, **_options):
+        return f"<article>{url}</article>"
+
+    async def extract(html, **_options):
+        extractions.append(html)
+        if "crash" in html:
+            raise RuntimeError("Readability worker exited")
+        return None
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    crashed = FetchRequest("https://example.com/crash")
+    empty = FetchRequest("https://example.com/empty")
+
+    codes = []
+    for request in (crashed, crashed, empty, empty):
+        with pytest.raises(FetchError) as raised:
+            await FetchPipeline().fetch(request)
+        codes.append(raised.value.code)
+
+    assert codes == [ERROR_EXTRACTION, ERROR_EXTRACTION] + [ERROR_NO_CONTENT] * 2
+    assert len(extractions) == 3
+
+
+@pytest.mark.asyncio
+async def test_auto_loading_renders_only_when_the_document_needs_a_browser(
+    monkeypatch,
+):
+    loads = []
+    documents = {
+        "https://example.com/static": "<article>" + "text " * 200 + "</article>",
+        "https://example.com/app": '<div id="root"></div>',
+        "https://example.com/missing": None,
+    }
+
+    async def fetch_document(url, timeout, **_options):
+        loads.append(("http", url))
+        if documents[url] is None:
+            raise FetchError(ERROR_HTTP, "HTTP status 404", status=404)
+        return documents[url]
+
+    async def render(url, timeout, **_options):
+        loads.append(("browser", url))
+        return "<article>" + "rendered " * 100 + "</article>"
+
+    async def extract(html, **_options):
+        return {"html": html, "metadata": {"length": len(html)}}
+
+    monkeypatch.setattr(pipeline_module, "fetch_document", fetch_document)
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    pipeline = FetchPipeline()
+
+    for url in documents:
+        request = FetchRequest(url, format="html", loading_strategy="auto")
+        try:
+            await pipeline.fetch(request)
+        except FetchError as error:
+            assert error.status == 404
+
+    assert loads == [
+        ("http", "https://example.com/static"),
+        ("http", "https://example.com/app"),
+        ("browser", "https://example.com/app"),
+        ("http", "https://example.com/missing"),
+    ]
+    browser = FetchRequest("https://example.com/static")
+    assert _cache_key(browser) != _cache_key(replace(browser, loading_strategy="http"))
+
+
+@pytest.mark.asyncio
+async def test_adaptive_loading_reports_the_settle_time(monkeypatch, tmp_path):
+    settles = []
+
+    async def render(url, timeout, settle="fixed", stats=None, **_options):
+        settles.append(settle)
+        stats["settle_seconds"] = 0.41234
+        return "<article>rendered</article>"
+
+    async def extract(html, **_options):
+        return {"html": html, "metadata": {"title": "Rendered"}}
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    request = FetchRequest(
+        "https://example.com/article",
+        format="html",
+        markdown_engine="native",
+        loading_strategy="adaptive",
+    )
+
+    result = await FetchPipeline().fetch(request)
+    fixed = await FetchPipeline().fetch(replace(request, loading_strategy="browser"))
+    cached = await FetchPipeline().fetch_formats(request, ["html", "markdown"])
+
+    assert settles == ["adaptive", "fixed"]
+    assert result.metadata == {"title": "Rendered", "settleSeconds": 0.412}
+    assert "settleSeconds" not in fixed.metadata
+    assert cached["markdown"].metadata["settleSeconds"] == 0.412
+
+
+@pytest.mark.asyncio
+async def test_blocklist_reports_blocked_requests_and_keys_renders(
+    monkeypatch, tmp_path
+):
+    blocklists = []
+
+    async def render(url, timeout, blocklist=None, stats=None, **_options):
+        blocklists.append(blocklist)
+        if blocklist is not None:
+            stats["blocked_requests"] = 3
+        return "<article>rendered</article>"
+
+    async def extract(html, **_options):
+        return {"html": html, "metadata": {"title": "Rendered"}}
+
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    request = FetchRequest("https://example.com/article", format="html")
+    unblocked_key = _cache_key(request)
+
+    assert "blockedRequests" not in (await FetchPipeline().fetch(request)).metadata
+    blocklist = tmp_path / "easylist.txt"
+    blocklist.write_text("||tracker.example^\n")
+    monkeypatch.setenv("CARNIVORE_BLOCKLIST", str(blocklist))
+    result = await FetchPipeline().fetch(request)
+
+    assert result.metadata == {"title": "Rendered", "blockedRequests": 3}
+    assert blocklists[0] is None and blocklists[1].blocks("https://tracker.example/")
+    assert _cache_key(request) != unblocked_key
+    http = replace(request, loading_strategy="http")
+    blocked_http_key = _cache_key(http)
+    monkeypatch.delenv("CARNIVORE_BLOCKLIST")
+    assert _cache_key(http) == blocked_http_key
+
+
+@pytest.mark.asyncio
+async def test_render_queue_wait_counts_against_the_timeout(monkeypatch):
+    budgets = []
+    release = asyncio.Event()
+
+    async def render(url, timeout, **_options):
+        budgets.append(timeout)
+        if url.endswith("/first"):
+            await release.wait()
+        return "<article>rendered</article>"
+
+    async def extract(html, **_options):
+        return {"html": html, "metadata": {}}
+
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    pipeline = FetchPipeline(scheduler=RenderScheduler(concurrency=1))
+    first = asyncio.ensure_future(
+        pipeline.fetch(FetchRequest("https://example.com/first", format="html"))
+    )
+    await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(
+        pipeline.fetch(
+            FetchRequest("https://example.com/second", format="html", timeout=5)
+        )
+    )
+    await asyncio.sleep(0.2)
+    release.set()
+    await asyncio.gather(first, second)
+
+    assert budgets[0] == pytest.approx(30, abs=0.01)
+    assert 4 < budgets[1] < 4.85
+
+
+@pytest.mark.asyncio
+async def test_results_carry_stage_timings_and_feed_the_metrics_hook(
+    monkeypatch, tmp_path
+):
+    async def render(url, timeout, **_options):
+        if url.endswith("/empty"):
+            raise FetchError(ERROR_NO_CONTENT, "Fetched content is empty")
+        return "<article>rendered</article>"
+
+    async def extract(html, **_options):
+        return {"html": html, "metadata": {}}
+
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    observed = []
+    pipeline = FetchPipeline(
+        metrics_hook=lambda request, timings, error: observed.append(
+            (request.url, timings, error)
+        )
+    )
+    request = FetchRequest("https://example.com/article", format="html")
+
+    fetched = await pipeline.fetch(request)
+    cached = await pipeline.fetch(request)
+    with pytest.raises(FetchError):
+        await pipeline.fetch(FetchRequest("https://example.com/empty"))
+
+    assert set(fetched.timings["stages"]) >= {
+        "cache_read",
+        "queue_wait",
+        "extraction",
+        "resources",
+        "cache_write",
+    }
+    assert fetched.timings["total"] >= sum(fetched.timings["stages"].values()) - 0.01
+    assert list(cached.timings["stages"]) == ["cache_read"]
+    assert cached == fetched
+    assert read_fetch_result(_cache_key(request), FetchResult).timings is None
+    assert [(url, error) for url, _timings, error in observed] == [
+        ("https://example.com/article", None),
+        ("https://example.com/article", None),
+        ("https://example.com/empty", "no_content"),
+    ]
+    assert observed[0][1] == fetched.timings
+
+
+def _write_entry(directory, name, size, mtime):
+    path = directory / f"{name}.json"
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_prune_evicts_least_recently_used_entries(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    (tmp_path / "readability").mkdir()
+    oldest = _write_entry(tmp_path, "oldest", 100, 1_000)
+    stage = _write_entry(tmp_path / "readability", "stage", 100, 2_000)
+    newest = _write_entry(tmp_path, "newest", 100, 3_000)
+
+    assert prune_cache(max_bytes=250, max_entries=0) == {"entries": 1, "bytes": 100}
+    assert not oldest.exists()
+    assert stage.exists() and newest.exists()
+
+    assert prune_cache(max_bytes=0, max_entries=1) == {"entries": 1, "bytes": 100}
+    assert not stage.exists()
+    assert newest.exists()
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_refresh_recency_and_feed_stats(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    request = FetchRequest("https://example.com/article", format="html")
+    write_fetch_result(_cache_key(request), FetchResult("html", "cached", {}))
+    entry = tmp_path / f"{_cache_key(request)}.json"
+    os.utime(entry, (1_000, 1_000))
+
+    assert read_fetch_result(_cache_key(request), FetchResult) is not None
+    assert read_fetch_result("missing", FetchResult) is None
+
+    assert entry.stat().st_mtime > 1_000
+    stats = cache_stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == entry.stat().st_size
+    assert stats["lookups"]["results"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_file_backend_buffers_lookup_counters_in_fixed_size_files(tmp_path):
+    first = FileCacheBackend(tmp_path)
+    second = FileCacheBackend(tmp_path)
+
+    for _ in range(COUNTER_FLUSH_LOOKUPS + 1):
+        first.record("results", hit=True)
+    second.record("results", hit=False)
+    assert (tmp_path / STATS_DIR / "results.hits").stat().st_size == 8
+    second.close()
+
+    hits = COUNTER_FLUSH_LOOKUPS + 1
+    assert first.counters() == {"results": {"hits": hits, "misses": 1}}
+    assert {path.stat().st_size for path in (tmp_path / STATS_DIR).iterdir()} == {8}
+
+
+def test_writes_prune_opportunistically_once_per_interval(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_MAX_ENTRIES", "1")
+
+    write_fetch_result("first", FetchResult("html", "first", {}))
+    os.utime(tmp_path / "first.json", (1_000, 1_000))
+    write_fetch_result("second", FetchResult("html", "second", {}))
+    assert (tmp_path / "first.json").exists()
+
+    os.utime(tmp_path / ".last-prune", (1_000, 1_000))
+    write_fetch_result("third", FetchResult("html", "third", {}))
+    assert [path.name for path in tmp_path.glob("*.json")] == ["third.json"]
+
+
+def test_memory_tier_serves_hits_without_reading_the_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_MEMORY_BYTES", "12")
+    for key in ("first", "second", "third"):
+        write_fetch_result(key, FetchResult("html", "1234", {}))
+    (tmp_path / "third.json").unlink()
+
+    assert read_fetch_result("third", FetchResult).content == "1234"
+    assert read_fetch_result("second", FetchResult).content == "1234"
+    assert read_fetch_result("first", FetchResult).content == "1234"
+    stats = cache_stats()
+    assert stats["memory"] == {
+        "entries": 2,
+        "bytes": 12,
+        "max_bytes": 12,
+        "hits": 2,
+        "misses": 1,
+        "hit_rate": 2 / 3,
+    }
+    assert stats["lookups"]["results"] == {"hits": 1, "misses": 0, "hit_rate": 1.0}
+
+
+def test_memory_tier_hits_keep_backend_entries_recent(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_MEMORY_BYTES", "1024")
+    write_fetch_result("hot", FetchResult("html", "hot", {}))
+    entry = tmp_path / "hot.json"
+    os.utime(entry, (1_000, 1_000))
+
+    read_fetch_result("hot", FetchResult)
+    assert entry.stat().st_mtime == 1_000
+
+    monkeypatch.setattr(cache_module, "MEMORY_TOUCH_SECONDS", 0)
+    read_fetch_result("hot", FetchResult)
+    assert entry.stat().st_mtime > 1_000
+    assert cache_stats()["lookups"] == {}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_stores_the_same_envelope(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_BACKEND", "sqlite")
+    calls = 0
+
+    async def fetch_result(self, request):
+        nonlocal calls
+        calls += 1
+        return FetchResult(request.format, "stored", {"title": "Article"})
+
+    monkeypatch.setattr(FetchPipeline, "_fetch_within_budget", fetch_result)
+    request = FetchRequest("https://example.com/article")
+
+    first = await FetchPipeline().fetch(request)
+    assert await FetchPipeline().fetch(request) == first
+    assert calls == 1
+    assert not list(tmp_path.glob("*.json"))
+
+    with sqlite3.connect(tmp_path / "cache.sqlite3") as connection:
+        (encoded,) = connection.execute("SELECT envelope FROM entries").fetchone()
+    envelope = json.loads(encoded)
+    assert envelope["key"] == _cache_key(request)
+    assert envelope["schema_version"] == 2
+    assert envelope["payload"]["content"] == "stored"
+    stats = cache_stats()
+    assert (stats["backend"], stats["entries"]) == ("sqlite", 1)
+    assert stats["lookups"]["results"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_sqlite_backend_prunes_by_recency_and_age(monkeypatch, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("CARNIVORE_CACHE_MAX_BYTES", "0")
+    for key in ("first", "second", "third"):
+        write_fetch_result(key, FetchResult("html", key, {}))
+    assert read_fetch_result("first", FetchResult) is not None
+
+    assert prune_cache(max_entries=2)["entries"] == 1
+    assert read_fetch_result("second", FetchResult) is None
+    assert read_fetch_result("first", FetchResult) is not None
+
+    assert prune_cache(max_age=0.000001)["entries"] == 2
+    assert cache_stats()["entries"] == 0
+
+
+def test_sqlite_backend_accepts_concurrent_writer_processes(tmp_path):
+    script = (
+        "import sys\n"
+        "from carnivore.cache import write_fetch_result\n"
+        "from carnivore.models import FetchResult\n"
+        "for index in range(20):\n"
+        "    key = f'{sys.argv[1]}-{index}'\n"
+        "    write_fetch_result(key, FetchResult('html', key, {}))\n"
+    )
+    environment = {
+        **os.environ,
+        "PYTHONPATH": str(Path(__file__).parents[1]),
+        "CARNIVORE_CACHE": "1",
+        "CARNIVORE_CACHE_DIR": str(tmp_path),
+        "CARNIVORE_CACHE_BACKEND": "sqlite",
+    }
+    writers = [
+        subprocess.Popen([sys.executable, "-c", script, str(writer)], env=environment)
+        for writer in range(4)
+    ]
+    assert [writer.wait(timeout=60) for writer in writers] == [0] * 4
+
+    with sqlite3.connect(tmp_path / "cache.sqlite3") as connection:
+        assert connection.execute("SELECT count(*) FROM entries").fetchone() == (80,)
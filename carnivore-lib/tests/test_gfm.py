@@ -0,0 +1,80 @@
+import pytest
+
+from carnivore import gfm
+from carnivore.models import FetchError, FetchRequest
+from carnivore.pipeline import _cache_key, validate_request
+
+
+def test_native_engine_converts_readability_article_subset():
+    html = """
+    <div id="readability-page-1" class="page">
+      <h2>Release <em>notes</em></h2>
+      <p>Read the <a href="https://example.com/guide">guide</a> and run
+         <code>carnivore --help</code> before <strong>upgrading</strong>.</p>
+      <ul><li>first</li><li>second<ul><li>nested</li></ul></li></ul>
+      <ol start="3"><li>third</li><li>fourth</li></ol>
+      <pre><code class="language-python">print("hi")
+</code></pre>
+      <blockquote><p>Quoted</p><p>twice</p></blockquote>
+      <hr>
+      <p><img src="/pixel.png" alt="Pixel">
+         <a href="https://example.com">https://example.com</a></p>
+    </div>
+    """
+
+    assert gfm.convert(html) == "\n\n".join(
+        [
+            "## Release *notes*",
+            "Read the [guide](https://example.com/guide) and run "
+            "`carnivore --help` before **upgrading**.",
+            "- first\n- second\n  - nested",
+            "3. third\n4. fourth",
+            '```python\nprint("hi")\n```',
+            "> Quoted\n>\n> twice",
+            "-" * 72,
+            "![Pixel](/pixel.png) <https://example.com>",
+        ]
+    )
+
+
+def test_native_engine_renders_pipe_tables_with_alignment():
+    html = """
+    <table>
+      <thead><tr><th>Name</th><th align="right">Count</th></tr></thead>
+      <tbody><tr><td>a|b</td><td>12</td></tr></tbody>
+    </table>
+    """
+
+    assert gfm.convert(html) == (
+        "| Name | Count |\n" "|------|------:|\n" "| a\\|b | 12    |"
+    )
+
+
+def test_native_engine_escapes_markdown_syntax_in_text():
+    html = "<p>1. not a list *or* [link]</p><p># not a heading<br>- nor item</p>"
+
+    assert gfm.convert(html) == (
+        "1\\. not a list \\*or\\* \\[link\\]\n\n\\# not a heading\\\n\\- nor item"
+    )
+
+
+def test_native_engine_drops_scripts_comments_and_unknown_markup():
+    html = (
+        "<article><script>alert(1)</script><!-- note -->"
+        "<p><span class='x'>Plain</span> <mark>text</mark></p></article>"
+    )
+
+    assert gfm.convert(html) == "Plain text"
+
+
+def test_markdown_engine_is_validated_and_keyed_only_when_not_pandoc():
+    url = "https://example.com/article"
+    with pytest.raises(FetchError, match="invalid_input"):
+        validate_request(FetchRequest(url, markdown_engine="lynx"))
+
+    pandoc = FetchRequest(url)
+    assert _cache_key(pandoc) == _cache_key(FetchRequest(url, markdown_engine="pandoc"))
+    assert _cache_key(pandoc) != _cache_key(FetchRequest(url, markdown_engine="native"))
+    assert _cache_key(FetchRequest(url, format="html")) == _cache_key(
+        FetchRequest(url, format="html", markdown_engine="native")
+    )
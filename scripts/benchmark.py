@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 
-"""Run the frozen offline fetch corpus and compare release evidence."""
+"""Run the frozen offline fetch corpus and compare release evidence.
+
+With ``--startup`` it instead measures CLI cold starts: wall time and
+``-X importtime`` totals for ``--help``, invalid input, and a cache hit.
+"""
 
 import argparse
 import json
@@ -8,6 +12,7 @@ import math
 import os
 import subprocess
 import sys
+import tempfile
 import time
 from contextlib import contextmanager
 from pathlib import Path
@@ -27,6 +32,24 @@ QUALITY_FIELDS = (
     "metadata_rate",
 )
 BENCHMARK_MODES = ("source", "image")
+STARTUP_PATHS = {
+    "help": (["--help"], 0),
+    "invalid_input": (["not-a-url"], 2),
+    "cache_hit": (
+        ["https://example.com/startup", "--format", "html", "--output", "json"],
+        0,
+    ),
+}
+# Third-party packages that none of the startup paths should need.
+STARTUP_HEAVY_MODULES = ("playwright", "playwright_stealth", "bs4", "ruamel")
+SEED_CACHE_HIT = """
+from carnivore.cache import write_fetch_result
+from carnivore.keys import _cache_key
+from carnivore.models import FetchRequest, FetchResult
+
+request = FetchRequest("https://example.com/startup", format="html")
+write_fetch_result(_cache_key(request), FetchResult("html", "<p>cached</p>", {}))
+"""
 
 
 def percentile(values: list[float], probability: float) -> float:
@@ -103,7 +126,9 @@ def fixture_server() -> Iterator[str]:
         server.server_close()
 
 
-def _command_for_case(case: dict, url: str, image: str | None) -> list[str]:
+def _command_for_case(
+    case: dict, url: str, image: str | None, markdown_engine: str = "pandoc"
+) -> list[str]:
     arguments = [
         url,
         "--format",
@@ -115,6 +140,8 @@ def _command_for_case(case: dict, url: str, image: str | None) -> list[str]:
         "--timeout",
         str(case.get("timeout", 30)),
     ]
+    if markdown_engine != "pandoc":
+        arguments += ["--markdown-engine", markdown_engine]
     if image:
         return [
             "docker",
@@ -130,8 +157,12 @@ def _command_for_case(case: dict, url: str, image: str | None) -> list[str]:
     return [sys.executable, "-m", "carnivore", *arguments]
 
 
-def _run_case(case: dict, base_url: str, image: str | None) -> dict:
-    command = _command_for_case(case, f"{base_url}{case['path']}", image)
+def _run_case(
+    case: dict, base_url: str, image: str | None, markdown_engine: str = "pandoc"
+) -> dict:
+    command = _command_for_case(
+        case, f"{base_url}{case['path']}", image, markdown_engine
+    )
     environment = os.environ.copy()
     environment["CARNIVORE_CACHE"] = "0"
     package_path = str(PROJECT_ROOT / "carnivore-lib")
@@ -197,7 +228,12 @@ def _quality_rates(samples: list[dict]) -> dict[str, float]:
     }
 
 
-def run_benchmark(cases: list[dict], runs: int, image: str | None = None) -> dict:
+def run_benchmark(
+    cases: list[dict],
+    runs: int,
+    image: str | None = None,
+    markdown_engine: str = "pandoc",
+) -> dict:
     if runs <= 0:
         raise ValueError("runs must be positive")
     samples = {case["id"]: [] for case in cases}
@@ -206,7 +242,7 @@ def run_benchmark(cases: list[dict], runs: int, image: str | None = None) -> dic
         for _ in range(runs):
             started = time.perf_counter()
             for case in cases:
-                sample = _run_case(case, base_url, image)
+                sample = _run_case(case, base_url, image, markdown_engine)
                 if "quality" not in sample:
                     sample["quality"] = {field: False for field in QUALITY_FIELDS}
                 samples[case["id"]].append(sample)
@@ -246,6 +282,159 @@ def run_benchmark(cases: list[dict], runs: int, image: str | None = None) -> dic
     }
 
 
+def parse_importtime(stderr: str) -> tuple[float, list[str]]:
+    """Return the total import seconds and top-level packages from importtime."""
+    total = 0
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        total += int(fields[0])
+        packages.add(fields[2].strip().split(".")[0])
+    return total / 1_000_000, sorted(packages)
+
+
+def _startup_environment(cache_dir: str) -> dict:
+    environment = os.environ.copy()
+    environment.update({"CARNIVORE_CACHE": "1", "CARNIVORE_CACHE_DIR": cache_dir})
+    environment.pop("CARNIVORE_BLOCKLIST", None)
+    package_path = str(PROJECT_ROOT / "carnivore-lib")
+    environment["PYTHONPATH"] = os.pathsep.join(
+        path for path in (package_path, environment.get("PYTHONPATH")) if path
+    )
+    return environment
+
+
+def _run_startup(arguments: list[str], status: int, environment: dict) -> dict:
+    command = [sys.executable, "-m", "carnivore", *arguments]
+    started = time.perf_counter()
+    completed = subprocess.run(
+        command, capture_output=True, check=False, env=environment, timeout=60
+    )
+    duration = time.perf_counter() - started
+    profiled = subprocess.run(
+        [sys.executable, "-X", "importtime", *command[1:]],
+        capture_output=True,
+        text=True,
+        check=False,
+        env=environment,
+        timeout=60,
+    )
+    import_seconds, packages = parse_importtime(profiled.stderr)
+    sample = {
+        "duration": duration,
+        "import_seconds": import_seconds,
+        "heavy_modules": [name for name in STARTUP_HEAVY_MODULES if name in packages],
+    }
+    if completed.returncode != status or profiled.returncode != status:
+        sample["error"] = "unexpected_status"
+    return sample
+
+
+def run_startup_benchmark(runs: int) -> dict:
+    if runs <= 0:
+        raise ValueError("runs must be positive")
+    paths = {}
+    with tempfile.TemporaryDirectory(prefix="carnivore-startup-") as cache_dir:
+        environment = _startup_environment(cache_dir)
+        subprocess.run(
+            [sys.executable, "-c", SEED_CACHE_HIT], check=True, env=environment
+        )
+        for name, (arguments, status) in STARTUP_PATHS.items():
+            samples = [
+                _run_startup(arguments, status, environment) for _ in range(runs)
+            ]
+            durations = [sample["duration"] for sample in samples]
+            import_seconds = [sample["import_seconds"] for sample in samples]
+            paths[name] = {
+                "duration_seconds": {
+                    "median": median(durations),
+                    "p95": percentile(durations, 0.95),
+                },
+                "import_seconds": {"median": median(import_seconds)},
+                "heavy_modules": sorted(
+                    {module for sample in samples for module in sample["heavy_modules"]}
+                ),
+                "failures": sum("error" in sample for sample in samples),
+            }
+    return {"mode": "startup", "schema_version": 1, "runs": runs, "paths": paths}
+
+
+def compare_startup(candidate: dict, baseline: dict) -> dict:
+    """Gate startup results: slower paths or new heavy imports block.
+
+    A path regresses when its median wall time or import total worsens by
+    more than 20% and by more than 50 ms or 20 ms respectively.
+    """
+    comparison = {
+        "timing_regressions": [],
+        "import_regressions": [],
+        "errors": [],
+        "blocking": False,
+    }
+    if candidate.get("mode") != "startup" or baseline.get("mode") != "startup":
+        _comparison_error(comparison, "startup comparison needs two startup results")
+    baseline_paths = baseline.get("paths", {})
+    for name, current in candidate.get("paths", {}).items():
+        previous = baseline_paths.get(name)
+        if not isinstance(previous, dict):
+            _comparison_error(comparison, f"baseline is missing startup path {name}")
+            continue
+        if current.get("failures", 0):
+            _comparison_error(
+                comparison, f"{name} had {current['failures']} failed runs"
+            )
+        for metric, key, margin in (
+            ("median_seconds", "duration_seconds", 0.05),
+            ("median_import_seconds", "import_seconds", 0.02),
+        ):
+            now = current.get(key, {}).get("median")
+            before = previous.get(key, {}).get("median")
+            if not isinstance(now, (int, float)) or not isinstance(
+                before, (int, float)
+            ):
+                _comparison_error(comparison, f"missing {metric} for {name}")
+            elif now - before > margin and (not before or now / before - 1 > 0.20):
+                comparison["timing_regressions"].append(
+                    {
+                        "path": name,
+                        "metric": metric,
+                        "baseline": before,
+                        "candidate": now,
+                    }
+                )
+        added = sorted(
+            set(current.get("heavy_modules", []))
+            - set(previous.get("heavy_modules", []))
+        )
+        if added:
+            comparison["import_regressions"].append({"path": name, "modules": added})
+    comparison["blocking"] = bool(
+        comparison["timing_regressions"]
+        or comparison["import_regressions"]
+        or comparison["errors"]
+    )
+    return comparison
+
+
+def _startup_summary(result: dict) -> str:
+    lines = [f"Startup benchmark: {result['version']} ({result['runs']} runs)"]
+    for name, path in result["paths"].items():
+        heavy = ",".join(path["heavy_modules"]) or "none"
+        lines.append(
+            f"- {name}: median={path['duration_seconds']['median'] * 1000:.0f}ms "
+            f"imports={path['import_seconds']['median'] * 1000:.0f}ms "
+            f"heavy={heavy}"
+        )
+    comparison = result.get("comparison")
+    if comparison:
+        lines.append(f"Comparison: blocking={comparison['blocking']}")
+    return "\n".join(lines)
+
+
 def _comparison_error(comparison: dict, message: str) -> None:
     comparison["errors"].append(message)
 
@@ -443,7 +632,12 @@ def _summary(result: dict) -> str:
 
 def _parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Benchmark the frozen offline corpus")
-    parser.add_argument("--corpus", type=Path, required=True)
+    parser.add_argument("--corpus", type=Path)
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="measure CLI cold starts instead of running the corpus",
+    )
     parser.add_argument("--runs", type=int, default=5)
     parser.add_argument("--baseline", type=Path)
     parser.add_argument("--out", type=Path, required=True)
@@ -451,6 +645,12 @@ def _parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--version", default=os.environ.get("GITHUB_SHA", "working-tree")
     )
+    parser.add_argument(
+        "--markdown-engine",
+        choices=("pandoc", "native"),
+        default="pandoc",
+        help="Markdown converter passed to every case",
+    )
     parser.add_argument(
         "--strict",
         action="store_true",
@@ -460,11 +660,17 @@ def _parser() -> argparse.ArgumentParser:
 
 
 def main(argv=None) -> int:
-    args = _parser().parse_args(argv)
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.startup:
+        return _startup_main(args)
+    if args.corpus is None:
+        parser.error("--corpus is required unless --startup is given")
     try:
         cases = load_corpus(args.corpus)
-        result = run_benchmark(cases, args.runs, args.image)
+        result = run_benchmark(cases, args.runs, args.image, args.markdown_engine)
         result["version"] = args.version
+        result["markdown_engine"] = args.markdown_engine
         if args.baseline:
             baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
             result["comparison"] = compare_results(result, baseline)
@@ -493,5 +699,40 @@ def main(argv=None) -> int:
     return 0
 
 
+def _startup_main(args) -> int:
+    try:
+        result = run_startup_benchmark(args.runs)
+        result["version"] = args.version
+        if args.baseline:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+            result["comparison"] = compare_startup(result, baseline)
+        elif args.strict:
+            result["comparison"] = {
+                "timing_regressions": [],
+                "import_regressions": [],
+                "errors": ["baseline is required in strict mode"],
+                "blocking": True,
+            }
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(
+            json.dumps(result, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+    except (
+        OSError,
+        TypeError,
+        ValueError,
+        json.JSONDecodeError,
+        subprocess.SubprocessError,
+    ) as error:
+        print(f"benchmark failed: {error}", file=sys.stderr)
+        return 2
+
+    print(_startup_summary(result))
+    if args.strict and result.get("comparison", {}).get("blocking"):
+        return 1
+    return 0
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
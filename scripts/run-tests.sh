@@ -7,4 +7,5 @@ cd "$(dirname "${BASH_SOURCE[0]}")/.."
 pytest -v -m "not live" \
   carnivore-lib/tests/test.py \
   carnivore-lib/tests/test_fetch_cache.py \
+  carnivore-lib/tests/test_gfm.py \
   tests/acceptance "$@"
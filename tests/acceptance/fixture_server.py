@@ -12,6 +12,7 @@ PIXEL_PNG = base64.b64decode(
     "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAwMBAAZnGfoAAAAASUVORK5CYII="
 )
 CHUNK_BYTES = b"x" * (10 * 1024 * 1024)
+CACHEABLE_ETAG = '"cacheable-v1"'
 HUGE_DOCUMENT = (
     "<!doctype html><html><head><title>Huge document</title></head><body>"
     + "<!-- filler -->" * 800000
@@ -51,6 +52,12 @@ class FixtureHandler(BaseHTTPRequestHandler):
             self.send_error(500)
             return
 
+        if path == "/cacheable" and self.headers.get("If-None-Match") == CACHEABLE_ETAG:
+            self.send_response(304)
+            self.send_header("ETag", CACHEABLE_ETAG)
+            self.end_headers()
+            return
+
         if path == "/pixel.png":
             self.send_response(200)
             self.send_header("Content-Type", "image/png")
@@ -175,6 +182,11 @@ setTimeout(() => {
                 "external dependencies so the acceptance suite can exercise the "
                 "existing fetch command through a real browser.",
             )
+        elif path == "/cacheable":
+            content = article(
+                "Cacheable fixture article",
+                "This fixture answers conditional requests for its ETag with 304.",
+            )
         elif path == "/identity":
             request_sec_ch_ua = json.dumps(self.headers.get("Sec-CH-UA", ""))
             content = article(
@@ -198,6 +210,8 @@ document.querySelector("#identity").textContent = JSON.stringify(identity);
         encoded_content = content.encode()
         self.send_response(200)
         self.send_header("Content-Type", "text/html; charset=utf-8")
+        if path == "/cacheable":
+            self.send_header("ETag", CACHEABLE_ETAG)
         self.send_header("Content-Length", str(len(encoded_content)))
         self.end_headers()
         self.wfile.write(encoded_content)
@@ -7,7 +7,9 @@ sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
 from benchmark import (  # noqa: E402
     MAX_OUTPUT_BYTES,
     compare_results,
+    compare_startup,
     load_corpus,
+    parse_importtime,
     percentile,
 )
 
@@ -99,3 +101,40 @@ def test_large_size_reduction_also_requires_review():
 
     assert comparison["review_required"] is True
     assert comparison["blocking"] is False
+
+
+def _startup(median=0.2, imports=0.15, heavy=()):
+    return {
+        "mode": "startup",
+        "paths": {
+            "help": {
+                "duration_seconds": {"median": median, "p95": median},
+                "import_seconds": {"median": imports},
+                "heavy_modules": list(heavy),
+                "failures": 0,
+            }
+        },
+    }
+
+
+def test_importtime_totals_self_times_and_top_level_packages():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:      1500 |       1500 |   json.decoder\n"
+        "import time:      2500 |       4000 | playwright.async_api\n"
+        "warning: unrelated\n"
+    )
+
+    assert parse_importtime(stderr) == (0.004, ["json", "playwright"])
+
+
+def test_startup_comparison_blocks_slower_paths_and_new_heavy_imports():
+    assert compare_startup(_startup(0.23), _startup())["blocking"] is False
+
+    comparison = compare_startup(_startup(0.3, heavy=("bs4",)), _startup())
+
+    assert [item["metric"] for item in comparison["timing_regressions"]] == [
+        "median_seconds"
+    ]
+    assert comparison["import_regressions"] == [{"path": "help", "modules": ["bs4"]}]
+    assert comparison["blocking"] is True
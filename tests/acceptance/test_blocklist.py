@@ -0,0 +1,116 @@
+import pytest
+
+from carnivore import blocklist as blocklist_module
+from carnivore.blocklist import Blocklist, configured_blocklist
+from carnivore.render import RenderPolicy, _make_route_handler
+
+RULES = """\
+[Adblock Plus 2.0]
+! comment
+||tracker.example^
+||example.com/ads/
+@@||ok.tracker.example^
+0.0.0.0 pixel.example.net
+0.0.0.0 beacon.example.net # analytics
+127.0.0.1\tstats.example.net\t#stats
+widgets.example.org
+||example.com/*/banner.js
+||cdn.example.com^$third-party
+example.com##.ad-banner
+/generic-ad-path/
+"""
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type="script"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = "POST"
+        self.headers = {}
+
+    def is_navigation_request(self):
+        return False
+
+
+class FakeRoute:
+    def __init__(self):
+        self.actions = []
+
+    async def abort(self):
+        self.actions.append("abort")
+
+    async def fetch(self, headers=None):
+        self.actions.append("fetch")
+        return FakeResponse()
+
+    async def fulfill(self, **_kwargs):
+        self.actions.append("fulfill")
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    async def body(self):
+        return b"ok"
+
+
+@pytest.mark.parametrize(
+    ("url", "blocked"),
+    [
+        ("https://tracker.example/collect", True),
+        ("https://a.b.tracker.example/pixel.gif", True),
+        ("https://ok.tracker.example/script.js", False),
+        ("https://nottracker.example/", False),
+        ("https://www.example.com/ads/banner.js", True),
+        ("https://example.com/article/ads/", False),
+        ("https://pixel.example.net/p?id=1", True),
+        ("https://beacon.example.net/b", True),
+        ("https://stats.example.net/s", True),
+        ("https://widgets.example.org/embed.js", True),
+        ("https://example.com/x/banner.js", False),
+        ("https://cdn.example.com/app.js", False),
+        ("https://example.com/generic-ad-path/x.js", False),
+    ],
+)
+def test_blocklist_matches_host_and_path_rules(url, blocked):
+    assert Blocklist(RULES.splitlines()).blocks(url) is blocked
+
+
+def test_blocklist_ignores_unsupported_rules():
+    assert len(Blocklist(RULES.splitlines())) == 6
+
+
+def test_configured_blocklist_reloads_changed_files(monkeypatch, tmp_path):
+    path = tmp_path / "easylist.txt"
+    path.write_text("||tracker.example^\n")
+    monkeypatch.setenv("CARNIVORE_BLOCKLIST", str(path))
+
+    first = configured_blocklist()
+    assert configured_blocklist() is first
+    path.write_text("||tracker.example^\n||ads.example^\n")
+    second = configured_blocklist()
+
+    assert second is not first and second.digest != first.digest
+    assert second.blocks("https://ads.example/")
+    monkeypatch.setenv("CARNIVORE_BLOCKLIST", str(tmp_path / "missing.txt"))
+    assert configured_blocklist() is None
+    assert blocklist_module._blocklists
+
+
+@pytest.mark.asyncio
+async def test_route_handler_aborts_blocked_requests_before_counting():
+    policy = RenderPolicy(
+        allow_loopback=False, blocklist=Blocklist(["||tracker.example^"])
+    )
+    handler = _make_route_handler(page=None, policy=policy)
+    blocked = FakeRoute()
+    allowed = FakeRoute()
+
+    await handler(blocked, FakeRequest("https://tracker.example/t.js"))
+    await handler(allowed, FakeRequest("https://example.com/app.js"))
+
+    assert blocked.actions == ["abort"]
+    assert allowed.actions == ["fetch", "fulfill"]
+    assert policy.blocked_requests == 1
+    assert policy.subrequest_count == 1
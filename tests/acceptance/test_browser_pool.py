@@ -0,0 +1,214 @@
+import asyncio
+
+import pytest
+
+from carnivore import render, timing
+from carnivore.models import FetchError
+
+
+REAL_SLEEP = asyncio.sleep
+
+
+class FakePage:
+    def __init__(self, events):
+        self.events = events
+        self.main_frame = object()
+
+    async def route(self, *_args):
+        self.events.append("route")
+
+    async def goto(self, *_args, **_kwargs):
+        self.events.append("goto")
+
+    async def content(self):
+        return "<html><body>fixture</body></html>"
+
+
+class FakeContext:
+    def __init__(self, events):
+        self.events = events
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def add_init_script(self, _script):
+        self.events.append("init_script")
+
+    async def new_page(self):
+        self.events.append("new_page")
+        return FakePage(self.events)
+
+    async def close(self):
+        self.events.append("context_close")
+
+
+class FakeBrowser:
+    def __init__(self, events, delay=0):
+        self.events = events
+        self.delay = delay
+        self.connected = True
+        self.context_kwargs = None
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        self.events.append("new_context")
+        self.context_kwargs = kwargs
+        if self.delay:
+            await REAL_SLEEP(self.delay)
+        return FakeContext(self.events)
+
+    async def close(self):
+        self.events.append("browser_close")
+
+
+class FakePlaywright:
+    def __init__(self, events, delay=0):
+        self.events = events
+        self.delay = delay
+        self.chromium = self
+        self.browsers = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        self.events.append("playwright_close")
+
+    async def launch(self, **kwargs):
+        self.events.append("launch")
+        assert kwargs == {"channel": "chromium"}
+        browser = FakeBrowser(self.events, delay=self.delay)
+        self.browsers.append(browser)
+        return browser
+
+
+class FakeStealth:
+    def __init__(self, **_kwargs):
+        pass
+
+    async def apply_stealth_async(self, context):
+        await context.add_init_script("fixture")
+
+
+def _patch_playwright(monkeypatch, events, delay=0):
+    playwright = FakePlaywright(events, delay=delay)
+    monkeypatch.setattr(render, "async_playwright", lambda: playwright)
+    monkeypatch.setattr(render, "Stealth", FakeStealth)
+
+    async def skip_settle(_seconds):
+        return None
+
+    monkeypatch.setattr(render.asyncio, "sleep", skip_settle)
+    return playwright
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_browser_with_fresh_contexts(monkeypatch):
+    events = []
+    playwright = _patch_playwright(monkeypatch, events)
+
+    async with render.BrowserPool(size=1) as pool:
+        for _ in range(3):
+            html = await render.render_browser(
+                "http://127.0.0.1:8080/article", timeout=5, pool=pool
+            )
+            assert "fixture" in html
+
+    assert events.count("launch") == 1
+    assert events.count("new_context") == 3
+    assert events.count("context_close") == 3
+    assert events.count("init_script") == 3
+    assert events[-2:] == ["browser_close", "playwright_close"]
+    assert playwright.browsers[0].context_kwargs == {
+        "user_agent": render.USER_AGENT,
+        "extra_http_headers": render.EXTRA_HTTP_HEADERS,
+        "ignore_https_errors": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_browsers_after_max_uses(monkeypatch):
+    events = []
+    _patch_playwright(monkeypatch, events)
+
+    async with render.BrowserPool(size=1, max_uses=2) as pool:
+        for _ in range(5):
+            await pool.render("http://127.0.0.1:8080/article", timeout=5)
+
+    assert events.count("launch") == 3
+    assert events.count("browser_close") == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_replaces_disconnected_browsers(monkeypatch):
+    events = []
+    playwright = _patch_playwright(monkeypatch, events)
+
+    async with render.BrowserPool(size=1) as pool:
+        await pool.render("http://127.0.0.1:8080/article", timeout=5)
+        playwright.browsers[0].connected = False
+        await pool.render("http://127.0.0.1:8080/article", timeout=5)
+
+    assert events.count("launch") == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_renders_beyond_the_queue_bound(monkeypatch):
+    events = []
+    _patch_playwright(monkeypatch, events, delay=0.05)
+    url = "http://127.0.0.1:8080/article"
+
+    async with render.BrowserPool(size=1, max_queue=1) as pool:
+        results = await asyncio.gather(
+            pool.render(url, timeout=5),
+            pool.render(url, timeout=5),
+            pool.render(url, timeout=5),
+            return_exceptions=True,
+        )
+
+    errors = [result for result in results if isinstance(result, FetchError)]
+    assert len(errors) == 1
+    assert errors[0].code == "overloaded"
+    assert events.count("launch") == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_counts_against_the_render_deadline(monkeypatch):
+    events = []
+    _patch_playwright(monkeypatch, events, delay=0.2)
+    url = "http://127.0.0.1:8080/article"
+
+    async with render.BrowserPool(size=1) as pool:
+        await pool.start()
+        first = asyncio.create_task(pool.render(url, timeout=5))
+        await REAL_SLEEP(0.01)
+        with pytest.raises(FetchError, match="timeout"):
+            await pool.render(url, timeout=0.05)
+        await first
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_is_timed_as_queue_wait_not_browser_launch(monkeypatch):
+    events = []
+    _patch_playwright(monkeypatch, events, delay=0.2)
+    url = "http://127.0.0.1:8080/article"
+
+    async def timed_render(pool):
+        with timing.measure() as timings:
+            await pool.render(url, timeout=5)
+        return timings.stages
+
+    async with render.BrowserPool(size=1) as pool:
+        await pool.start()
+        first = asyncio.create_task(timed_render(pool))
+        await REAL_SLEEP(0.01)
+        second = await timed_render(pool)
+        await first
+
+    assert second["queue_wait"] >= 0.15
+    # Only the fresh context is charged; the pooled browser was not relaunched.
+    assert second["browser_launch"] < 0.3
+    assert events.count("launch") == 1
@@ -3,13 +3,17 @@ import os
 import re
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 import pytest
 
 from carnivore import pipeline
+from carnivore.cache import cache_stats, write_fetch_result
 from carnivore.cli import main
-from carnivore.models import ERROR_INTERNAL, FetchError
+from carnivore.fastpath import serve_cached_fetch
+from carnivore.keys import _cache_key
+from carnivore.models import ERROR_INTERNAL, FetchError, FetchRequest, FetchResult
 
 
 PROJECT_ROOT = Path(__file__).parents[2]
@@ -94,6 +98,105 @@ def test_carnivore_module_reports_json_errors_without_diagnostics(static_article
     }
 
 
+def test_invalid_input_exits_without_loading_the_browser_stack():
+    probe = (
+        "import runpy, sys\n"
+        "sys.argv = ['carnivore', 'not-a-url']\n"
+        "try:\n"
+        "    runpy.run_module('carnivore', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted(name for name in ('playwright', 'bs4', 'ruamel')"
+        " if name in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT / "carnivore-lib")},
+        text=True,
+        check=False,
+    )
+
+    assert result.stderr == "invalid_input: URL must be an absolute HTTP(S) URL\n"
+    assert result.stdout == "[]\n"
+
+
+def test_fresh_cache_hits_are_served_before_the_cli_is_imported(tmp_path):
+    seed = (
+        "from carnivore.cache import write_fetch_result\n"
+        "from carnivore.keys import _cache_key\n"
+        "from carnivore.models import FetchRequest, FetchResult\n"
+        "request = FetchRequest('https://example.com/cached', format='html')\n"
+        "write_fetch_result(_cache_key(request), FetchResult('html', '<p>c</p>'))\n"
+    )
+    probe = (
+        "import runpy, sys\n"
+        "sys.argv = ['carnivore', 'https://example.com/cached', '--format=html',"
+        " '--output', 'json']\n"
+        "try:\n"
+        "    runpy.run_module('carnivore', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted(name for name in ('asyncio', 'carnivore.cli', 'playwright')"
+        " if name in sys.modules))\n"
+    )
+    environment = {
+        **os.environ,
+        "PYTHONPATH": str(PROJECT_ROOT / "carnivore-lib"),
+        "CARNIVORE_CACHE": "1",
+        "CARNIVORE_CACHE_DIR": str(tmp_path),
+    }
+    subprocess.run([sys.executable, "-c", seed], env=environment, check=True)
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        cwd=PROJECT_ROOT,
+        env=environment,
+        text=True,
+        check=False,
+    )
+
+    envelope, modules = result.stdout.splitlines()
+    assert json.loads(envelope) == {
+        "ok": True,
+        "format": "html",
+        "content": "<p>c</p>",
+        "metadata": {},
+    }
+    assert modules == "[]"
+
+
+def test_cache_fast_path_leaves_everything_else_to_the_cli(
+    monkeypatch, capsys, tmp_path
+):
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CARNIVORE_CACHE_TTL", "0.05")
+    monkeypatch.setenv("CARNIVORE_CACHE_STALE_WHILE_REVALIDATE", "60")
+    stale = FetchRequest("https://example.com/stale", format="html")
+    write_fetch_result(_cache_key(stale), FetchResult("html", "stale"))
+    time.sleep(0.1)
+    assert serve_cached_fetch(["https://example.com/stale", "--format", "html"]) is None
+
+    monkeypatch.delenv("CARNIVORE_CACHE_TTL")
+    fresh = FetchRequest("https://example.com/fresh", format="html")
+    write_fetch_result(_cache_key(fresh), FetchResult("html", "fresh"))
+    for argv in (
+        ["https://example.com/missing", "--format", "html"],
+        ["https://example.com/fresh", "--format", "html", "--timeout", "0"],
+        ["https://example.com/fresh", "--format", "html,markdown"],
+        ["https://example.com/fresh", "--format", "html", "--batch", "-"],
+        ["https://example.com/fresh", "--form", "html"],
+        ["cache", "stats"],
+    ):
+        assert serve_cached_fetch(argv) is None
+    assert serve_cached_fetch(["https://example.com/fresh", "--format=html"]) == 0
+    assert capsys.readouterr().out == "fresh"
+    lookups = cache_stats()["lookups"]["results"]
+    assert (lookups["hits"], lookups["misses"]) == (1, 0)
+
+
 def test_carnivore_module_reports_raw_errors_on_stderr(static_article_url):
     result = run_carnivore(static_article_url, "--resource-mode", "bad")
 
@@ -105,7 +208,7 @@ def test_carnivore_module_reports_raw_errors_on_stderr(static_article_url):
 
 @pytest.mark.asyncio
 async def test_renderer_failure_has_no_partial_cli_stdout(monkeypatch, capsys):
-    async def fail_render(_url, _timeout):
+    async def fail_render(_url, _timeout, **_options):
         raise FetchError(ERROR_INTERNAL, "Stealth initialization failed")
 
     monkeypatch.setattr(pipeline, "render_browser", fail_render)
@@ -139,3 +242,123 @@ def test_carnivore_module_exposes_a_consistent_browser_identity(fixture_server):
     assert "HeadlessChrome" not in identity["userAgent"]
     assert '"Chromium";v="130"' in identity["secChUa"]
     assert '"Chromium";v="131"' not in identity["secChUa"]
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_streams_ndjson_envelopes(monkeypatch, capsys, tmp_path):
+    async def render(url, _timeout, **_options):
+        if url.endswith("/missing"):
+            raise FetchError("http_error", "HTTP 404")
+        return f"<html><body><p>{url}</p></body></html>"
+
+    async def extract(html, **_options):
+        return {"html": html, "metadata": {"title": "Batch"}}
+
+    monkeypatch.setattr(pipeline, "render_browser", render)
+    monkeypatch.setattr(pipeline, "extract_readability", extract)
+    batch = tmp_path / "urls.txt"
+    batch.write_text(
+        "# fixture batch\n"
+        "http://127.0.0.1:8080/one\n"
+        "\n"
+        '{"url": "http://127.0.0.1:8080/two", "format": "full_html"}\n'
+        "http://127.0.0.1:8080/missing\n"
+        '{"url": "http://127.0.0.1:8080/three", "depth": 2}\n'
+    )
+
+    result = await main(["--batch", str(batch), "--format", "html"])
+
+    envelopes = {
+        envelope["line"]: envelope
+        for envelope in map(json.loads, capsys.readouterr().out.splitlines())
+    }
+    assert result == 1
+    assert sorted(envelopes) == [2, 4, 5, 6]
+    assert envelopes[2]["ok"] is True
+    assert envelopes[2]["format"] == "html"
+    assert envelopes[2]["url"] == "http://127.0.0.1:8080/one"
+    assert envelopes[4]["format"] == "full_html"
+    assert envelopes[5]["error"]["code"] == "http_error"
+    assert envelopes[6] == {
+        "ok": False,
+        "line": 6,
+        "error": {
+            "code": "invalid_input",
+            "detail": "Unsupported batch request fields",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_rejects_a_url_argument(capsys, tmp_path):
+    result = await main(["http://127.0.0.1:8080/article", "--batch", "-"])
+
+    assert result == 2
+    assert json.loads(capsys.readouterr().out)["error"] == {
+        "code": "invalid_input",
+        "detail": "Use either a URL or --batch",
+    }
+
+
+@pytest.mark.asyncio
+async def test_multiple_formats_are_reported_together(monkeypatch, capsys):
+    renders = 0
+
+    async def render(_url, _timeout, **_options):
+        nonlocal renders
+        renders += 1
+        return "<html><body><p>fixture</p></body></html>"
+
+    async def extract(_html, **_options):
+        return {"html": "<p>fixture</p>", "metadata": {"title": "Fixture"}}
+
+    monkeypatch.setattr(pipeline, "render_browser", render)
+    monkeypatch.setattr(pipeline, "extract_readability", extract)
+
+    result = await main(
+        [
+            "http://127.0.0.1:8080/article",
+            "--format",
+            "html,full_html",
+            "--resource-mode",
+            "link",
+            "--output",
+            "json",
+        ]
+    )
+
+    output = json.loads(capsys.readouterr().out)
+    assert result == 0
+    assert renders == 1
+    assert output["ok"] is True
+    assert [item["format"] for item in output["results"]] == ["html", "full_html"]
+    assert output["results"][0]["content"] == "<p>fixture</p>"
+    assert output["results"][0]["metadata"] == {"title": "Fixture"}
+
+
+@pytest.mark.asyncio
+async def test_multiple_formats_require_json_output(capsys):
+    result = await main(["http://127.0.0.1:8080/article", "--format", "html,markdown"])
+
+    assert result == 2
+    assert capsys.readouterr().err == (
+        "invalid_input: Multiple formats require JSON output\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_subcommand_reports_and_prunes(monkeypatch, capsys, tmp_path):
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    (tmp_path / "old.json").write_text("{}", encoding="utf-8")
+    os.utime(tmp_path / "old.json", (1_000, 1_000))
+    (tmp_path / "new.json").write_text("{}", encoding="utf-8")
+
+    assert await main(["cache", "stats", "--output", "json"]) == 0
+    stats = json.loads(capsys.readouterr().out)
+    assert (stats["ok"], stats["entries"], stats["bytes"]) == (True, 2, 4)
+
+    assert await main(["cache", "prune", "--max-entries", "1"]) == 0
+    output = capsys.readouterr().out
+    assert output.startswith("removed: 1 entries, 2 bytes\n")
+    assert "entries: 1\n" in output
+    assert [path.name for path in tmp_path.glob("*.json")] == ["new.json"]
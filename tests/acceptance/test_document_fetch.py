@@ -0,0 +1,147 @@
+import http.client
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from carnivore import document
+from carnivore.document import DocumentClient, _request, fetch_document
+from carnivore.models import (
+    ERROR_HTTP,
+    ERROR_POLICY,
+    ERROR_RESOURCE,
+    FetchError,
+)
+
+PROJECT_ROOT = Path(__file__).parents[2]
+
+
+class FakeConnection:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.closed = False
+        self.requests = 0
+
+    def close(self):
+        self.closed = True
+
+    def request(self, method, path, headers):
+        self.requests += 1
+        if self.failures:
+            self.failures -= 1
+            raise http.client.RemoteDisconnected("closed while idle")
+
+    def getresponse(self):
+        return FakeResponse()
+
+
+class FakeResponse:
+    status = 200
+
+    def read(self, _limit):
+        return b"<p>ok</p>"
+
+    def getheaders(self):
+        return []
+
+    def isclosed(self):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_document_fetch_returns_server_rendered_html(static_article_url):
+    html = await fetch_document(static_article_url, timeout=5)
+
+    assert "Static fixture article" in html
+    assert "<base" not in html
+
+
+@pytest.mark.asyncio
+async def test_document_fetch_reuses_connections_and_marks_redirects(
+    fixture_server, redirect_article_url
+):
+    async with DocumentClient(connections=1) as client:
+        html = await client.fetch(redirect_article_url, timeout=5)
+        assert len(client._idle) == 1
+        await client.fetch(f"{fixture_server}/cacheable", timeout=5)
+        assert [len(idle) for idle in client._idle.values()] == [1]
+
+    assert f'<base href="{fixture_server}/article">' in html
+    assert "Static fixture article" in html
+
+
+def test_document_client_bounds_and_expires_idle_connections(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(document.time, "monotonic", lambda: now[0])
+    client = DocumentClient(connections=2, max_idle=3)
+    first, second, third, fourth = (FakeConnection() for _ in range(4))
+
+    client._release(("https", "a.example", 443), first)
+    client._release(("https", "a.example", 443), second)
+    client._release(("https", "b.example", 443), third)
+    client._release(("https", "b.example", 443), fourth)
+
+    assert first.closed and not (second.closed or third.closed or fourth.closed)
+    now[0] += document.DOCUMENT_IDLE_SECONDS + 1
+    connection, reused = client._checkout(("https", "b.example", 443), 5)
+    assert not reused and connection not in (third, fourth)
+    assert second.closed and third.closed and fourth.closed
+    assert client._idle == {}
+
+
+def test_only_reused_connections_retry_a_failed_request():
+    stale = FakeConnection(failures=1)
+    assert _request(stale, "/", reused=True)[0] == 200
+    assert stale.closed and stale.requests == 2
+
+    fresh = FakeConnection(failures=1)
+    with pytest.raises(http.client.RemoteDisconnected):
+        _request(fresh, "/", reused=False)
+    assert fresh.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_document_fetch_records_validators(fixture_server):
+    validators = {}
+
+    await fetch_document(f"{fixture_server}/cacheable", 5, validators=validators)
+
+    assert validators == {"etag": '"cacheable-v1"'}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("path", "code"),
+    [
+        ("/server-error", ERROR_HTTP),
+        ("/redirect-private", ERROR_POLICY),
+        ("/redirect-file", ERROR_POLICY),
+        ("/redirect-loop?n=11", ERROR_POLICY),
+        ("/huge-document", ERROR_RESOURCE),
+    ],
+)
+async def test_document_fetch_applies_the_render_policy(fixture_server, path, code):
+    with pytest.raises(FetchError) as raised:
+        await fetch_document(f"{fixture_server}{path}", timeout=5)
+
+    assert raised.value.code == code
+
+
+def test_document_fetch_does_not_import_the_browser_stack():
+    probe = (
+        "import sys\n"
+        "import carnivore.document\n"
+        "print(sorted(name for name in ('carnivore.render', 'playwright')"
+        " if name in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT / "carnivore-lib")},
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout == "[]\n"
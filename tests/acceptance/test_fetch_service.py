@@ -0,0 +1,184 @@
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from carnivore.models import ERROR_OVERLOADED, ERROR_TIMEOUT, FetchError, FetchResult
+from carnivore.scheduler import RenderScheduler
+from carnivore.serve import FetchService
+
+
+class FakePipeline:
+    def __init__(self):
+        self.scheduler = RenderScheduler(concurrency=1)
+        self.requests = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def fetch(self, request):
+        self.requests.append(request)
+        await self.release.wait()
+        if request.url.endswith("/slow-timeout"):
+            raise FetchError(ERROR_TIMEOUT, "Timed out after 1.0 seconds")
+        if request.url.endswith("/busy"):
+            raise FetchError(ERROR_OVERLOADED, "Render queue is full")
+        return FetchResult(
+            request.format,
+            f"content of {request.url}",
+            {"t": "T"},
+            timings={"total": 0.5, "stages": {}, "counters": {}},
+        )
+
+    async def fetch_formats(self, request, formats):
+        return {name: FetchResult(name, f"{name} content", {}) for name in formats}
+
+
+async def _call(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+@contextlib.asynccontextmanager
+async def _running_service():
+    service = FetchService(FakePipeline(), port=0)
+    _host, port = await service.start()
+    try:
+        yield service, port
+    finally:
+        service.drain()
+        await service.wait_drained()
+
+
+@pytest.mark.asyncio
+async def test_fetch_service_returns_cli_json_envelopes():
+    async with _running_service() as (service, port):
+        status, envelope = await _call(
+            port, "POST", "/fetch", {"url": "https://example.com", "format": "html"}
+        )
+        formats = await _call(
+            port,
+            "POST",
+            "/fetch",
+            {"url": "https://example.com", "format": "html,markdown"},
+        )
+
+    assert status == 200
+    assert envelope == {
+        "ok": True,
+        "format": "html",
+        "content": "content of https://example.com",
+        "metadata": {"t": "T"},
+    }
+    assert service.pipeline.requests[0].priority == "interactive"
+    assert formats[0] == 200
+    assert [result["format"] for result in formats[1]["results"]] == [
+        "html",
+        "markdown",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_service_exposes_prometheus_metrics():
+    async with _running_service() as (service, port):
+        service.metrics.counter("test_requests_total", "Test requests.").inc()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 ")
+    assert b"Content-Type: text/plain; version=0.0.4" in head
+    assert b"test_requests_total 1\n" in body
+
+
+@pytest.mark.asyncio
+async def test_fetch_service_adds_timings_on_request():
+    async with _running_service() as (_service, port):
+        status, envelope = await _call(
+            port, "POST", "/fetch", {"url": "https://example.com", "timings": True}
+        )
+        invalid = await _call(
+            port, "POST", "/fetch", {"url": "https://example.com", "timings": 1}
+        )
+
+    assert status == 200
+    assert envelope["timings"] == {"total": 0.5, "stages": {}, "counters": {}}
+    assert invalid[0] == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("method", "path", "body", "status", "code"),
+    [
+        ("POST", "/fetch", {"url": "https://example.com/slow-timeout"}, 504, "timeout"),
+        ("POST", "/fetch", {"url": "https://example.com/busy"}, 503, "overloaded"),
+        ("POST", "/fetch", {"url": "https://a.test", "x": 1}, 400, "invalid_input"),
+        ("POST", "/fetch", ["https://example.com"], 400, "invalid_input"),
+        ("POST", "/fetch", {"url": "https://a", "format": 5}, 400, "invalid_input"),
+        ("GET", "/fetch", None, 405, "invalid_input"),
+        ("GET", "/missing", None, 404, "invalid_input"),
+    ],
+)
+async def test_fetch_service_maps_error_codes_to_statuses(
+    method, path, body, status, code
+):
+    async with _running_service() as (_service, port):
+        actual_status, envelope = await _call(port, method, path, body)
+
+    assert actual_status == status
+    assert envelope["ok"] is False
+    assert envelope["error"]["code"] == code
+
+
+@pytest.mark.asyncio
+async def test_fetch_service_asks_overloaded_clients_to_retry():
+    async with _running_service() as (_service, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps({"url": "https://example.com/busy"}).encode("utf-8")
+        writer.write(
+            b"POST /fetch HTTP/1.1\r\nHost: localhost\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+            + body
+        )
+        response = await reader.read()
+        writer.close()
+
+    head, _, _body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 503 ")
+    assert b"\r\nRetry-After: 1\r\n" in head + b"\r\n"
+
+
+@pytest.mark.asyncio
+async def test_fetch_service_drains_in_flight_fetches():
+    service = FetchService(FakePipeline(), port=0)
+    _host, port = await service.start()
+    status, health = await _call(port, "GET", "/health")
+    assert (status, health["status"], health["inflight"]) == (200, "ok", 0)
+
+    service.pipeline.release.clear()
+    in_flight = asyncio.ensure_future(
+        _call(port, "POST", "/fetch", {"url": "https://example.com/a"})
+    )
+    await asyncio.sleep(0.05)
+    service.drain()
+
+    status, health = await _call(port, "GET", "/health")
+    assert (status, health["status"], health["inflight"]) == (503, "draining", 1)
+    status, refused = await _call(
+        port, "POST", "/fetch", {"url": "https://example.com/b"}
+    )
+    assert status == 503 and refused["ok"] is False
+    service.pipeline.release.set()
+    assert (await in_flight)[0] == 200
+    await asyncio.wait_for(service.wait_drained(), 1)
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from carnivore import metrics
+from carnivore import pipeline as pipeline_module
+from carnivore.metrics import MetricsRegistry
+from carnivore.models import ERROR_NO_CONTENT, FetchError, FetchRequest
+from carnivore.pipeline import FetchPipeline
+from carnivore.process import invoke_command
+
+
+def test_registry_renders_prometheus_text_exposition():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs run.", ("kind",)).inc(kind='say "hi"')
+    registry.gauge("workers", "Busy workers.").set(3)
+    latency = registry.histogram("latency_seconds", "Latency.\nIn seconds.")
+    latency.observe(0.02)
+    latency.observe(7)
+
+    text = registry.render()
+
+    assert 'jobs_total{kind="say \\"hi\\""} 1\n' in text
+    assert "# TYPE workers gauge\nworkers 3\n" in text
+    assert "# HELP latency_seconds Latency.\\nIn seconds.\n" in text
+    assert 'latency_seconds_bucket{le="0.01"} 0\n' in text
+    assert 'latency_seconds_bucket{le="0.025"} 1\n' in text
+    assert 'latency_seconds_bucket{le="10"} 2\n' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2\n' in text
+    assert "latency_seconds_sum 7.02\nlatency_seconds_count 2\n" in text
+    with pytest.raises(ValueError):
+        registry.gauge("jobs_total", "Jobs run.", ("kind",))
+
+
+def test_registry_renders_special_values_in_prometheus_spelling():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("ratio", "Ratio.", ("case",))
+    gauge.set(float("inf"), case="up")
+    gauge.set(float("-inf"), case="down")
+    gauge.set(float("nan"), case="none")
+
+    text = registry.render()
+
+    assert 'ratio{case="up"} +Inf\n' in text
+    assert 'ratio{case="down"} -Inf\n' in text
+    assert 'ratio{case="none"} NaN\n' in text
+
+
+@pytest.mark.asyncio
+async def test_pipeline_records_fetches_cache_lookups_and_subprocesses(
+    monkeypatch, tmp_path
+):
+    async def render(url, timeout, **_options):
+        if url.endswith("/empty"):
+            raise FetchError(ERROR_NO_CONTENT, "Fetched content is empty")
+        return "<article>rendered</article>"
+
+    async def extract(html, **_options):
+        return {"html": html, "metadata": {}}
+
+    monkeypatch.setattr(pipeline_module, "render_browser", render)
+    monkeypatch.setattr(pipeline_module, "extract_readability", extract)
+    monkeypatch.setenv("CARNIVORE_CACHE", "1")
+    monkeypatch.setenv("CARNIVORE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "_registry", None)
+    pipeline = FetchPipeline()
+    request = FetchRequest("https://example.com/article", format="html")
+
+    await pipeline.fetch(request)
+    assert metrics.registry() is None
+    registry = metrics.enable()
+    await pipeline.fetch(request)
+    with pytest.raises(FetchError):
+        await pipeline.fetch(FetchRequest("https://example.com/empty"))
+    for value in ("pdf", "epub"):
+        with pytest.raises(FetchError):
+            await pipeline.fetch(
+                FetchRequest(request.url, format=value, loading_strategy=value)
+            )
+    await invoke_command(["true"])
+
+    text = registry.render()
+    assert (
+        'carnivore_fetches_total{format="html",loading_strategy="browser",'
+        'outcome="ok"} 1\n'
+    ) in text
+    assert 'carnivore_fetch_errors_total{code="no_content"} 1\n' in text
+    assert (
+        'carnivore_fetches_total{format="invalid",loading_strategy="invalid",'
+        'outcome="invalid_input"} 2\n'
+    ) in text
+    assert "epub" not in text
+    assert 'carnivore_fetch_stage_seconds_count{stage="cache_read"} 2\n' in text
+    assert (
+        'carnivore_cache_lookups_total{namespace="results",tier="backend",'
+        'outcome="hit"} 1\n'
+    ) in text
+    assert 'carnivore_subprocesses_total{command="true",outcome="ok"} 1\n' in text
+    assert "carnivore_render_queue_depth 0\n" in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_file_is_dumped_periodically_and_on_exit(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "_registry", None)
+    path = tmp_path / "carnivore.prom"
+    dumping = asyncio.ensure_future(metrics.dump_periodically(path, 0.01))
+    await asyncio.sleep(0)
+    metrics.registry().counter("runs_total", "Runs.").inc()
+    await asyncio.sleep(0.05)
+    assert "runs_total 1\n" in path.read_text()
+
+    metrics.registry().counter("runs_total", "Runs.").inc()
+    dumping.cancel()
+    await asyncio.gather(dumping, return_exceptions=True)
+
+    assert "runs_total 2\n" in path.read_text()
+    assert [entry.name for entry in tmp_path.iterdir()] == ["carnivore.prom"]
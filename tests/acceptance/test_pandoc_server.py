@@ -0,0 +1,162 @@
+import os
+import socket
+import sys
+
+import pytest
+
+from carnivore import convert
+
+
+FAKE_PANDOC_SERVER = """#!{python}
+import argparse
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(b'"3.1"')
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if "slow" in request["text"]:
+            time.sleep(30)
+        output = f"{{request['to']}}:{{request['text']}}\\n"
+        self._send(json.dumps({{"output": output, "base64": False}}).encode())
+
+    def log_message(self, *_args):
+        pass
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--port", type=int, required=True)
+parser.add_argument("--timeout", type=int, required=True)
+ThreadingHTTPServer(("", parser.parse_args().port), Handler).serve_forever()
+"""
+
+FAKE_PANDOC = """#!{python}
+import sys
+
+print(sys.argv[sys.argv.index("-t") + 1] + ":" + sys.stdin.read())
+"""
+
+
+@pytest.fixture
+def fake_pandoc_server(tmp_path):
+    command = tmp_path / "pandoc-server"
+    command.write_text(FAKE_PANDOC_SERVER.format(python=sys.executable))
+    command.chmod(0o755)
+    return str(command)
+
+
+@pytest.fixture
+def fake_pandoc(monkeypatch, tmp_path):
+    command = tmp_path / "bin" / "pandoc"
+    command.parent.mkdir()
+    command.write_text(FAKE_PANDOC.format(python=sys.executable))
+    command.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{command.parent}:{os.environ['PATH']}")
+
+
+@pytest.fixture
+def one_shot_calls(monkeypatch):
+    calls = []
+
+    async def fake_invoke_command(command, input=None, **_kwargs):
+        calls.append(command[0])
+        return f"one-shot:{input}"
+
+    monkeypatch.setattr(convert, "invoke_command", fake_invoke_command)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_pandoc_server_converts_over_pooled_connections(
+    fake_pandoc_server, one_shot_calls
+):
+    async with convert.PandocServer(
+        connections=2, command=fake_pandoc_server
+    ) as server:
+        outputs = [
+            await convert.html_to_markdown(f"<p>{index}</p>", server=server)
+            for index in range(3)
+        ]
+
+    assert outputs == [f"gfm-raw_html:<p>{index}</p>" for index in range(3)]
+    assert one_shot_calls == []
+
+
+@pytest.mark.asyncio
+async def test_pandoc_server_restarts_after_exit(fake_pandoc_server, one_shot_calls):
+    async with convert.PandocServer(command=fake_pandoc_server) as server:
+        server._process.kill()
+        await server._process.wait()
+
+        output = await convert.html_to_markdown("<p>again</p>", server=server)
+
+    assert output == "gfm-raw_html:<p>again</p>"
+    assert one_shot_calls == []
+
+
+@pytest.mark.asyncio
+async def test_pandoc_server_is_replaced_after_a_conversion_times_out(
+    fake_pandoc_server,
+):
+    async with convert.PandocServer(command=fake_pandoc_server) as server:
+        stuck = server._process
+        with pytest.raises(TimeoutError):
+            await server.convert("<p>slow</p>", timeout=0.2)
+
+        assert stuck.returncode is not None
+        assert await server.convert("<p>fast</p>") == "gfm-raw_html:<p>fast</p>"
+        assert server._process is not stuck
+
+
+@pytest.mark.asyncio
+async def test_pandoc_server_falls_back_to_one_shot_subprocess(
+    tmp_path, one_shot_calls
+):
+    server = convert.PandocServer(command=str(tmp_path / "missing-pandoc-server"))
+
+    first = await convert.html_to_markdown("<p>first</p>", server=server)
+    second = await convert.html_to_markdown("<p>second</p>", server=server)
+    await server.close()
+
+    assert first == "one-shot:<p>first</p>"
+    assert second == "one-shot:<p>second</p>"
+    assert one_shot_calls == ["pandoc", "pandoc"]
+
+
+@pytest.mark.asyncio
+async def test_pandoc_server_output_matches_one_shot_subprocess(
+    fake_pandoc_server, fake_pandoc
+):
+    html = "<p>same</p>"
+    async with convert.PandocServer(command=fake_pandoc_server) as server:
+        served = await convert.html_to_markdown(html, server=server)
+
+    assert served == await convert.html_to_markdown(html)
+    assert served == "gfm-raw_html:<p>same</p>"
+
+
+@pytest.mark.asyncio
+async def test_pandoc_server_is_not_reachable_from_the_host_network(
+    fake_pandoc_server,
+):
+    async with convert.PandocServer(command=fake_pandoc_server) as server:
+        assert await server.convert("<p>up</p>") == "gfm-raw_html:<p>up</p>"
+        with pytest.raises(OSError):
+            socket.create_connection(
+                ("127.0.0.1", convert.PANDOC_SERVER_PORT), timeout=1
+            ).close()
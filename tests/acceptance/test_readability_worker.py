@@ -0,0 +1,93 @@
+import asyncio
+import signal
+
+import pytest
+
+from carnivore import extract
+from fixture_server import article
+
+
+ARTICLE_HTML = article(
+    "Worker fixture article",
+    "This resident worker fixture has enough primary content for Readability.",
+)
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_matches_one_shot_extraction():
+    expected = await extract.extract_readability(ARTICLE_HTML)
+
+    async with extract.ReadabilityWorkerPool(size=2) as workers:
+        results = await asyncio.gather(
+            *(
+                extract.extract_readability(ARTICLE_HTML, workers=workers)
+                for _ in range(4)
+            )
+        )
+
+    assert results == [expected] * 4
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_restarts_a_crashed_worker():
+    async with extract.ReadabilityWorkerPool(size=1) as workers:
+        worker = workers._workers[0]
+        worker.process.kill()
+        await worker.reader
+
+        result = await workers.extract(ARTICLE_HTML)
+
+    assert result["metadata"]["title"] == "Worker fixture article"
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_enforces_output_limit_per_request(monkeypatch):
+    async with extract.ReadabilityWorkerPool(size=1) as workers:
+        monkeypatch.setattr(extract, "MAX_OUTPUT_BYTES", 16)
+        with pytest.raises(RuntimeError, match="exceeded the configured limit"):
+            await workers.extract(ARTICLE_HTML)
+        monkeypatch.undo()
+
+        result = await workers.extract(ARTICLE_HTML)
+
+    assert "resident worker fixture" in result["html"]
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_replaces_a_worker_stuck_on_an_abandoned_request():
+    async with extract.ReadabilityWorkerPool(size=1, timeout=0.5) as workers:
+        worker = workers._workers[0]
+        stuck = worker.process
+        stuck.send_signal(signal.SIGSTOP)
+        with pytest.raises(RuntimeError, match="timed out"):
+            await workers.extract(ARTICLE_HTML)
+
+        result = await workers.extract(ARTICLE_HTML)
+
+        cancelled = asyncio.ensure_future(workers.extract(ARTICLE_HTML))
+        await asyncio.sleep(0)
+        busy = worker.process
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert worker.process is None
+        assert (await workers.extract(ARTICLE_HTML)) == result
+
+    assert stuck.returncode is not None and busy.returncode is not None
+    assert result["metadata"]["title"] == "Worker fixture article"
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_retries_requests_sharing_a_replaced_worker():
+    async with extract.ReadabilityWorkerPool(size=1, timeout=1.0) as workers:
+        stuck = workers._workers[0].process
+        stuck.send_signal(signal.SIGSTOP)
+        first = asyncio.ensure_future(workers.extract(ARTICLE_HTML))
+        await asyncio.sleep(0.5)
+        second = asyncio.ensure_future(workers.extract(ARTICLE_HTML))
+
+        with pytest.raises(RuntimeError, match="timed out"):
+            await first
+        result = await second
+
+    assert stuck.returncode is not None
+    assert result["metadata"]["title"] == "Worker fixture article"
@@ -1,11 +1,17 @@
+import asyncio
+
 import pytest
 
-from carnivore.render import (
+from carnivore import policy as policy_module
+from carnivore import render
+from carnivore.policy import (
     MAX_REDIRECTS,
+    HostResolver,
     _address_allowed,
     _host_is_loopback,
     RenderPolicy,
 )
+from carnivore.render import _adaptive_settle, revalidate_document
 
 
 @pytest.mark.parametrize(
@@ -54,6 +60,52 @@ async def test_render_policy_allows_initial_loopback_host():
     assert policy.error is None
 
 
+@pytest.mark.asyncio
+async def test_host_resolver_shares_lookups_and_caches_failures():
+    lookups = []
+
+    async def lookup(host):
+        lookups.append(host)
+        await asyncio.sleep(0.01)
+        return [] if host == "missing.test" else ["93.184.216.34"]
+
+    resolver = HostResolver(ttl=60, negative_ttl=0.05, lookup=lookup)
+
+    first, second = await asyncio.gather(
+        resolver.resolve("example.test"), resolver.resolve("example.test")
+    )
+    assert first == second == ("93.184.216.34",)
+    assert await resolver.resolve("example.test") == first
+    assert await resolver.resolve("missing.test") == ()
+    assert await resolver.resolve("missing.test") == ()
+    assert lookups == ["example.test", "missing.test"]
+
+    await asyncio.sleep(0.1)
+    await resolver.resolve("missing.test")
+    assert lookups == ["example.test", "missing.test", "missing.test"]
+
+
+@pytest.mark.asyncio
+async def test_render_policy_checks_cached_addresses_per_policy(monkeypatch):
+    lookups = []
+
+    async def lookup(host):
+        lookups.append(host)
+        return ["127.0.0.1"]
+
+    resolver = HostResolver(lookup=lookup)
+    monkeypatch.setattr(policy_module, "host_resolver", lambda: resolver)
+    loopback = RenderPolicy(allow_loopback=True)
+    public = RenderPolicy(allow_loopback=False)
+
+    await loopback.check_navigation_url("http://rebound.test/")
+    await public.check_navigation_url("http://rebound.test/")
+
+    assert loopback.error is None
+    assert public.error is not None and public.error.code == "policy_denied"
+    assert lookups == ["rebound.test"]
+
+
 def test_render_policy_rejects_redirect_overage():
     policy = RenderPolicy(allow_loopback=True)
 
@@ -83,3 +135,75 @@ def test_render_document_limit_uses_stable_code():
 
     assert policy.error is not None
     assert policy.error.code == "resource_limit"
+
+
+@pytest.mark.asyncio
+async def test_revalidation_reports_not_modified_only_for_matching_validators(
+    fixture_server,
+):
+    url = f"{fixture_server}/cacheable"
+
+    assert await revalidate_document(url, {"etag": '"cacheable-v1"'}, 5)
+    assert not await revalidate_document(url, {"etag": '"cacheable-v0"'}, 5)
+    assert not await revalidate_document(url, {}, 5)
+    assert not await revalidate_document(
+        f"{fixture_server}/redirect", {"etag": '"cacheable-v1"'}, 5
+    )
+
+
+def test_render_policy_records_only_conditional_validators():
+    policy = RenderPolicy(allow_loopback=False)
+    policy.record_validators(
+        {"etag": '"v1"', "last-modified": "", "content-type": "text/html"}
+    )
+
+    assert policy.validators == {"etag": '"v1"'}
+
+
+class QuietingPage:
+    def __init__(self, busy_checks):
+        self.busy_checks = busy_checks
+        self.checks = 0
+
+    async def evaluate(self, _script, quiet_ms):
+        self.checks += 1
+        await asyncio.sleep(quiet_ms / 1000)
+        return self.checks > self.busy_checks
+
+
+async def _no_deadline(action):
+    return await action()
+
+
+@pytest.mark.asyncio
+async def test_adaptive_settle_waits_for_dom_and_network_quiet(monkeypatch):
+    monkeypatch.setattr(render, "ADAPTIVE_SETTLE_QUIET_SECONDS", 0.02)
+    loop = asyncio.get_running_loop()
+    policy = RenderPolicy(allow_loopback=False, settle="adaptive")
+    policy.network_activity(started=True)
+    page = QuietingPage(busy_checks=2)
+
+    settle = asyncio.ensure_future(
+        _adaptive_settle(page, policy, loop.time() + 5, _no_deadline)
+    )
+    await asyncio.sleep(0.1)
+    assert not settle.done()
+    policy.network_activity(started=False)
+    await asyncio.wait_for(settle, 1)
+
+    assert page.checks >= 4
+
+
+@pytest.mark.asyncio
+async def test_adaptive_settle_stops_at_the_cap(monkeypatch):
+    monkeypatch.setattr(render, "ADAPTIVE_SETTLE_QUIET_SECONDS", 0.02)
+    monkeypatch.setattr(render, "ADAPTIVE_SETTLE_MAX_SECONDS", 0.1)
+    loop = asyncio.get_running_loop()
+    page = QuietingPage(busy_checks=1000)
+    started = loop.time()
+
+    await _adaptive_settle(
+        page, RenderPolicy(allow_loopback=False), started + 5, _no_deadline
+    )
+
+    assert loop.time() - started < 0.5
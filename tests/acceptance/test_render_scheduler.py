@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from carnivore.scheduler import RenderScheduler
+
+
+async def _hold(scheduler, url, order, release, priority="interactive"):
+    async with scheduler.slot(url, priority) as waited:
+        order.append(url)
+        await release.wait()
+        return waited
+
+
+@pytest.mark.asyncio
+async def test_scheduler_admits_interactive_renders_first():
+    scheduler = RenderScheduler(concurrency=1, host_concurrency=4, host_delay=0)
+    order = []
+    release = asyncio.Event()
+    first = asyncio.create_task(_hold(scheduler, "https://a.test/1", order, release))
+    await asyncio.sleep(0)
+    batch = asyncio.create_task(
+        _hold(scheduler, "https://a.test/batch", order, release, "batch")
+    )
+    interactive = asyncio.create_task(
+        _hold(scheduler, "https://a.test/interactive", order, release)
+    )
+    await asyncio.sleep(0.01)
+
+    assert order == ["https://a.test/1"]
+    assert scheduler.stats()["queued"] == 2
+    release.set()
+    waits = await asyncio.gather(first, batch, interactive)
+
+    assert order[1:] == ["https://a.test/interactive", "https://a.test/batch"]
+    assert waits[0] < waits[2] and waits[2] > 0
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.stats()["admitted"] == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_each_host_without_blocking_others():
+    scheduler = RenderScheduler(concurrency=4, host_concurrency=1, host_delay=0)
+    order = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_hold(scheduler, url, order, release))
+        for url in ("https://a.test/1", "https://a.test/2", "https://b.test/1")
+    ]
+    await asyncio.sleep(0.01)
+
+    assert order == ["https://a.test/1", "https://b.test/1"]
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order[-1] == "https://a.test/2"
+    assert not scheduler._hosts
+
+
+@pytest.mark.asyncio
+async def test_scheduler_spaces_render_starts_on_one_host():
+    scheduler = RenderScheduler(concurrency=4, host_concurrency=4, host_delay=0.05)
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def render(url):
+        async with scheduler.slot(url):
+            starts.append(loop.time())
+
+    await asyncio.gather(*(render(f"https://a.test/{n}") for n in range(3)))
+
+    assert starts[1] - starts[0] >= 0.04
+    assert starts[2] - starts[1] >= 0.04
+    await asyncio.sleep(0.1)
+    assert not scheduler._hosts
+
+
+@pytest.mark.asyncio
+async def test_scheduler_forgets_renders_that_time_out_while_queued():
+    scheduler = RenderScheduler(concurrency=1, host_concurrency=1, host_delay=0)
+    order = []
+    release = asyncio.Event()
+    first = asyncio.create_task(_hold(scheduler, "https://a.test/1", order, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            _hold(scheduler, "https://a.test/2", order, release), 0.01
+        )
+    release.set()
+    await first
+    await asyncio.wait_for(_hold(scheduler, "https://a.test/3", order, release), 1)
+
+    assert order == ["https://a.test/1", "https://a.test/3"]
+    stats = scheduler.stats()
+    assert (stats["running"], stats["queued"], stats["admitted"]) == (0, 0, 2)
+
+
+def test_scheduler_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        RenderScheduler(concurrency=1, host_concurrency=0)
@@ -0,0 +1,156 @@
+import pytest
+
+from carnivore import http_cache, render
+from carnivore.http_cache import SubresourceCache
+from carnivore.render import RenderPolicy, _handle_subresource
+
+SCRIPT_URL = "https://cdn.example.com/app.js"
+
+
+class FakeRequest:
+    def __init__(self, url=SCRIPT_URL, headers=None, hidden_headers=None):
+        self.url = url
+        self.method = "GET"
+        self.headers = headers or {"accept": "*/*"}
+        # Playwright leaves Cookie and similar headers out of ``headers``.
+        self.hidden_headers = hidden_headers or {}
+
+    async def all_headers(self):
+        return {**self.headers, **self.hidden_headers}
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body=b""):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+
+class FakeRoute:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.fetched = []
+        self.fulfilled = []
+
+    async def fetch(self, headers=None):
+        self.fetched.append(headers)
+        return self.responses.pop(0)
+
+    async def fulfill(self, **kwargs):
+        self.fulfilled.append(kwargs)
+
+    async def abort(self):
+        self.fulfilled.append("abort")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SubresourceCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(render, "subresource_cache", lambda: cache)
+    return cache
+
+
+def test_subresource_cache_stores_only_shareable_responses():
+    cache = SubresourceCache(max_bytes=1024 * 1024)
+    request_headers = {"accept": "*/*"}
+
+    for headers in (
+        {"cache-control": "no-store", "etag": '"a"'},
+        {"cache-control": "private, max-age=60"},
+        {"cache-control": "max-age=60", "set-cookie": "id=1"},
+        {"cache-control": "max-age=60", "vary": "*"},
+        {"content-type": "text/javascript"},
+    ):
+        cache.store(SCRIPT_URL, request_headers, 200, headers, b"script")
+        assert cache.lookup(SCRIPT_URL, request_headers) is None
+
+    cache.store(
+        SCRIPT_URL, {"cookie": "id=1"}, 200, {"cache-control": "max-age=60"}, b"x"
+    )
+    assert cache.lookup(SCRIPT_URL, request_headers) is None
+    cache.store(SCRIPT_URL, request_headers, 404, {"cache-control": "max-age=60"}, b"")
+    assert cache.lookup(SCRIPT_URL, request_headers) is None
+
+
+def test_subresource_cache_matches_vary_headers_and_bounds_bytes():
+    cache = SubresourceCache(max_bytes=8 * 100)
+    headers = {"cache-control": "max-age=60", "vary": "Accept-Language"}
+
+    cache.store(SCRIPT_URL, {"accept-language": "en"}, 200, headers, b"en")
+
+    assert cache.lookup(SCRIPT_URL, {"accept-language": "en"}).body == b"en"
+    assert cache.lookup(SCRIPT_URL, {"accept-language": "de"}) is None
+
+    cache.store("https://cdn.example.com/big.js", {}, 200, headers, b"x" * 100)
+    assert cache.lookup("https://cdn.example.com/big.js", {}) is None
+    for index in range(20):
+        cache.store(f"{SCRIPT_URL}?{index}", {}, 200, headers, b"x" * 50)
+    assert cache.bytes <= cache.max_bytes
+    assert cache.lookup(f"{SCRIPT_URL}?19", {}) is not None
+    assert cache.lookup(f"{SCRIPT_URL}?0", {}) is None
+
+
+@pytest.mark.asyncio
+async def test_fresh_subresources_are_fulfilled_from_the_cache(cache):
+    headers = {"cache-control": "max-age=60", "content-type": "text/javascript"}
+    first = FakeRoute([FakeResponse(200, headers, b"console.log(1)")])
+    policy = RenderPolicy(allow_loopback=False)
+
+    await _handle_subresource(first, FakeRequest(), policy)
+    second = FakeRoute([])
+    await _handle_subresource(second, FakeRequest(), policy)
+
+    assert second.fetched == []
+    assert second.fulfilled == [
+        {"status": 200, "headers": headers, "body": b"console.log(1)"}
+    ]
+    assert policy.subrequest_count == 2
+    assert policy.transfer_bytes == 2 * len(b"console.log(1)")
+
+
+@pytest.mark.asyncio
+async def test_cookie_authenticated_subresources_are_not_cached(cache):
+    headers = {"cache-control": "max-age=60", "content-type": "text/javascript"}
+    policy = RenderPolicy(allow_loopback=False)
+    authenticated = FakeRequest(hidden_headers={"cookie": "session=1"})
+
+    await _handle_subresource(
+        FakeRoute([FakeResponse(200, headers, b"secret")]), authenticated, policy
+    )
+    route = FakeRoute([FakeResponse(200, headers, b"public")])
+    await _handle_subresource(route, FakeRequest(), policy)
+
+    assert route.fetched == [None]
+    assert cache.lookup(SCRIPT_URL, {"accept": "*/*"}).body == b"public"
+
+
+@pytest.mark.asyncio
+async def test_stale_subresources_are_revalidated(cache):
+    headers = {"etag": '"v1"', "content-type": "text/css"}
+    policy = RenderPolicy(allow_loopback=False)
+    await _handle_subresource(
+        FakeRoute([FakeResponse(200, headers, b"body{}")]), FakeRequest(), policy
+    )
+
+    route = FakeRoute([FakeResponse(304, {"etag": '"v1"'})])
+    await _handle_subresource(route, FakeRequest(), policy)
+
+    assert route.fetched == [{"accept": "*/*", "If-None-Match": '"v1"'}]
+    assert route.fulfilled[0]["body"] == b"body{}"
+
+    route = FakeRoute([FakeResponse(200, {"etag": '"v2"'}, b"p{}")])
+    await _handle_subresource(route, FakeRequest(), policy)
+
+    assert route.fulfilled[0]["response"].status == 200
+    assert cache.lookup(SCRIPT_URL, {}).validators == {"etag": '"v2"'}
+
+
+def test_subresource_cache_is_shared_and_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("CARNIVORE_SUBRESOURCE_CACHE_BYTES", "4096")
+    assert http_cache.subresource_cache() is http_cache.subresource_cache()
+
+    monkeypatch.setenv("CARNIVORE_SUBRESOURCE_CACHE_BYTES", "0")
+    assert http_cache.subresource_cache() is None